@@ -0,0 +1,279 @@
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(BENCHMARKS_DIR), "src")
+# The pipeline modules import each other the way `python3 src/main.py` sees them
+sys.path.insert(0, SRC_DIR)
+
+from synthetic_data import SCALES, generate_dataset  # noqa: E402
+
+from analysis.adhoc_analysis import (  # noqa: E402
+    find_journal_with_most_different_drugs,
+    find_related_drugs_by_pubmed_journals,
+)
+from analysis.drug_cooccurrence import (  # noqa: E402
+    find_all_related_drugs_by_pubmed_journals,
+)
+from analysis.graph_index import (  # noqa: E402
+    INDEX_ARRAYS,
+    GraphIndex,
+    build_graph_index,
+    graph_index_path,
+)
+from data_cleansing import date_parser  # noqa: E402
+from data_cleansing.cleaning import clean_and_validate_source  # noqa: E402
+from data_ingestion import reader  # noqa: E402
+from data_transformation.drug_matcher import build_drug_matcher  # noqa: E402
+from data_transformation.drug_mention_finder import find_drug_mentions  # noqa: E402
+
+BASELINE_PATH = os.path.join(BENCHMARKS_DIR, "baseline.json")
+DATA_DIR = os.path.join(BENCHMARKS_DIR, "data")
+DEFAULT_TOLERANCE = 1.5  # a benchmark fails when slower than tolerance x its baseline
+NOISE_FLOOR_SECONDS = 0.05  # differences below this are timer noise
+SCALAR_DATE_SAMPLE = 100_000
+
+
+def digest(value):
+    """Stable digest of a benchmark result (DataFrames, lists and dicts of plain values)."""
+    sha = hashlib.sha256()
+    if isinstance(value, pd.DataFrame):
+        sha.update(json.dumps(list(value.columns)).encode("utf-8"))
+        sha.update(pd.util.hash_pandas_object(value, index=False).values.tobytes())
+    elif isinstance(value, (list, tuple)) and any(
+        isinstance(item, pd.DataFrame) for item in value
+    ):
+        for item in value:
+            sha.update(digest(item).encode("utf-8"))
+    else:
+        sha.update(
+            json.dumps(
+                value, sort_keys=True, default=sorted, ensure_ascii=False
+            ).encode("utf-8")
+        )
+    return sha.hexdigest()
+
+
+def dataset_dir(scale, seed):
+    """Generates the dataset of a scale once, and returns its directory."""
+    drugs, titles = SCALES[scale]
+    path = os.path.join(DATA_DIR, f"{scale}-{seed}")
+    marker = os.path.join(path, ".complete")
+    if not os.path.exists(marker):
+        print(f"Generating the '{scale}' dataset ({drugs} drugs, {titles} titles)...")
+        generate_dataset(path, drugs, titles, seed)
+        open(marker, "w").close()
+    return path
+
+
+def use_raw_files(path):
+    """Points the reader at the raw files of a dataset."""
+    reader.drugs_csv_path = os.path.join(path, "drugs.csv")
+    reader.pubmed_csv_path = os.path.join(path, "pubmed.csv")
+    reader.pubmed_json_path = os.path.join(path, "pubmed.json")
+    reader.clinical_trials_csv_path = os.path.join(path, "clinical_trials.csv")
+
+
+def run_benchmarks(path, repeat):
+    """
+    Runs every benchmark on a dataset, each stage feeding the next one.
+
+    Returns:
+        dict: Benchmark name -> {"seconds": best time over the repeats, "digest": result digest}
+    """
+    results = {}
+
+    def bench(name, function):
+        best = None
+        for _ in range(repeat):
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                value = function()
+                elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results[name] = {"seconds": round(best, 4), "digest": digest(value)}
+        print(f"  {name:<40} {best:9.4f}s")
+        return value
+
+    use_raw_files(path)
+    drugs_df, pubmed_df, trials_df = bench("load_data", reader.load_data)
+
+    def clean():
+        return [
+            clean_and_validate_source(drugs_df, "drugs")[0],
+            clean_and_validate_source(pubmed_df, "pubmed")[0],
+            clean_and_validate_source(trials_df, "clinical_trials")[0],
+        ]
+
+    drugs_df, pubmed_df, trials_df = bench("clean_and_validate_source", clean)
+
+    raw_dates = list(pubmed_df["date"][:SCALAR_DATE_SAMPLE])
+    bench(
+        "standardize_date (scalar)",
+        lambda: [date_parser.standardize_date(value) for value in raw_dates],
+    )
+
+    def standardize():
+        return [
+            date_parser.standardize_date_column(pubmed_df["date"]).tolist(),
+            date_parser.standardize_date_column(trials_df["date"]).tolist(),
+        ]
+
+    pubmed_dates, trial_dates = bench("standardize_date_column", standardize)
+    pubmed_df = pubmed_df.assign(date=pubmed_dates)
+    trials_df = trials_df.assign(date=trial_dates)
+
+    drugs_list_upper = [
+        (name, name.upper()) for name in drugs_df["drug"].unique() if pd.notna(name)
+    ]
+    matcher = build_drug_matcher(drugs_list_upper)
+
+    def find_mentions():
+        mentions = find_drug_mentions(
+            pubmed_df, drugs_list_upper, "pubmed", matcher=matcher
+        ) + find_drug_mentions(
+            trials_df, drugs_list_upper, "clinical_trial", matcher=matcher
+        )
+        return [mention for mention in mentions if mention["date"] is not None]
+
+    mentions = bench("find_drug_mentions", find_mentions)
+
+    target_drug = drugs_list_upper[0][0] if drugs_list_upper else ""
+    bench(
+        "find_journal_with_most_different_drugs",
+        lambda: find_journal_with_most_different_drugs(mentions),
+    )
+    bench(
+        "find_related_drugs_by_pubmed_journals",
+        lambda: find_related_drugs_by_pubmed_journals(mentions, target_drug),
+    )
+    bench(
+        "find_all_related_drugs",
+        lambda: find_all_related_drugs_by_pubmed_journals(mentions),
+    )
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        graph_path = os.path.join(index_dir, "graph.json")
+        open(graph_path, "w").close()
+
+        def build_index():
+            index = GraphIndex(build_graph_index(mentions, graph_path))
+            arrays = {name: getattr(index, name).tolist() for name in INDEX_ARRAYS}
+            return [index.drugs, index.journals, arrays]
+
+        bench("build_graph_index", build_index)
+        index = GraphIndex(graph_index_path(graph_path))
+        bench(
+            "graph_index queries",
+            lambda: [
+                index.find_journal_with_most_different_drugs(),
+                index.find_related_drugs_by_pubmed_journals(target_drug),
+            ],
+        )
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compares results with a baseline.
+
+    Returns:
+        list: Descriptions of the regressions (changed results, or slower than tolerance).
+    """
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            print(f"  {name}: no baseline")
+            continue
+        if result["digest"] != expected["digest"]:
+            regressions.append(f"{name}: the result changed")
+        limit = max(
+            expected["seconds"] * tolerance, expected["seconds"] + NOISE_FLOOR_SECONDS
+        )
+        if result["seconds"] > limit:
+            regressions.append(
+                f"{name}: {result['seconds']:.4f}s, baseline {expected['seconds']:.4f}s "
+                f"(limit {limit:.4f}s)"
+            )
+    return regressions
+
+
+def load_baseline(baseline_path=BASELINE_PATH):
+    try:
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"scales": {}}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmarks every pipeline stage on synthetic data, against a stored baseline."
+    )
+    parser.add_argument("--scale", choices=SCALES, default="tiny")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Runs per benchmark (the best one is kept).",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=None,
+        help=f"Allowed slowdown factor (default: the baseline's, or {DEFAULT_TOLERANCE}).",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Store the results as the new baseline of the scale instead of comparing.",
+    )
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    args = parser.parse_args(argv)
+
+    path = dataset_dir(args.scale, args.seed)
+    print(f"Running benchmarks on '{path}' (best of {args.repeat}):")
+    results = run_benchmarks(path, args.repeat)
+
+    baseline = load_baseline(args.baseline)
+    baseline_key = f"{args.scale}-{args.seed}"
+    if args.update_baseline:
+        baseline.setdefault("tolerance", DEFAULT_TOLERANCE)
+        baseline.setdefault("scales", {})[baseline_key] = results
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline of '{baseline_key}' saved to '{args.baseline}'")
+        sys.exit(0)
+
+    scale_baseline = baseline.get("scales", {}).get(baseline_key)
+    if scale_baseline is None:
+        print(
+            f"No baseline for '{baseline_key}': run with --update-baseline to store one."
+        )
+        sys.exit(0)
+    tolerance = args.tolerance or baseline.get("tolerance", DEFAULT_TOLERANCE)
+    regressions = compare(results, scale_baseline, tolerance)
+    if regressions:
+        print(f"\nREGRESSION against the '{baseline_key}' baseline:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        sys.exit(1)
+    print(
+        f"\nNo regression against the '{baseline_key}' baseline (tolerance x{tolerance})."
+    )
+
+
+if __name__ == "__main__":
+    main()
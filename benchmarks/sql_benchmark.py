@@ -0,0 +1,170 @@
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(BENCHMARKS_DIR), "src")
+# The pipeline modules import each other the way `python3 src/main.py` sees them
+sys.path.insert(0, SRC_DIR)
+
+from analysis.sales_queries import (  # noqa: E402
+    QUERY_NAMES,
+    load_database,
+    print_report,
+    run_query,
+)
+from analysis.sales_rollups import ROLLUP_QUERY_NAMES, create_rollups  # noqa: E402
+
+DATA_DIR = os.path.join(BENCHMARKS_DIR, "data")
+DEFAULT_TRANSACTIONS = 2_000_000
+PRODUCTS = 10_000
+CLIENTS = 100_000
+FIRST_DAY = "2018-01-01"
+DAYS = 3 * 365  # 2018 to 2020: the queries select one year out of three
+PRODUCT_TYPES = ["MEUBLE", "DECO"]
+
+
+def generate_sales_dataset(output_dir, transactions=DEFAULT_TRANSACTIONS, seed=0):
+    """
+    Writes transactions.csv and product_nomenclature.csv with the columns of the sql/
+    queries: ISO dates over three years, orders of 1 to 5 lines, and products of both
+    types. The same arguments give the same files.
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(output_dir, exist_ok=True)
+
+    product_ids = rng.choice(np.arange(100_000, 1_000_000), PRODUCTS, replace=False)
+    prices = np.round(rng.uniform(1, 500, PRODUCTS), 2)
+    pd.DataFrame(
+        {
+            "product_id": product_ids,
+            "product_type": rng.choice(PRODUCT_TYPES, PRODUCTS),
+            "product_name": [f"Product {i}" for i in range(PRODUCTS)],
+        }
+    ).to_csv(os.path.join(output_dir, "product_nomenclature.csv"), index=False)
+
+    # Every line of an order shares its date and client
+    lines_per_order = rng.integers(1, 6, transactions)
+    order_of_line = np.repeat(np.arange(transactions), lines_per_order)[:transactions]
+    orders = int(order_of_line[-1]) + 1 if transactions else 0
+    order_days = np.sort(rng.integers(0, DAYS, orders))
+    order_clients = rng.integers(1, CLIENTS + 1, orders)
+    products = rng.integers(0, PRODUCTS, transactions)
+    days = pd.Timestamp(FIRST_DAY) + pd.to_timedelta(order_days[order_of_line], "D")
+    pd.DataFrame(
+        {
+            "date": days.strftime("%Y-%m-%d"),
+            "order_id": order_of_line + 1,
+            "client_id": order_clients[order_of_line],
+            "prod_id": product_ids[products],
+            "prod_price": prices[products],
+            "prod_qty": rng.integers(1, 10, transactions),
+        }
+    ).to_csv(os.path.join(output_dir, "transactions.csv"), index=False)
+
+
+def sales_dataset_dir(transactions, seed):
+    """Generates the dataset of a size once, and returns its directory."""
+    path = os.path.join(DATA_DIR, f"sales-{transactions}-{seed}")
+    marker = os.path.join(path, ".complete")
+    if not os.path.exists(marker):
+        print(f"Generating {transactions} transactions...")
+        generate_sales_dataset(path, transactions, seed)
+        open(marker, "w").close()
+    return path
+
+
+def run_sql_benchmark(path, indexes=True, rollups=False):
+    """
+    Loads a dataset and runs every query, and with rollups the reports from the rollups too.
+
+    Returns:
+        list: The run_query report of each query.
+    """
+    start = time.perf_counter()
+    conn = load_database(
+        os.path.join(path, "transactions.csv"),
+        os.path.join(path, "product_nomenclature.csv"),
+        indexes=indexes,
+    )
+    print(f"Database ready in {time.perf_counter() - start:.3f}s")
+    try:
+        query_names = list(QUERY_NAMES)
+        if rollups:
+            start = time.perf_counter()
+            create_rollups(conn)
+            print(f"Rollups ready in {time.perf_counter() - start:.3f}s")
+            query_names += ROLLUP_QUERY_NAMES
+        return [run_query(conn, query_name) for query_name in query_names]
+    finally:
+        conn.close()
+
+
+def same_rows(rows, expected_rows):
+    """Compares query results, the sums up to float rounding (they depend on the row order)."""
+    return len(rows) == len(expected_rows) and all(
+        len(row) == len(expected)
+        and all(
+            (
+                math.isclose(value, other, rel_tol=1e-9)
+                if isinstance(value, float)
+                else value == other
+            )
+            for value, other in zip(row, expected)
+        )
+        for row, expected in zip(rows, expected_rows)
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Runs the sql/ queries on millions of generated transactions and checks "
+        "that their plans stay index-driven."
+    )
+    parser.add_argument("--transactions", type=int, default=DEFAULT_TRANSACTIONS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--compare",
+        action="store_true",
+        help="Also run the queries without the indexes.",
+    )
+    parser.add_argument(
+        "--rollups",
+        action="store_true",
+        help="Also answer the queries from the rollup tables, and check their results.",
+    )
+    args = parser.parse_args()
+
+    path = sales_dataset_dir(args.transactions, args.seed)
+    reports = run_sql_benchmark(path, rollups=args.rollups)
+    for report in reports:
+        print_report(report, max_rows=3)
+    reports, rollup_reports = reports[: len(QUERY_NAMES)], reports[len(QUERY_NAMES) :]
+    for rollup_report, report in zip(rollup_reports, reports):
+        if not same_rows(rollup_report["rows"], report["rows"]):
+            print(f"\nERROR: {rollup_report['query']} differs from {report['query']}.")
+            sys.exit(1)
+        print(
+            f"\n{rollup_report['query']}: x{report['seconds'] / rollup_report['seconds']:.0f} "
+            f"faster than {report['query']}"
+        )
+
+    if args.compare:
+        print("\nWithout indexes:")
+        for report, indexed in zip(run_sql_benchmark(path, indexes=False), reports):
+            print_report(report, max_rows=0)
+            if not same_rows(report["rows"], indexed["rows"]):
+                print("  ERROR: the results differ from the indexed run.")
+                sys.exit(1)
+            print(f"  x{report['seconds'] / indexed['seconds']:.1f} slower")
+
+    not_indexed = [report["query"] for report in reports if not report["index_driven"]]
+    if not_indexed:
+        print(f"\nNot index-driven: {', '.join(not_indexed)}")
+        sys.exit(1)
+    print("\nEvery query is index-driven.")
@@ -0,0 +1,198 @@
+import csv
+import json
+import os
+import random
+from datetime import date, timedelta
+
+# Scale presets: (number of drugs, number of publication titles)
+SCALES = {
+    "tiny": (10, 1_000),
+    "small": (100, 10_000),
+    "medium": (1_000, 100_000),
+    "large": (10_000, 1_000_000),
+    "xlarge": (10_000, 10_000_000),
+}
+
+# Share of the titles going to each raw file
+PUBMED_CSV_SHARE = 0.6
+PUBMED_JSON_SHARE = 0.25  # the rest are clinical trials
+
+SYLLABLES = [
+    "ab", "ac", "al", "am", "an", "ar", "ba", "be", "ci", "co", "da", "de", "di", "do",
+    "fa", "fe", "ga", "ge", "hy", "la", "le", "li", "lo", "ma", "me", "mi", "mo", "na",
+    "ne", "ni", "no", "pa", "pe", "pi", "pro", "ra", "re", "ri", "ro", "sa", "se", "si",
+    "ta", "te", "ti", "to", "tra", "va", "ve", "vi", "xa", "ze", "zo",
+]  # fmt: skip
+SUFFIXES = ["mine", "cline", "nol", "pine", "sone", "zole", "pril", "statin", "mab"]
+WORDS = (
+    "study of the effect in patients with acute chronic treatment trial randomized "
+    "controlled clinical analysis cohort response therapy dose safety efficacy children "
+    "adults outcomes after before during severe mild infection resistance injection oral "
+    "topical comparison versus placebo evaluation management risk factors"
+).split()
+JOURNAL_WORDS = (
+    "journal review annals archives international european american clinical medicine "
+    "pharmacology pediatrics nursing emergency research letters reports science"
+).split()
+HEX_ARTEFACTS = ["\\xc3\\xb1", "\\xc3\\xa9", "\\xe2\\x80\\x99", "\\xc2\\xae"]
+MONTHS = [
+    "January", "February", "March", "April", "May", "June", "July", "August",
+    "September", "October", "November", "December",
+]  # fmt: skip
+
+
+def _drug_names(rng, count):
+    names = []
+    seen = set()
+    while len(names) < count:
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3)))
+        name = (name + rng.choice(SUFFIXES)).upper()
+        if name not in seen:
+            seen.add(name)
+            names.append(name)
+    return names
+
+
+def _atc_code(rng):
+    letters = "ABCDGHJLMNPRSV"
+    code = (
+        rng.choice(letters)
+        + f"{rng.randint(1, 99):02d}"
+        + "".join(rng.choice("ABCDEFGHX") for _ in range(2))
+    )
+    # Every ATC level is valid; about 2% of the codes are malformed
+    code = code[: rng.choice([1, 3, 4, 5, 5, 5])]
+    if rng.random() < 0.02:
+        code = code.lower() + "??"
+    return code
+
+
+def _with_artefact(rng, text, rate):
+    """Inserts a skipped UTF-8 '\\xYY' sequence in a share of the texts."""
+    if rng.random() >= rate:
+        return text
+    position = rng.randint(0, len(text))
+    return text[:position] + rng.choice(HEX_ARTEFACTS) + text[position:]
+
+
+def _date_string(rng, day, formats):
+    date_format = rng.choice(formats)
+    if rng.random() < 0.005:
+        return rng.choice(["", "not a date", "31/02/2020"])
+    if date_format == "dmy":
+        return day.strftime("%d/%m/%Y")
+    if date_format == "long":
+        return f"{day.day} {MONTHS[day.month - 1]} {day.year}"
+    return day.isoformat()
+
+
+def _title(rng, drug_names):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(6, 16))]
+    # Most titles mention 0 to 2 drugs, in any case
+    for _ in range(rng.choice([0, 0, 1, 1, 1, 2])):
+        drug = rng.choice(drug_names)
+        drug = rng.choice([drug, drug.lower(), drug.capitalize()])
+        words.insert(rng.randint(0, len(words)), drug)
+    title = " ".join(words).capitalize()
+    if rng.random() < 0.01:
+        title = "  "  # blank titles exist in the raw data
+    return _with_artefact(rng, title, 0.02)
+
+
+def generate_dataset(output_dir, drugs=10, titles=1_000, seed=0):
+    """
+    Writes a synthetic raw dataset (drugs.csv, pubmed.csv, pubmed.json, clinical_trials.csv)
+    with the quirks of the real files: mixed date formats, skipped '\\xYY' artefacts,
+    malformed ATC codes and NCT numbers, ids duplicated between the PubMed files, integer and
+    string JSON ids, and a pubmed.json with trailing commas. The dataset only depends on the
+    arguments: the same seed gives the same files.
+
+    Args:
+        output_dir (str): Directory of the raw files (created if needed).
+        drugs (int): Number of drugs.
+        titles (int): Number of publications (PubMed and clinical trials).
+        seed (int): Random seed.
+    """
+    rng = random.Random(seed)
+    os.makedirs(output_dir, exist_ok=True)
+    drug_names = _drug_names(rng, drugs)
+    journal_count = max(5, int(titles**0.5))
+    journals = [
+        _with_artefact(
+            rng,
+            " ".join(
+                rng.choice(JOURNAL_WORDS) for _ in range(rng.randint(2, 5))
+            ).title(),
+            0.05,
+        )
+        for _ in range(journal_count)
+    ]
+    first_day = date(2015, 1, 1)
+
+    def publication():
+        day = first_day + timedelta(days=rng.randint(0, 3650))
+        return _title(rng, drug_names), day, rng.choice(journals)
+
+    with open(os.path.join(output_dir, "drugs.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["atccode", "drug"])
+        for name in drug_names:
+            writer.writerow([_atc_code(rng), name])
+
+    csv_count = int(titles * PUBMED_CSV_SHARE)
+    json_count = int(titles * PUBMED_JSON_SHARE)
+    trial_count = titles - csv_count - json_count
+
+    with open(
+        os.path.join(output_dir, "pubmed.csv"), "w", newline="", encoding="utf-8"
+    ) as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "date", "journal"])
+        for pub_id in range(1, csv_count + 1):
+            title, day, journal = publication()
+            writer.writerow(
+                [pub_id, title, _date_string(rng, day, ["dmy", "dmy", "iso"]), journal]
+            )
+
+    # JSON records continue the CSV ids; about 1% repeat a CSV id (deduplicated on load)
+    with open(os.path.join(output_dir, "pubmed.json"), "w", encoding="utf-8") as f:
+        f.write("[\n")
+        for offset in range(json_count):
+            pub_id = csv_count + 1 + offset
+            if csv_count and rng.random() < 0.01:
+                pub_id = rng.randint(1, csv_count)
+            title, day, journal = publication()
+            record = {
+                "id": pub_id if rng.random() < 0.5 else str(pub_id),
+                "title": title,
+                "date": _date_string(rng, day, ["dmy", "long", "iso"]),
+                "journal": journal,
+            }
+            text = json.dumps(record, indent=2, ensure_ascii=False)
+            # The upstream export leaves trailing commas in some objects and after the last one
+            if rng.random() < 0.1:
+                text = text[:-2] + ",\n}"
+            f.write("  " + text.replace("\n", "\n  ") + ",\n")
+        f.write("]\n")
+
+    with open(
+        os.path.join(output_dir, "clinical_trials.csv"),
+        "w",
+        newline="",
+        encoding="utf-8",
+    ) as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "scientific_title", "date", "journal"])
+        for trial in range(trial_count):
+            title, day, journal = publication()
+            trial_id = f"NCT{10_000_000 + trial:08d}"
+            if rng.random() < 0.02:
+                trial_id = rng.choice(["", "NCT123", "nct" + trial_id[3:]])
+            writer.writerow(
+                [
+                    trial_id,
+                    title,
+                    _date_string(rng, day, ["long", "long", "dmy"]),
+                    journal,
+                ]
+            )
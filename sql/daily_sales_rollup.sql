@@ -0,0 +1,9 @@
+SELECT
+    date,
+    CASE WHEN priced > 0 THEN ventes END AS ventes
+FROM
+    daily_sales_rollup
+WHERE
+    date >= '2019-01-01' AND date <= '2019-12-31'
+ORDER BY
+    date;
@@ -0,0 +1,18 @@
+SELECT
+    client_id,
+    SUM(CASE
+        WHEN product_type = 'MEUBLE' THEN CASE WHEN priced > 0 THEN ventes END
+        ELSE 0
+    END) AS ventes_meuble,
+    SUM(CASE
+        WHEN product_type = 'DECO' THEN CASE WHEN priced > 0 THEN ventes END
+        ELSE 0
+    END) AS ventes_deco
+FROM
+    client_sales_rollup
+WHERE
+    sales_year = '2019'
+GROUP BY
+    client_id
+ORDER BY
+    client_id;
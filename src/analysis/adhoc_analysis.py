@@ -1,6 +1,17 @@
 import json
 import os
-from collections import defaultdict
+import sys
+
+if __name__ == "__main__":
+    # Run as a script: the modules of the src/ directory are imported as packages
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from analysis.streaming_analytics import (
+    analyze_graph_file,
+    create_aggregation,
+    run_aggregations,
+)
+from data_output.graph_reader import GraphRecords, NormalizedGraph, is_ndjson_graph
 
 # Variables
 current_script_directory = os.path.dirname(__file__)
@@ -13,10 +24,28 @@ graph_json_path = os.path.join(
 def load_graph_data(file_path=graph_json_path):
     """
     Load data from the JSON graph output of the pipeline.
+    NDJSON graphs ('.ndjson' or '.ndjson.gz') are not loaded in memory: a lazy,
+    re-iterable GraphRecords view is returned instead.
+    Normalized graphs are returned as a NormalizedGraph, iterable like the mention list.
     """
+    if is_ndjson_graph(file_path):
+        if not os.path.exists(file_path):
+            print(
+                f"Error: The file '{file_path}' was not found. Please ensure the main pipeline has been run."
+            )
+            return None
+        return GraphRecords(file_path)
+
     try:
         with open(file_path, "r", encoding="utf-8") as f:
             data = json.load(f)
+        if NormalizedGraph.is_normalized(data):
+            data = NormalizedGraph(data)
+        elif isinstance(data, dict):
+            print(
+                f"Error: Unsupported graph format in '{file_path}' (format: {data.get('format')}, version: {data.get('version')})."
+            )
+            return None
         if not data:
             print(f"Warning: The file '{file_path}' is empty. No data to analyze.")
         return data
@@ -34,7 +63,8 @@ def load_graph_data(file_path=graph_json_path):
 
 def find_journal_with_most_different_drugs(graph_data):
     """
-    Extracts the name of the journal that mentions the most different drugs.
+    Extracts the name of the journal that mentions the most different drugs
+    (see streaming_analytics.JournalWithMostDrugs).
 
     Args:
         graph_data (list): The graph data loaded from drug_journal_mentions_graph.json.
@@ -44,34 +74,15 @@ def find_journal_with_most_different_drugs(graph_data):
     """
     if not graph_data:
         return None, 0
-
-    journal_drugs = defaultdict(set)  # Key: journal, Value: set of unique drugs
-
-    for mention in graph_data:
-        journal = mention.get("journal")
-        drug = mention.get("drug")
-        if journal and drug:
-            journal_drugs[journal].add(drug)
-
-    if not journal_drugs:
-        return None, 0
-
-    most_mentions_journal = None
-    max_different_drugs = 0
-
-    for journal, drugs_set in journal_drugs.items():
-        num_different_drugs = len(drugs_set)
-        if num_different_drugs > max_different_drugs:
-            max_different_drugs = num_different_drugs
-            most_mentions_journal = journal
-
-    return most_mentions_journal, max_different_drugs
+    aggregation = create_aggregation("journal_with_most_drugs")
+    return run_aggregations(graph_data, {"journal": aggregation})["journal"]
 
 
 def find_related_drugs_by_pubmed_journals(graph_data, target_drug):
     """
     For a given drug, finds the set of drugs mentioned by the same journals
-    referenced by scientific publications (PubMed) but not clinical trials (Clinical Trials).
+    referenced by scientific publications (PubMed) but not clinical trials (Clinical Trials)
+    (see streaming_analytics.RelatedDrugs).
 
     Args:
         graph_data (list): The loaded graph data.
@@ -82,100 +93,78 @@ def find_related_drugs_by_pubmed_journals(graph_data, target_drug):
     """
     if not graph_data or not target_drug:
         return set()
-
-    target_drug_upper = target_drug.upper()
-
-    # Step 1: Identify all journals that mention each drug and by what source
-    drug_journal_sources = defaultdict(
-        lambda: defaultdict(set)
-    )  # drug -> journal -> {source_type}
-
-    for mention in graph_data:
-        drug = mention.get("drug")
-        journal = mention.get("journal")
-        source_type = mention.get("source_type")
-        if drug and journal and source_type:
-            drug_journal_sources[drug.upper()][journal].add(source_type)
-
-    # Step 2: Find journals that mentioned the target drug exclusively via PubMed
-    target_pubmed_only_journals = set()
-    if target_drug_upper in drug_journal_sources:
-        for journal, sources in drug_journal_sources[target_drug_upper].items():
-            if "pubmed" in sources and "clinical_trial" not in sources:
-                target_pubmed_only_journals.add(journal)
-
-    if not target_pubmed_only_journals:
-        # print(f"Target drug '{target_drug}' has no exclusive PubMed mentions to establish links.")
-        return set()
-
-    # Step 3: Find other drugs mentioned by these same journals (exclusively PubMed)
-    related_drugs = set()
-
-    for other_drug_upper, journal_map in drug_journal_sources.items():
-        if (
-            other_drug_upper == target_drug_upper
-        ):  # we don't include the target drug itself
-            continue
-
-        # Check if this other drug is mentioned in one of the target drug's "PubMed-only" journals
-        # AND if its own mentions in these journals are also exclusively PubMed
-        shared_pubmed_only_journals_with_other_drug = set()
-        for journal_name in target_pubmed_only_journals:
-            if (
-                journal_name in journal_map
-            ):  # The other drug is mentioned in this journal
-                sources_for_other_drug = journal_map[journal_name]
-                if (
-                    "pubmed" in sources_for_other_drug
-                    and "clinical_trial" not in sources_for_other_drug
-                ):
-                    shared_pubmed_only_journals_with_other_drug.add(journal_name)
-
-        if shared_pubmed_only_journals_with_other_drug:
-            # If the other drug shares at least one PubMed-only journal with the target drug,
-            # and these mentions are also PubMed-only for the other drug.
-            # For now, returning the capitalized version of the uppercase drug name.
-            related_drugs.add(other_drug_upper.capitalize())
-
-    return related_drugs
+    aggregation = create_aggregation("related_drugs", target_drug=target_drug)
+    return run_aggregations(graph_data, {"related": aggregation})["related"]
 
 
-if __name__ == "__main__":
+def run_adhoc_analyses(graph_path, open_index=None, target_drug="BETAMETHASONE"):
+    """
+    Prints the ad-hoc analyses of a graph file: the journal mentioning the most different
+    drugs, and the drugs related to a target drug through shared PubMed-only journals.
 
-    # Load the graph data
-    print(f"Loading graph data from: {graph_json_path}")
-    data = load_graph_data()
+    Args:
+        graph_path (str): The graph file (any output format).
+        open_index (callable): Opens the compiled index of a graph file, or returns None
+                               (e.g. graph_index.open_graph_index). The index is used when
+                               it is up to date; without it, the graph file is streamed
+                               once (see streaming_analytics).
+        target_drug (str): The drug of the second analysis.
 
-    if data is not None:
+    Returns:
+        bool: False if the graph could not be loaded.
+    """
+    index = open_index(graph_path) if open_index is not None else None
+    if index is not None:
+        print(f"Using the graph index: {index.index_path}")
+        journal, count = index.find_journal_with_most_different_drugs()
+        related = index.find_related_drugs_by_pubmed_journals(target_drug)
+    else:
+        # Both analyses are computed in a single streaming pass over the graph file
+        print(f"Streaming graph data from: {graph_path}")
+        results = analyze_graph_file(
+            graph_path,
+            {
+                "journal": create_aggregation("journal_with_most_drugs"),
+                "related": create_aggregation("related_drugs", target_drug=target_drug),
+            },
+        )
+        if results is None:
+            print("Could not load graph data. Ad-hoc analysis will not be performed.")
+            return False
+        journal, count = results["journal"]
+        related = results["related"]
+
+    # First ad-hoc analysis: Find journal with most different drugs
+    print("\n--- Analysis 1: Journal with most different drug mentions ---")
+    if journal:
+        print(
+            f"The journal mentioning the most different drugs is: '{journal}' ({count} drugs)."
+        )
+    else:
+        print("No journal mentions found or data was empty.")
 
-        # First ad-hoc analysis: Find journal with most different drugs
-        print("\n--- Analysis 1: Journal with most different drug mentions ---")
-        journal, count = find_journal_with_most_different_drugs(data)
-        if journal:
-            print(
-                f"The journal mentioning the most different drugs is: '{journal}' ({count} drugs)."
-            )
-        else:
-            print("No journal mentions found or data was empty.")
+    # Second ad-hoc analysis: Find related drugs for a target drug
+    print(
+        f"\n--- Analysis 2: Find related drugs for {target_drug}, having a shared PubMed-only journals ---"
+    )
+    print(f"Finding related drugs for: '{target_drug}'")
 
-        # Second ad-hoc analysis: Find related drugs for a target drug
+    if related:
         print(
-            "\n--- Analysis 2: Find related drugs for BETAMETHASONE, having a shared PubMed-only journals ---"
+            f"Drugs related to '{target_drug}' via shared PubMed-only journals: {', '.join(sorted(list(related))) or 'None'}"
         )
+    else:
+        print(
+            f"No drugs found related to '{target_drug}' under the specified criteria, or target drug not found with PubMed-only mentions."
+        )
+    return True
 
-        # For demonstration, we use a target_drug.
-        example_target_drug = "BETAMETHASONE"
-        print(f"Finding related drugs for: '{example_target_drug}'")
 
-        related = find_related_drugs_by_pubmed_journals(data, example_target_drug)
+if __name__ == "__main__":
 
-        if related:
-            print(
-                f"Drugs related to '{example_target_drug}' via shared PubMed-only journals: {', '.join(sorted(list(related))) or 'None'}"
-            )
-        else:
-            print(
-                f"No drugs found related to '{example_target_drug}' under the specified criteria, or target drug not found with PubMed-only mentions."
-            )
-    else:
-        print("Could not load graph data. Ad-hoc analysis will not be performed.")
+    # Load the graph data (an other graph file, e.g. an NDJSON one, can be given as argument)
+    graph_path = sys.argv[1] if len(sys.argv) > 1 else graph_json_path
+    # The compiled index is used when it is up to date (see graph_index.py)
+    from analysis.graph_index import open_graph_index
+
+    run_adhoc_analyses(graph_path, open_graph_index)
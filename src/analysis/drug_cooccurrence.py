@@ -0,0 +1,149 @@
+import numpy as np
+
+from analysis.graph_index import GraphIndex
+from analysis.sources import PUBMED_ONLY, SOURCE_BITS
+
+
+def pubmed_only_incidence(drug_ids, journal_ids, source_bits, journal_count):
+    """
+    Reduces drug-journal edges to the drugs x PubMed-only journals incidence matrix:
+    the bitmasks of the edges of a (drug, journal) pair are OR-ed, and only the pairs
+    mentioned by PubMed and never by a clinical trial are kept.
+
+    Args:
+        drug_ids (np.ndarray): Drug index of each edge.
+        journal_ids (np.ndarray): Journal index of each edge.
+        source_bits (np.ndarray): Source bitmask of each edge (see sources.SOURCE_BITS).
+        journal_count (int): Number of journals.
+
+    Returns:
+        tuple: (drug indexes, journal indexes) of the non-zero entries, sorted by drug then journal.
+    """
+    keys = drug_ids.astype(np.int64) * journal_count + journal_ids
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    if not len(sorted_keys):
+        return sorted_keys, sorted_keys
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    bits = np.bitwise_or.reduceat(source_bits[order], starts)
+    entries = sorted_keys[starts][bits == PUBMED_ONLY]
+    return entries // journal_count, entries % journal_count
+
+
+def cooccurrence_pairs(drug_ids, journal_ids):
+    """
+    Non-zero structure of the sparse product A.A^T of a drugs x journals incidence matrix A,
+    without its diagonal: the pairs of distinct drugs sharing at least one journal.
+    The product is expanded journal by journal (every pair of drugs of a journal column),
+    with NumPy index arithmetic instead of a Python loop.
+
+    Returns:
+        tuple: (left drug indexes, right drug indexes), one entry per related pair and direction.
+    """
+    order = np.argsort(journal_ids, kind="stable")
+    column_drugs = drug_ids[order]
+    column_journals = journal_ids[order]
+    _, column_starts, column_sizes = np.unique(
+        column_journals, return_index=True, return_counts=True
+    )
+
+    # Each entry of a column is paired with every entry of the same column
+    entry_sizes = np.repeat(column_sizes, column_sizes)
+    entry_starts = np.repeat(column_starts, column_sizes)
+    left = np.repeat(column_drugs, entry_sizes)
+    block_starts = np.repeat(np.cumsum(entry_sizes) - entry_sizes, entry_sizes)
+    right_positions = (
+        np.arange(len(left)) - block_starts + np.repeat(entry_starts, entry_sizes)
+    )
+    right = column_drugs[right_positions]
+
+    distinct = left != right
+    drug_count = int(drug_ids.max(initial=0)) + 1
+    pairs = np.unique(left[distinct].astype(np.int64) * drug_count + right[distinct])
+    return pairs // drug_count, pairs % drug_count
+
+
+def find_all_related_drugs_by_pubmed_journals(graph_data):
+    """
+    Batch version of adhoc_analysis.find_related_drugs_by_pubmed_journals: the related drugs of
+    every drug at once. Two drugs are related when they are both mentioned only by PubMed
+    (never by a clinical trial) in at least one shared journal. Drugs are grouped by their
+    uppercase name, like the per-drug function does.
+
+    Args:
+        graph_data: The loaded graph data (list of mentions, GraphRecords, NormalizedGraph)
+                    or a GraphIndex.
+
+    Returns:
+        dict: Uppercase drug name -> set of related drug names (capitalized), for every drug of
+              the graph. Drugs absent from the graph have no related drugs.
+    """
+    if isinstance(graph_data, GraphIndex):
+        drug_names_upper, drug_ids, journal_ids, source_bits, journal_count = (
+            _edges_from_index(graph_data)
+        )
+    else:
+        drug_names_upper, drug_ids, journal_ids, source_bits, journal_count = (
+            _edges_from_mentions(graph_data or [])
+        )
+
+    incidence_drugs, incidence_journals = pubmed_only_incidence(
+        drug_ids, journal_ids, source_bits, journal_count
+    )
+    left, right = cooccurrence_pairs(incidence_drugs, incidence_journals)
+
+    related_drugs = {drug_upper: set() for drug_upper in drug_names_upper}
+    for drug, other_drug in zip(left.tolist(), right.tolist()):
+        related_drugs[drug_names_upper[drug]].add(
+            drug_names_upper[other_drug].capitalize()
+        )
+    return related_drugs
+
+
+def _edges_from_mentions(graph_data):
+    """Edges (uppercase drug, journal, source bit) of the mentions, as index arrays."""
+    drugs = {}
+    journals = {}
+    edges = []
+    for mention in graph_data:
+        drug = mention.get("drug")
+        journal = mention.get("journal")
+        source_type = mention.get("source_type")
+        if drug and journal and source_type:
+            edges.append(
+                (
+                    drugs.setdefault(drug.upper(), len(drugs)),
+                    journals.setdefault(journal, len(journals)),
+                    SOURCE_BITS.get(source_type, 0),
+                )
+            )
+    edges = np.array(edges, dtype=np.int64).reshape(-1, 3)
+    return (
+        list(drugs),
+        edges[:, 0],
+        edges[:, 1],
+        edges[:, 2].astype(np.uint8),
+        len(journals),
+    )
+
+
+def _edges_from_index(index):
+    """Edges of a GraphIndex, with its drugs merged by uppercase name."""
+    group_of_name = {}
+    drug_groups = np.array(
+        [
+            group_of_name.setdefault(drug.upper(), len(group_of_name))
+            for drug in index.drugs
+        ],
+        dtype=np.int64,
+    )
+    drug_names_upper = list(group_of_name)
+    row_sizes = np.diff(index.drug_indptr)
+    drug_ids = np.repeat(drug_groups, row_sizes)
+    return (
+        drug_names_upper,
+        drug_ids,
+        np.asarray(index.drug_journals, dtype=np.int64),
+        np.asarray(index.drug_sources, dtype=np.uint8),
+        len(index.journals),
+    )
@@ -0,0 +1,308 @@
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+
+if __name__ == "__main__":
+    # Run as a script: the modules of the src/ directory are imported as packages
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from analysis.sources import PUBMED_ONLY, SOURCE_BITS
+
+INDEX_FORMAT = "drug_journal_mentions_graph/csr_index"
+INDEX_VERSION = 1
+INDEX_META_FILE = "meta.json"
+
+# Binary arrays of the index (one .npy file each)
+INDEX_ARRAYS = (
+    "drug_indptr",  # drug -> offset of its first journal in drug_journals
+    "drug_journals",  # journal indexes, sorted within each drug
+    "drug_sources",  # source bitmask of each drug -> journal edge
+    "journal_indptr",  # journal -> offset of its first drug in journal_drugs
+    "journal_drugs",  # drug indexes, sorted within each journal
+)
+
+
+def graph_index_path(graph_path):
+    """Directory of the index compiled from a graph file (e.g. 'drug_journal_mentions_graph.json.index')."""
+    return graph_path + ".index"
+
+
+def graph_fingerprint(graph_path):
+    """Identifies a version of a graph file, to detect an index built from an older one."""
+    stat = os.stat(graph_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+class GraphIndexBuilder:
+    """
+    Compiles mention records into compressed-sparse-row adjacency arrays:
+    drug -> journals (with the bitmask of the sources of each edge) and journal -> drugs.
+    Only the distinct drug-journal pairs are held in memory, so mentions can be fed
+    while the graph is being written.
+
+    Drugs and journals are numbered in order of first appearance: ties between journals
+    are resolved like the ad-hoc analysis functions do.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._drugs = {}
+        self._journals = {}
+        self._edges = {}  # (drug index, journal index) -> source bitmask
+
+    def add(self, mention):
+        """Adds one mention record. Mentions without a drug or a journal are ignored."""
+        self.count += 1
+        drug = mention.get("drug")
+        journal = mention.get("journal")
+        if not drug or not journal:
+            return
+        drug_index = self._drugs.setdefault(drug, len(self._drugs))
+        journal_index = self._journals.setdefault(journal, len(self._journals))
+        edge = (drug_index, journal_index)
+        self._edges[edge] = self._edges.get(edge, 0) | SOURCE_BITS.get(
+            mention.get("source_type"), 0
+        )
+
+    def add_all(self, mentions):
+        """Adds every mention of an iterable."""
+        for mention in mentions:
+            self.add(mention)
+
+    def arrays(self):
+        """
+        Returns:
+            dict: The CSR arrays of the index, keyed by INDEX_ARRAYS names.
+        """
+        edges = np.array(list(self._edges), dtype=np.int32).reshape(-1, 2)
+        sources = np.fromiter(self._edges.values(), dtype=np.uint8, count=len(edges))
+        drug_indptr, drug_order = _csr(edges[:, 0], edges[:, 1], len(self._drugs))
+        journal_indptr, journal_order = _csr(
+            edges[:, 1], edges[:, 0], len(self._journals)
+        )
+        return {
+            "drug_indptr": drug_indptr,
+            "drug_journals": edges[drug_order, 1],
+            "drug_sources": sources[drug_order],
+            "journal_indptr": journal_indptr,
+            "journal_drugs": edges[journal_order, 0],
+        }
+
+    def save(self, index_path, graph_path=None):
+        """
+        Writes the index to a directory: one .npy file per array and a small meta.json
+        holding the drug and journal names. The directory is replaced atomically.
+
+        Args:
+            index_path (str): The index directory.
+            graph_path (str): The graph file the index describes, recorded to detect stale indexes.
+        """
+        partial_path = index_path + ".partial"
+        shutil.rmtree(partial_path, ignore_errors=True)
+        os.makedirs(partial_path)
+        for name, array in self.arrays().items():
+            np.save(os.path.join(partial_path, name + ".npy"), array)
+        meta = {
+            "format": INDEX_FORMAT,
+            "version": INDEX_VERSION,
+            "mentions": self.count,
+            "graph": graph_fingerprint(graph_path) if graph_path else None,
+            "drugs": list(self._drugs),
+            "journals": list(self._journals),
+        }
+        with open(
+            os.path.join(partial_path, INDEX_META_FILE), "w", encoding="utf-8"
+        ) as f:
+            json.dump(meta, f, ensure_ascii=False)
+        shutil.rmtree(index_path, ignore_errors=True)
+        os.replace(partial_path, index_path)
+
+
+def _csr(rows, columns, row_count):
+    """Returns the row pointer and the edge order (by row, then column) of a CSR matrix."""
+    order = np.lexsort((columns, rows))
+    indptr = np.zeros(row_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=row_count), out=indptr[1:])
+    return indptr, order
+
+
+def build_graph_index(graph_data, graph_path, index_path=None):
+    """
+    Compiles the mentions of a graph file into its index.
+
+    Args:
+        graph_data (iterable): The mention records (e.g. from adhoc_analysis.load_graph_data).
+        graph_path (str): The graph file they were loaded from.
+        index_path (str): The index directory (default: next to the graph file).
+
+    Returns:
+        str: The index directory.
+    """
+    index_path = index_path or graph_index_path(graph_path)
+    builder = GraphIndexBuilder()
+    builder.add_all(graph_data)
+    builder.save(index_path, graph_path)
+    return index_path
+
+
+class GraphIndex:
+    """
+    Read-only view over a compiled index. The arrays are memory-mapped: opening the
+    index only parses the small meta.json, and queries read the pages they touch.
+    """
+
+    def __init__(self, index_path):
+        with open(
+            os.path.join(index_path, INDEX_META_FILE), "r", encoding="utf-8"
+        ) as f:
+            meta = json.load(f)
+        if meta.get("format") != INDEX_FORMAT or meta.get("version") != INDEX_VERSION:
+            raise ValueError(f"'{index_path}' is not a supported graph index.")
+        self.index_path = index_path
+        self.graph = meta["graph"]
+        self.drugs = meta["drugs"]
+        self.journals = meta["journals"]
+        for name in INDEX_ARRAYS:
+            setattr(
+                self,
+                name,
+                np.load(os.path.join(index_path, name + ".npy"), mmap_mode="r"),
+            )
+
+        # Drugs are related by their uppercase name (several spellings form one group)
+        self._drug_groups = {}
+        for drug_index, drug in enumerate(self.drugs):
+            self._drug_groups.setdefault(drug.upper(), []).append(drug_index)
+        self._journal_indexes = None  # built on the first journal lookup
+
+    def is_current(self, graph_path):
+        """True if the index was built from the current version of graph_path."""
+        try:
+            return self.graph == graph_fingerprint(graph_path)
+        except FileNotFoundError:
+            return False
+
+    def journal_drugs_of(self, journal_index):
+        return self.journal_drugs[
+            self.journal_indptr[journal_index] : self.journal_indptr[journal_index + 1]
+        ]
+
+    def _group_sources(self, drug_indexes):
+        """Bitmask of sources per journal, over the drugs of a group: dict journal index -> bits."""
+        sources = {}
+        for drug_index in drug_indexes:
+            start, end = self.drug_indptr[drug_index], self.drug_indptr[drug_index + 1]
+            for journal_index, bits in zip(
+                self.drug_journals[start:end].tolist(),
+                self.drug_sources[start:end].tolist(),
+            ):
+                sources[journal_index] = sources.get(journal_index, 0) | bits
+        return sources
+
+    def find_drug_journals(self, drug):
+        """
+        Journals mentioning a drug (matched by uppercase name), with their sources.
+
+        Returns:
+            dict: Journal name -> sorted list of source types, in journal order.
+                  Empty if the drug is not in the graph.
+        """
+        sources = self._group_sources(self._drug_groups.get(drug.upper(), []))
+        return {
+            self.journals[journal_index]: sorted(
+                source_type
+                for source_type, bit in SOURCE_BITS.items()
+                if sources[journal_index] & bit
+            )
+            for journal_index in sorted(sources)
+        }
+
+    def find_journal_drugs(self, journal):
+        """
+        Drugs mentioned by a journal (exact journal name).
+
+        Returns:
+            list: Drug names in drug order, or None if the journal is not in the graph.
+        """
+        if self._journal_indexes is None:
+            self._journal_indexes = {
+                name: journal_index for journal_index, name in enumerate(self.journals)
+            }
+        journal_index = self._journal_indexes.get(journal)
+        if journal_index is None:
+            return None
+        return [self.drugs[i] for i in self.journal_drugs_of(journal_index).tolist()]
+
+    def find_journal_with_most_different_drugs(self):
+        """
+        Index version of adhoc_analysis.find_journal_with_most_different_drugs.
+
+        Returns:
+            tuple: (Name of the journal, Number of different drugs) or (None, 0) if no data.
+        """
+        if not self.journals:
+            return None, 0
+        drug_counts = np.diff(self.journal_indptr)
+        best = int(np.argmax(drug_counts))  # first journal on ties
+        return self.journals[best], int(drug_counts[best])
+
+    def find_related_drugs_by_pubmed_journals(self, target_drug):
+        """
+        Index version of adhoc_analysis.find_related_drugs_by_pubmed_journals: the drugs
+        mentioned only by PubMed in a journal where the target drug is mentioned only by PubMed.
+
+        Returns:
+            set: A set of related drug names (capitalized).
+        """
+        if not target_drug:
+            return set()
+        target_drug_upper = target_drug.upper()
+        target_sources = self._group_sources(
+            self._drug_groups.get(target_drug_upper, [])
+        )
+        pubmed_only_journals = [
+            journal_index
+            for journal_index, bits in target_sources.items()
+            if bits == PUBMED_ONLY
+        ]
+
+        related_drugs = set()
+        for journal_index in pubmed_only_journals:
+            candidates = {
+                self.drugs[drug_index].upper()
+                for drug_index in self.journal_drugs_of(journal_index).tolist()
+            }
+            for drug_upper in candidates - {target_drug_upper} - related_drugs:
+                sources = self._group_sources(self._drug_groups[drug_upper])
+                if sources.get(journal_index, 0) == PUBMED_ONLY:
+                    related_drugs.add(drug_upper)
+        return {drug_upper.capitalize() for drug_upper in related_drugs}
+
+
+def open_graph_index(graph_path):
+    """
+    Opens the index of a graph file if it exists and is up to date.
+
+    Returns:
+        GraphIndex: The index, or None if it is missing or stale.
+    """
+    index_path = graph_index_path(graph_path)
+    if not os.path.exists(os.path.join(index_path, INDEX_META_FILE)):
+        return None
+    index = GraphIndex(index_path)
+    return index if index.is_current(graph_path) else None
+
+
+if __name__ == "__main__":
+    from analysis.adhoc_analysis import graph_json_path, load_graph_data
+
+    # Build step: compile a graph file (default: the JSON graph) into its index
+    graph_path = sys.argv[1] if len(sys.argv) > 1 else graph_json_path
+    graph_data = load_graph_data(graph_path)
+    if graph_data is None:
+        sys.exit(1)
+    index_path = build_graph_index(graph_data, graph_path)
+    print(f"Graph index saved to '{index_path}'")
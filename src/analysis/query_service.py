@@ -0,0 +1,276 @@
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from analysis.adhoc_analysis import graph_json_path, load_graph_data
+from analysis.drug_cooccurrence import find_all_related_drugs_by_pubmed_journals
+from analysis.graph_index import (
+    GraphIndex,
+    build_graph_index,
+    graph_fingerprint,
+    open_graph_index,
+)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+DEFAULT_CACHE_SIZE = 4096
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache of query results."""
+
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class GraphQueryService:
+    """
+    Answers the ad-hoc queries over a graph file loaded once. The graph is served from its
+    memory-mapped CSR index, and results are kept in an LRU cache. The graph file's
+    fingerprint (size and modification time) is checked on every query: when the pipeline
+    rewrites the graph, the index is reopened and the cache is cleared.
+
+    The service never writes next to the graph: when the pipeline's index is missing or
+    stale, the graph is compiled into a private temporary directory, removed by close().
+    """
+
+    def __init__(self, graph_path=graph_json_path, cache_size=DEFAULT_CACHE_SIZE):
+        self.graph_path = graph_path
+        self.cache = LRUCache(cache_size)
+        self._index = None
+        self._fingerprint = None
+        self._all_related_drugs = None  # (fingerprint, related drugs of every drug)
+        self._scratch_dir = None
+        self._lock = threading.Lock()
+        # Held while the related drugs of every drug are computed: the other queries
+        # (and the index checks, under _lock) are not blocked by it
+        self._related_drugs_lock = threading.Lock()
+
+    def _current_index(self):
+        """Returns (index, fingerprint) for the current version of the graph file."""
+        try:
+            fingerprint = graph_fingerprint(self.graph_path)
+        except FileNotFoundError:
+            raise LookupError(
+                f"The graph file '{self.graph_path}' was not found. Please ensure the main pipeline has been run."
+            )
+        with self._lock:
+            if fingerprint != self._fingerprint:
+                index = open_graph_index(self.graph_path)
+                if index is None:
+                    graph_data = load_graph_data(self.graph_path)
+                    if graph_data is None:
+                        raise LookupError(
+                            f"The graph file '{self.graph_path}' could not be loaded."
+                        )
+                    if self._scratch_dir is None:
+                        self._scratch_dir = tempfile.mkdtemp(prefix="graph-query-")
+                    index = GraphIndex(
+                        build_graph_index(
+                            graph_data,
+                            self.graph_path,
+                            os.path.join(self._scratch_dir, "index"),
+                        )
+                    )
+                self._index = index
+                self._fingerprint = fingerprint
+                self.cache.clear()
+            return self._index, self._fingerprint
+
+    def _cached(self, query, argument, compute):
+        index, fingerprint = self._current_index()
+        key = (fingerprint["size"], fingerprint["mtime_ns"], query, argument)
+        return self.cache.get_or_compute(key, lambda: compute(index, fingerprint))
+
+    def close(self):
+        """Removes the index compiled by the service, if any."""
+        with self._lock:
+            if self._scratch_dir is not None:
+                shutil.rmtree(self._scratch_dir, ignore_errors=True)
+                self._scratch_dir = None
+
+    def journal_with_most_drugs(self):
+        def compute(index, fingerprint):
+            journal, count = index.find_journal_with_most_different_drugs()
+            return {"journal": journal, "drug_count": count}
+
+        return self._cached("journal_with_most_drugs", None, compute)
+
+    def related_drugs(self, drug):
+        def compute(index, fingerprint):
+            # Computed for every drug at once: dashboards query many drugs in a row.
+            # Kept with the fingerprint of its index: a query still running on an older
+            # version of the graph never serves its result for the current one.
+            with self._related_drugs_lock:
+                if (
+                    self._all_related_drugs is None
+                    or self._all_related_drugs[0] != fingerprint
+                ):
+                    self._all_related_drugs = (
+                        fingerprint,
+                        find_all_related_drugs_by_pubmed_journals(index),
+                    )
+                all_related_drugs = self._all_related_drugs[1]
+            return {
+                "drug": drug_upper,
+                "related_drugs": sorted(all_related_drugs.get(drug_upper, set())),
+            }
+
+        # Results are cached by uppercase name: they echo it, not the caller's casing
+        drug_upper = drug.upper()
+        return self._cached("related_drugs", drug_upper, compute)
+
+    def drug(self, drug):
+        def compute(index, fingerprint):
+            journals = index.find_drug_journals(drug_upper)
+            if not journals:
+                return None
+            return {
+                "drug": drug_upper,
+                "journals": [
+                    {"journal": journal, "source_types": source_types}
+                    for journal, source_types in journals.items()
+                ],
+            }
+
+        drug_upper = drug.upper()
+        return self._cached("drug", drug_upper, compute)
+
+    def journal(self, journal):
+        def compute(index, fingerprint):
+            drugs = index.find_journal_drugs(journal)
+            if drugs is None:
+                return None
+            return {"journal": journal, "drugs": drugs}
+
+        return self._cached("journal", journal, compute)
+
+    def status(self):
+        index, fingerprint = self._current_index()
+        return {
+            "graph": self.graph_path,
+            "fingerprint": fingerprint,
+            "drugs": len(index.drugs),
+            "journals": len(index.journals),
+            "cache": {
+                "size": len(self.cache),
+                "hits": self.cache.hits,
+                "misses": self.cache.misses,
+            },
+        }
+
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON endpoints:
+        GET /journal-most-drugs
+        GET /related-drugs?drug=<name>
+        GET /drug/<name>
+        GET /journal/<name>
+        GET /status
+    """
+
+    service = None  # set by make_server
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path = url.path.rstrip("/")
+        try:
+            if path == "/journal-most-drugs":
+                return self._send(200, self.service.journal_with_most_drugs())
+            if path == "/related-drugs":
+                drug = parse_qs(url.query).get("drug", [""])[0]
+                if not drug:
+                    return self._send(400, {"error": "Missing 'drug' parameter."})
+                return self._send(200, self.service.related_drugs(drug))
+            if path.startswith("/drug/"):
+                drug = unquote(path[len("/drug/") :])
+                return self._send_found(self.service.drug(drug), f"drug '{drug}'")
+            if path.startswith("/journal/"):
+                journal = unquote(path[len("/journal/") :])
+                return self._send_found(
+                    self.service.journal(journal), f"journal '{journal}'"
+                )
+            if path == "/status":
+                return self._send(200, self.service.status())
+            return self._send(404, {"error": f"Unknown endpoint '{url.path}'."})
+        except LookupError as e:
+            return self._send(503, {"error": str(e)})
+
+    def _send_found(self, result, description):
+        if result is None:
+            return self._send(404, {"error": f"No mentions of {description}."})
+        return self._send(200, result)
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # one line per request would flood the console
+
+
+def make_server(
+    service, host=DEFAULT_HOST, port=DEFAULT_PORT, handler=QueryRequestHandler
+):
+    """Returns a threaded HTTP server answering queries with the given GraphQueryService."""
+    handler_class = type("BoundQueryRequestHandler", (handler,), {"service": service})
+    return ThreadingHTTPServer((host, port), handler_class)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Local HTTP query service over the mentions graph."
+    )
+    parser.add_argument("graph_file", nargs="?", default=graph_json_path)
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE)
+    args = parser.parse_args()
+
+    service = GraphQueryService(os.path.abspath(args.graph_file), args.cache_size)
+    server = make_server(service, args.host, args.port)
+    print(f"Serving '{service.graph_path}' on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
@@ -0,0 +1,264 @@
+import argparse
+import csv
+import os
+import sqlite3
+import sys
+import time
+
+# Variables
+current_script_directory = os.path.dirname(__file__)
+project_root = os.path.abspath(os.path.join(current_script_directory, "..", ".."))
+sql_dir = os.path.join(project_root, "sql")
+
+QUERY_NAMES = ("daily_sales", "sales_categorisation")
+DEFAULT_BATCH_SIZE = 50_000
+
+TABLES = {
+    "transactions": (
+        ("date", "TEXT"),
+        ("order_id", "INTEGER"),
+        ("client_id", "INTEGER"),
+        ("prod_id", "INTEGER"),
+        ("prod_price", "REAL"),
+        ("prod_qty", "INTEGER"),
+    ),
+    "product_nomenclature": (
+        ("product_id", "INTEGER"),
+        ("product_type", "TEXT"),
+        ("product_name", "TEXT"),
+    ),
+}
+
+# Covering indexes: every column a query reads is in the index, so the table itself is
+# never visited. The date index serves the date range of both queries (and the GROUP BY
+# date of daily_sales, in index order); the prod_id ones serve the product join.
+INDEXES = {
+    "idx_transactions_date": (
+        "transactions",
+        ("date", "client_id", "prod_id", "prod_price", "prod_qty"),
+    ),
+    "idx_transactions_prod_id": (
+        "transactions",
+        ("prod_id", "date", "client_id", "prod_price", "prod_qty"),
+    ),
+    "idx_product_nomenclature_product_id": (
+        "product_nomenclature",
+        ("product_id", "product_type"),
+    ),
+}
+
+
+def load_sql_query(query_name):
+    """
+    Loads a query of the sql/ folder.
+
+    Args:
+        query_name (str): The file name, without '.sql' (e.g. 'daily_sales').
+
+    Returns:
+        str: The SQL text.
+    """
+    with open(os.path.join(sql_dir, f"{query_name}.sql"), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def create_tables(conn):
+    """Creates the transactions and product_nomenclature tables (without indexes)."""
+    for table, columns in TABLES.items():
+        definition = ", ".join(f"{name} {sql_type}" for name, sql_type in columns)
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({definition})")
+
+
+def create_indexes(conn):
+    """Creates the covering indexes, then collects the statistics the planner relies on."""
+    for index, (table, columns) in INDEXES.items():
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {index} ON {table} ({', '.join(columns)})"
+        )
+    conn.execute("ANALYZE")
+
+
+def insert_csv(conn, table, csv_path, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Inserts the rows of a CSV file into a table with executemany, batch_size rows at a time,
+    in the caller's transaction. The header must name the table's columns (in any order).
+    Values are inserted as read: the column types convert the numbers.
+
+    Returns:
+        int: The number of rows inserted.
+    """
+    with open(csv_path, "r", encoding="utf-8", newline="") as f:
+        rows = csv.reader(f)
+        header = [column.strip() for column in next(rows, [])]
+        expected = [name for name, _ in TABLES[table]]
+        if sorted(header) != sorted(expected):
+            raise ValueError(
+                f"{csv_path}: expected the columns {expected} of '{table}', got {header}"
+            )
+        statement = (
+            f"INSERT INTO {table} ({', '.join(header)}) "
+            f"VALUES ({', '.join('?' * len(header))})"
+        )
+        inserted = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == batch_size:
+                conn.executemany(statement, batch)
+                inserted += len(batch)
+                batch = []
+        if batch:
+            conn.executemany(statement, batch)
+            inserted += len(batch)
+    return inserted
+
+
+def load_database(
+    transactions_csv,
+    product_nomenclature_csv,
+    db_path=":memory:",
+    indexes=True,
+    batch_size=DEFAULT_BATCH_SIZE,
+):
+    """
+    Bulk-loads the two CSV files into a SQLite database in a single transaction, then
+    creates the covering indexes (building them once the rows are in is faster than
+    maintaining them row by row).
+
+    Args:
+        transactions_csv (str): CSV with the columns of the transactions table.
+        product_nomenclature_csv (str): CSV with the columns of product_nomenclature.
+        db_path (str): Database file, in memory by default. Its tables must not exist yet.
+        indexes (bool): False to leave the tables without indexes (e.g. for comparison).
+        batch_size (int): Rows per executemany call.
+
+    Returns:
+        sqlite3.Connection: The loaded database.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            create_tables(conn)
+            for table, csv_path in (
+                ("transactions", transactions_csv),
+                ("product_nomenclature", product_nomenclature_csv),
+            ):
+                inserted = insert_csv(conn, table, csv_path, batch_size)
+                print(f"Loaded {inserted} rows into '{table}' from {csv_path}")
+        if indexes:
+            with conn:
+                create_indexes(conn)
+    except Exception:
+        conn.close()
+        raise
+    return conn
+
+
+def query_plan(conn, sql):
+    """
+    Returns the plan SQLite chose for a query.
+
+    Returns:
+        list: The 'detail' lines of EXPLAIN QUERY PLAN (e.g. 'SEARCH transactions USING
+              COVERING INDEX idx_transactions_date (date>? AND date<?)').
+    """
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def is_index_driven(plan):
+    """True if no step of a query plan scans a whole table instead of using an index."""
+    return not any(step.startswith("SCAN ") and "INDEX" not in step for step in plan)
+
+
+def run_query(conn, query_name):
+    """
+    Runs a query of the sql/ folder and reports how it ran.
+
+    Returns:
+        dict: "query" name, "plan" (see query_plan), "index_driven" (see is_index_driven),
+              "seconds" to fetch every row, and the "rows".
+    """
+    sql = load_sql_query(query_name)
+    plan = query_plan(conn, sql)
+    start = time.perf_counter()
+    rows = conn.execute(sql).fetchall()
+    seconds = time.perf_counter() - start
+    return {
+        "query": query_name,
+        "plan": plan,
+        "index_driven": is_index_driven(plan),
+        "seconds": seconds,
+        "rows": rows,
+    }
+
+
+def print_report(report, max_rows=10):
+    print(
+        f"\n--- {report['query']}: {len(report['rows'])} rows in {report['seconds']:.3f}s ---"
+    )
+    print("Query plan:")
+    for step in report["plan"]:
+        print(f"  {step}")
+    if not report["index_driven"]:
+        print("  WARNING: a table is scanned without an index.")
+    for row in report["rows"][:max_rows]:
+        print(f"  {row}")
+    if len(report["rows"]) > max_rows:
+        print(f"  ... ({len(report['rows']) - max_rows} more)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Loads sales CSV files into SQLite and runs the queries of sql/."
+    )
+    parser.add_argument("transactions_csv")
+    parser.add_argument("product_nomenclature_csv")
+    parser.add_argument(
+        "--db",
+        default=":memory:",
+        help="SQLite database file to create (default: in memory).",
+    )
+    parser.add_argument(
+        "--query",
+        choices=QUERY_NAMES,
+        action="append",
+        help="Query to run (repeatable; default: all of them).",
+    )
+    parser.add_argument(
+        "--no-indexes",
+        action="store_true",
+        help="Do not create the covering indexes (to compare the plans and timings).",
+    )
+    parser.add_argument(
+        "--rollups",
+        action="store_true",
+        help="Also create the rollup tables and answer each query from them.",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        conn = load_database(
+            args.transactions_csv,
+            args.product_nomenclature_csv,
+            db_path=args.db,
+            indexes=not args.no_indexes,
+        )
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"Failed to load the database: {e}")
+        sys.exit(1)
+    print(f"Database ready in {time.perf_counter() - start:.3f}s")
+
+    query_names = list(args.query or QUERY_NAMES)
+    if args.rollups:
+        # Run as a script: the modules of the src/ directory are imported as packages
+        sys.path.insert(0, os.path.join(project_root, "src"))
+        from analysis.sales_rollups import create_rollups
+
+        start = time.perf_counter()
+        create_rollups(conn)
+        print(f"Rollups ready in {time.perf_counter() - start:.3f}s")
+        query_names += [f"{query_name}_rollup" for query_name in query_names]
+    for query_name in query_names:
+        print_report(run_query(conn, query_name))
+    conn.close()
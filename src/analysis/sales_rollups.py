@@ -0,0 +1,231 @@
+ROLLUP_QUERY_NAMES = ("daily_sales_rollup", "sales_categorisation_rollup")
+
+# Aggregates maintained alongside transactions and product_nomenclature. Each row counts the
+# transactions it sums, so that it is removed when the last of them is deleted: the reports
+# then list the same dates and clients as the queries on the transactions. It also counts
+# the transactions with a price and quantity ('priced'): ventes is their sum, and the reports
+# return NULL when there are none, like SUM over the transactions.
+# Dates are expected as 'YYYY-MM-DD' text, like the date ranges of the sql/ queries.
+ROLLUP_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS daily_sales_rollup (
+        date TEXT PRIMARY KEY,
+        ventes REAL NOT NULL,
+        transactions INTEGER NOT NULL,
+        priced INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS client_sales_rollup (
+        sales_year TEXT,
+        client_id INTEGER,
+        product_type TEXT,
+        ventes REAL NOT NULL,
+        transactions INTEGER NOT NULL,
+        priced INTEGER NOT NULL,
+        PRIMARY KEY (sales_year, client_id, product_type)
+    )
+    """,
+)
+
+# Per-transaction changes, for the NEW or OLD row of a trigger. A transaction counts once per
+# matching product_nomenclature row, like in the join of sales_categorisation.sql.
+ADD_TRANSACTION = """
+    INSERT INTO daily_sales_rollup (date, ventes, transactions, priced)
+    VALUES (
+        {row}.date,
+        ifnull({row}.prod_price * {row}.prod_qty, 0),
+        1,
+        {row}.prod_price * {row}.prod_qty IS NOT NULL
+    )
+    ON CONFLICT (date) DO UPDATE SET
+        ventes = ventes + excluded.ventes,
+        transactions = transactions + 1,
+        priced = priced + excluded.priced;
+    INSERT INTO client_sales_rollup
+        (sales_year, client_id, product_type, ventes, transactions, priced)
+    SELECT
+        substr({row}.date, 1, 4),
+        {row}.client_id,
+        ifnull(pn.product_type, ''),
+        ifnull({row}.prod_price * {row}.prod_qty, 0),
+        1,
+        {row}.prod_price * {row}.prod_qty IS NOT NULL
+    FROM product_nomenclature AS pn
+    WHERE pn.product_id = {row}.prod_id
+    ON CONFLICT (sales_year, client_id, product_type) DO UPDATE SET
+        ventes = ventes + excluded.ventes,
+        transactions = transactions + excluded.transactions,
+        priced = priced + excluded.priced;
+"""
+REMOVE_TRANSACTION = """
+    UPDATE daily_sales_rollup SET
+        ventes = ventes - ifnull({row}.prod_price * {row}.prod_qty, 0),
+        transactions = transactions - 1,
+        priced = priced - ({row}.prod_price * {row}.prod_qty IS NOT NULL)
+    WHERE date = {row}.date;
+    DELETE FROM daily_sales_rollup WHERE date = {row}.date AND transactions <= 0;
+    UPDATE client_sales_rollup SET
+        ventes = ventes - ifnull({row}.prod_price * {row}.prod_qty, 0) * matches.products,
+        transactions = transactions - matches.products,
+        priced = priced
+            - ({row}.prod_price * {row}.prod_qty IS NOT NULL) * matches.products
+    FROM (
+        SELECT ifnull(product_type, '') AS product_type, COUNT(*) AS products
+        FROM product_nomenclature
+        WHERE product_id = {row}.prod_id
+        GROUP BY 1
+    ) AS matches
+    WHERE client_sales_rollup.sales_year = substr({row}.date, 1, 4)
+        AND client_sales_rollup.client_id = {row}.client_id
+        AND client_sales_rollup.product_type = matches.product_type;
+    DELETE FROM client_sales_rollup
+    WHERE sales_year = substr({row}.date, 1, 4)
+        AND client_id = {row}.client_id
+        AND transactions <= 0;
+"""
+
+# Per-product changes: the transactions of the product move in or out of its product_type
+ADD_PRODUCT = """
+    INSERT INTO client_sales_rollup
+        (sales_year, client_id, product_type, ventes, transactions, priced)
+    SELECT
+        substr(date, 1, 4),
+        client_id,
+        ifnull({row}.product_type, ''),
+        SUM(ifnull(prod_price * prod_qty, 0)),
+        COUNT(*),
+        COUNT(prod_price * prod_qty)
+    FROM transactions
+    WHERE prod_id = {row}.product_id AND date IS NOT NULL
+    GROUP BY 1, 2
+    ON CONFLICT (sales_year, client_id, product_type) DO UPDATE SET
+        ventes = ventes + excluded.ventes,
+        transactions = transactions + excluded.transactions,
+        priced = priced + excluded.priced;
+"""
+REMOVE_PRODUCT = """
+    UPDATE client_sales_rollup SET
+        ventes = client_sales_rollup.ventes - sales.ventes,
+        transactions = client_sales_rollup.transactions - sales.transactions,
+        priced = client_sales_rollup.priced - sales.priced
+    FROM (
+        SELECT
+            substr(date, 1, 4) AS sales_year,
+            client_id,
+            SUM(ifnull(prod_price * prod_qty, 0)) AS ventes,
+            COUNT(*) AS transactions,
+            COUNT(prod_price * prod_qty) AS priced
+        FROM transactions
+        WHERE prod_id = {row}.product_id AND date IS NOT NULL
+        GROUP BY 1, 2
+    ) AS sales
+    WHERE client_sales_rollup.sales_year = sales.sales_year
+        AND client_sales_rollup.client_id = sales.client_id
+        AND client_sales_rollup.product_type = ifnull({row}.product_type, '');
+    DELETE FROM client_sales_rollup WHERE transactions <= 0;
+"""
+
+# Trigger name -> (event, WHEN condition or None, changes)
+TRIGGERS = {
+    "transactions_rollup_insert": (
+        "INSERT ON transactions",
+        "NEW.date IS NOT NULL",
+        [ADD_TRANSACTION.format(row="NEW")],
+    ),
+    "transactions_rollup_delete": (
+        "DELETE ON transactions",
+        "OLD.date IS NOT NULL",
+        [REMOVE_TRANSACTION.format(row="OLD")],
+    ),
+    "transactions_rollup_update_old": (
+        "UPDATE ON transactions",
+        "OLD.date IS NOT NULL",
+        [REMOVE_TRANSACTION.format(row="OLD")],
+    ),
+    "transactions_rollup_update_new": (
+        "UPDATE ON transactions",
+        "NEW.date IS NOT NULL",
+        [ADD_TRANSACTION.format(row="NEW")],
+    ),
+    "product_nomenclature_rollup_insert": (
+        "INSERT ON product_nomenclature",
+        None,
+        [ADD_PRODUCT.format(row="NEW")],
+    ),
+    "product_nomenclature_rollup_delete": (
+        "DELETE ON product_nomenclature",
+        None,
+        [REMOVE_PRODUCT.format(row="OLD")],
+    ),
+    "product_nomenclature_rollup_update": (
+        "UPDATE ON product_nomenclature",
+        None,
+        [REMOVE_PRODUCT.format(row="OLD"), ADD_PRODUCT.format(row="NEW")],
+    ),
+}
+
+REBUILD_ROLLUPS = (
+    "DELETE FROM daily_sales_rollup",
+    """
+    INSERT INTO daily_sales_rollup (date, ventes, transactions, priced)
+    SELECT
+        date,
+        SUM(ifnull(prod_price * prod_qty, 0)),
+        COUNT(*),
+        COUNT(prod_price * prod_qty)
+    FROM transactions
+    WHERE date IS NOT NULL
+    GROUP BY date
+    """,
+    "DELETE FROM client_sales_rollup",
+    """
+    INSERT INTO client_sales_rollup
+        (sales_year, client_id, product_type, ventes, transactions, priced)
+    SELECT
+        substr(t.date, 1, 4),
+        t.client_id,
+        ifnull(pn.product_type, ''),
+        SUM(ifnull(t.prod_price * t.prod_qty, 0)),
+        COUNT(*),
+        COUNT(t.prod_price * t.prod_qty)
+    FROM transactions AS t
+    INNER JOIN product_nomenclature AS pn ON t.prod_id = pn.product_id
+    WHERE t.date IS NOT NULL
+    GROUP BY 1, 2, 3
+    """,
+)
+
+
+def trigger_statement(name):
+    """Returns the CREATE TRIGGER statement of a trigger of TRIGGERS."""
+    event, condition, changes = TRIGGERS[name]
+    when = f" WHEN {condition}" if condition else ""
+    return (
+        f"CREATE TRIGGER IF NOT EXISTS {name} AFTER {event}{when}\n"
+        f"BEGIN{''.join(changes)}END"
+    )
+
+
+def create_rollups(conn):
+    """
+    Creates the rollup tables of the sales reports, fills them from the rows already loaded,
+    and creates the triggers keeping them up to date: every later insert, delete or update
+    of transactions or product_nomenclature adjusts the affected rollup rows only.
+    Creating the rollups once the bulk of the data is loaded is faster than going through
+    the triggers row by row.
+
+    The reports are then answered from the rollups (see ROLLUP_QUERY_NAMES) in time
+    proportional to the number of days or clients instead of transactions.
+
+    Args:
+        conn (sqlite3.Connection): Database with the transactions and product_nomenclature
+                                   tables (see sales_queries.create_tables).
+    """
+    with conn:
+        for statement in ROLLUP_TABLES:
+            conn.execute(statement)
+        for statement in REBUILD_ROLLUPS:
+            conn.execute(statement)
+        for name in TRIGGERS:
+            conn.execute(trigger_statement(name))
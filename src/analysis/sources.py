@@ -0,0 +1,5 @@
+# Source bitmask of a drug -> journal pair: the bits of the source types of its mentions
+# (other source types have none)
+SOURCE_BITS = {"pubmed": 1, "clinical_trial": 2}
+# A pair is PubMed-only when its bitmask is exactly this one
+PUBMED_ONLY = SOURCE_BITS["pubmed"]
@@ -0,0 +1,197 @@
+import itertools
+import json
+from collections import defaultdict
+
+from analysis.sources import PUBMED_ONLY, SOURCE_BITS
+from data_output.graph_reader import (
+    NormalizedGraph,
+    is_ndjson_graph,
+    iter_graph_records,
+)
+from data_ingestion.json_stream import iter_json_array
+
+# Registered aggregations, by name (see register_aggregation)
+AGGREGATIONS = {}
+
+
+def register_aggregation(name):
+    """
+    Class decorator registering an aggregation under a name. An aggregation is fed every
+    mention record once, by update(mention), and gives its answer by result(). It should
+    only keep state per distinct key (drug, journal...), never per mention.
+    """
+
+    def register(cls):
+        AGGREGATIONS[name] = cls
+        return cls
+
+    return register
+
+
+def create_aggregation(name, **params):
+    """
+    Instantiates a registered aggregation with its parameters.
+
+    Raises:
+        ValueError: If no aggregation is registered under this name.
+    """
+    if name not in AGGREGATIONS:
+        raise ValueError(
+            f"Unknown aggregation '{name}' (registered: {', '.join(sorted(AGGREGATIONS))})"
+        )
+    return AGGREGATIONS[name](**params)
+
+
+@register_aggregation("journal_with_most_drugs")
+class JournalWithMostDrugs:
+    """
+    Journal mentioning the most different drugs (ties: first journal seen), the answer of
+    adhoc_analysis.find_journal_with_most_different_drugs. Holds the distinct drugs of
+    each journal.
+    """
+
+    def __init__(self):
+        self.journal_drugs = defaultdict(set)
+
+    def update(self, mention):
+        journal = mention.get("journal")
+        drug = mention.get("drug")
+        if journal and drug:
+            self.journal_drugs[journal].add(drug)
+
+    def result(self):
+        """
+        Returns:
+            tuple: (Name of the journal, Number of different drugs) or (None, 0) if no data.
+        """
+        journal, count = None, 0
+        for candidate, drugs in self.journal_drugs.items():
+            if len(drugs) > count:
+                journal, count = candidate, len(drugs)
+        return journal, count
+
+
+@register_aggregation("related_drugs")
+class RelatedDrugs:
+    """
+    Drugs sharing a PubMed-only journal with a target drug, the answer of
+    adhoc_analysis.find_related_drugs_by_pubmed_journals. A journal is PubMed-only for a
+    drug when the drug's mentions in it come from PubMed and not from clinical trials.
+    Holds the source bitmask of each distinct drug -> journal pair.
+    """
+
+    def __init__(self, target_drug):
+        self.target_drug = target_drug
+        self.drug_journal_sources = defaultdict(dict)  # drug -> journal -> bitmask
+
+    def update(self, mention):
+        drug = mention.get("drug")
+        journal = mention.get("journal")
+        source_type = mention.get("source_type")
+        if drug and journal and source_type:
+            journals = self.drug_journal_sources[drug.upper()]
+            journals[journal] = journals.get(journal, 0) | SOURCE_BITS.get(
+                source_type, 0
+            )
+
+    def result(self):
+        """
+        Returns:
+            set: The related drug names, capitalized.
+        """
+        if not self.target_drug:
+            return set()
+        target_drug_upper = self.target_drug.upper()
+        target_journals = {
+            journal
+            for journal, bits in self.drug_journal_sources.get(
+                target_drug_upper, {}
+            ).items()
+            if bits == PUBMED_ONLY
+        }
+        return {
+            drug.capitalize()
+            for drug, journals in self.drug_journal_sources.items()
+            if drug != target_drug_upper
+            and any(journals.get(journal) == PUBMED_ONLY for journal in target_journals)
+        }
+
+
+def run_aggregations(records, aggregations):
+    """
+    Feeds every mention record to all the aggregations in a single pass.
+
+    Args:
+        records (iterable): The mention records (e.g. iter_mention_records(graph_path)).
+        aggregations (dict): Aggregation instances, by result name.
+
+    Returns:
+        dict: The result of each aggregation, by result name.
+    """
+    updates = [aggregation.update for aggregation in aggregations.values()]
+    for mention in records:
+        for update in updates:
+            update(mention)
+    return {name: aggregation.result() for name, aggregation in aggregations.items()}
+
+
+def iter_mention_records(file_path):
+    """
+    Streams the mention records of a graph file in any output format. NDJSON graphs are
+    read one line at a time and JSON arrays one element at a time, so memory does not
+    depend on the number of mentions. Normalized graphs are loaded (their node tables are
+    needed to resolve the edges), then expanded one record at a time.
+
+    Yields:
+        dict: A mention record.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        json.JSONDecodeError: If the file is not a well-formed graph.
+    """
+    if is_ndjson_graph(file_path):
+        yield from iter_graph_records(file_path)
+        return
+    with open(file_path, "r", encoding="utf-8") as f:
+        first = f.read(1)
+        while first.isspace():
+            first = f.read(1)
+        if first != "{":
+            f.seek(0)
+            yield from iter_json_array(f)
+            return
+        f.seek(0)
+        data = json.load(f)
+    if not NormalizedGraph.is_normalized(data):
+        raise json.JSONDecodeError(
+            "Expected a mention array or a normalized graph", "", 0
+        )
+    yield from NormalizedGraph(data)
+
+
+def analyze_graph_file(file_path, aggregations):
+    """
+    Runs the aggregations in a single streaming pass over a graph file. Errors are
+    reported like adhoc_analysis.load_graph_data.
+
+    Returns:
+        dict: The result of each aggregation, by result name, or None if the file could
+              not be read.
+    """
+    records = iter_mention_records(file_path)
+    try:
+        first = next(records, None)
+        if first is None:
+            print(f"Warning: The file '{file_path}' is empty. No data to analyze.")
+            return run_aggregations([], aggregations)
+        return run_aggregations(itertools.chain([first], records), aggregations)
+    except FileNotFoundError:
+        print(
+            f"Error: The file '{file_path}' was not found. Please ensure the main pipeline has been run."
+        )
+        return None
+    except json.JSONDecodeError as e:
+        print(
+            f"Error: Could not decode JSON from '{file_path}'. The file might be corrupted or empty. Details: {e}"
+        )
+        return None
@@ -0,0 +1,123 @@
+import argparse
+import os
+import sys
+
+# Only the standard library is imported here: each command imports what it needs when it
+# runs, so that the light ones (e.g. analyze) start without loading pandas.
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCHMARKS_DIR = os.path.join(os.path.dirname(SRC_DIR), "benchmarks")
+DEFAULT_GRAPH_PATH = "./data/output/drug_journal_mentions_graph.json"
+
+# Commands forwarding their options to another parser: their --help is that parser's
+FORWARDING_COMMANDS = ("run", "bench")
+
+
+def run_command(args, options):
+    """Runs the pipeline, with the options of src/main.py."""
+    import main as pipeline
+
+    pipeline.main(options)
+    return 0
+
+
+def analyze_command(args, options):
+    """Runs the ad-hoc analyses of a graph file (pure Python, NumPy only with an index)."""
+    from analysis.adhoc_analysis import run_adhoc_analyses
+
+    def open_index(graph_path):
+        # The index directory is next to the graph (see graph_index.graph_index_path):
+        # NumPy is only imported when there is one to open
+        if args.no_index or not os.path.isdir(graph_path + ".index"):
+            return None
+        from analysis.graph_index import open_graph_index
+
+        return open_graph_index(graph_path)
+
+    return 0 if run_adhoc_analyses(args.graph, open_index, args.drug) else 1
+
+
+def bench_command(args, options):
+    """Runs the pipeline benchmarks, with the options of benchmarks/run_benchmarks.py."""
+    sys.path.insert(0, BENCHMARKS_DIR)
+    import run_benchmarks
+
+    run_benchmarks.main(options)
+    return 0
+
+
+def validate_command(args, options):
+    """Checks that the raw input files can be processed, without writing anything."""
+    import main as pipeline
+
+    pipeline.configure_paths(raw_dir=args.raw_dir)
+    return 0 if pipeline.validate_inputs(args.pubmed_input) else 1
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="cli.py", description="Drug-journal mentions pipeline and analyses."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser(
+        "run",
+        add_help=False,
+        help="Run the pipeline (options of src/main.py, e.g. --streaming; see run --help).",
+    )
+    run.set_defaults(handler=run_command)
+
+    analyze = commands.add_parser("analyze", help="Run the ad-hoc analyses of a graph.")
+    analyze.add_argument(
+        "--graph",
+        default=DEFAULT_GRAPH_PATH,
+        help=f"Graph file, in any output format (default: '{DEFAULT_GRAPH_PATH}').",
+    )
+    analyze.add_argument(
+        "--drug",
+        default="BETAMETHASONE",
+        help="Target drug of the related drugs analysis.",
+    )
+    analyze.add_argument(
+        "--no-index",
+        action="store_true",
+        help="Read the graph file even if its compiled index is up to date.",
+    )
+    analyze.set_defaults(handler=analyze_command)
+
+    bench = commands.add_parser(
+        "bench",
+        add_help=False,
+        help="Run the pipeline benchmarks (options of benchmarks/run_benchmarks.py).",
+    )
+    bench.set_defaults(handler=bench_command)
+
+    validate = commands.add_parser(
+        "validate", help="Check the raw input files without running the pipeline."
+    )
+    validate.add_argument("--raw-dir", help="Directory of the raw input files.")
+    validate.add_argument(
+        "--pubmed-input",
+        action="append",
+        metavar="PATH",
+        help="PubMed CSV or JSON file replacing the default ones (repeatable).",
+    )
+    validate.set_defaults(handler=validate_command)
+    return parser
+
+
+def main(argv=None):
+    """
+    Entry point: `python src/cli.py {run,analyze,bench,validate} [options]`.
+
+    Returns:
+        int: The exit status.
+    """
+    parser = build_parser()
+    args, options = parser.parse_known_args(argv)
+    if options and args.command not in FORWARDING_COMMANDS:
+        parser.error(f"unrecognized arguments: {' '.join(options)}")
+    return args.handler(args, options)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
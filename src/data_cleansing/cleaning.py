@@ -0,0 +1,54 @@
+from data_cleansing import date_parser
+from utils.utils import (
+    clean_and_validate_frame,
+    is_atccode_multi_level_column,
+    is_nct_number_column,
+)
+
+# Text fields corrected for skipped UTF-8 hex sequences, per source
+TEXT_COLUMNS_TO_CLEAN = {
+    "drugs": ["drug"],
+    "pubmed": ["title", "journal"],
+    "clinical_trials": ["scientific_title", "journal"],
+}
+
+# Identifier validation rules (rule_name, column, column_validator), per source
+VALIDATION_RULES = {
+    "drugs": [("invalid_atccode", "atccode", is_atccode_multi_level_column)],
+    "pubmed": [],
+    "clinical_trials": [("invalid_nct_number", "id", is_nct_number_column)],
+}
+
+
+def clean_and_validate_source(df, source):
+    """
+    Removes skipped '\\xYY' hex sequences from the text columns of a source and drops
+    the rows with an invalid identifier, in one combined pass.
+
+    Args:
+        df (pd.DataFrame): The raw data of the source.
+        source (str): "drugs", "pubmed" or "clinical_trials".
+
+    Returns:
+        tuple: (cleaned DataFrame, dict of rejected row counts per validation rule)
+    """
+    return clean_and_validate_frame(
+        df, TEXT_COLUMNS_TO_CLEAN[source], VALIDATION_RULES[source]
+    )
+
+
+def standardize_dates(df, compact=False):
+    """
+    Standardizes the 'date' column to 'YYYY-MM-DD' (None when unparseable), in place.
+
+    Args:
+        df (pd.DataFrame): The publications.
+        compact (bool): Store the dates as datetime64 (NaT when unparseable) instead of strings.
+
+    Returns:
+        pd.DataFrame: The DataFrame with standardized dates.
+    """
+    df["date"] = date_parser.standardize_date_column(df["date"])
+    if compact:
+        df["date"] = date_parser.to_datetime_column(df["date"])
+    return df
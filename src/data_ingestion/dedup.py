@@ -0,0 +1,196 @@
+import os
+import pickle
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_PARTITIONS = 64
+DEFAULT_CHUNK_SIZE = 10_000
+
+# Bookkeeping columns of the spilled rows (dropped from the output)
+SEQUENCE_COLUMN = "_dedup_sequence"
+KEYED_COLUMN = "_dedup_keyed"
+
+
+def is_empty_key(values):
+    """Mask of the missing or blank keys (NaN, None, '' or whitespace)."""
+    return values.isna() | values.astype(str).str.strip().eq("")
+
+
+def iter_deduplicated_chunks(
+    chunks,
+    key="id",
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    partitions=DEFAULT_PARTITIONS,
+    spill_dir=None,
+    stats=None,
+):
+    """
+    De-duplicates a stream of DataFrames on a key column with bounded memory, keeping the
+    first occurrence of each key like drop_duplicates(subset=[key], keep="first") on their
+    concatenation, and yields the kept rows in their original order.
+
+    1. Every row gets a global sequence number and is spilled to one of `partitions` files
+       on local disk, chosen by a hash of its key: all the copies of a key are in one file.
+    2. Each partition is loaded alone (about 1/partitions of the data) and de-duplicated.
+    3. The partitions, each sorted by sequence number, are merged back in input order.
+
+    Rows with an empty key (missing or blank) are never duplicates of each other: they are
+    all kept. Keys are compared as text (the JSON id 9 and the CSV id "9" are the same),
+    and are returned as text, empty keys as ''.
+
+    Args:
+        chunks (iterable): DataFrames, in input order (e.g. file after file).
+        key (str): Key column. Rows of chunks without it have an empty key.
+        chunk_size (int): Rows per spilled frame and per yielded DataFrame.
+        partitions (int): Number of spill files; memory scales with the input size / partitions.
+        spill_dir (str): Directory of the spill files (default: the system temporary directory).
+                         They are removed when the generator finishes or is closed.
+        stats (dict): If given, receives the "rows_in", "rows_out" and "duplicates" counts.
+
+    Yields:
+        pd.DataFrame: The next rows kept, with the columns of every input in order of appearance.
+    """
+    with tempfile.TemporaryDirectory(prefix="dedup-", dir=spill_dir) as work_dir:
+        columns, rows_in = _spill_partitions(
+            chunks, key, chunk_size, partitions, work_dir
+        )
+        rows_out = 0
+        for partition in range(partitions):
+            rows_out += _deduplicate_partition(
+                _partition_path(work_dir, partition), key, chunk_size
+            )
+        if stats is not None:
+            stats.update(
+                rows_in=rows_in, rows_out=rows_out, duplicates=rows_in - rows_out
+            )
+
+        partition_frames = [
+            _iter_frames(_partition_path(work_dir, partition) + ".dedup")
+            for partition in range(partitions)
+        ]
+        for merged in _merge_by_sequence(partition_frames):
+            merged = merged.drop(columns=[SEQUENCE_COLUMN, KEYED_COLUMN])
+            merged = merged.reindex(columns=columns).reset_index(drop=True)
+            for start in range(0, len(merged), chunk_size):
+                yield merged.iloc[start : start + chunk_size]
+
+
+def _partition_path(work_dir, partition):
+    return os.path.join(work_dir, f"partition-{partition:04d}.pkl")
+
+
+def _spill_partitions(chunks, key, chunk_size, partitions, work_dir):
+    """Spills the rows to their partition file. Returns (columns in order, rows read)."""
+    columns = []
+    sequence = 0
+    files = {}
+    try:
+        for chunk in chunks:
+            for column in chunk.columns:
+                if column not in columns:
+                    columns.append(column)
+            for start in range(0, len(chunk), chunk_size):
+                rows = chunk.iloc[start : start + chunk_size].reset_index(drop=True)
+                sequences = np.arange(sequence, sequence + len(rows), dtype=np.int64)
+                sequence += len(rows)
+
+                if key in rows.columns:
+                    keyed = ~is_empty_key(rows[key]).to_numpy()
+                    rows[key] = rows[key].where(keyed, "").astype(str)
+                    hashes = pd.util.hash_pandas_object(rows[key], index=False)
+                    targets = (hashes.to_numpy() % partitions).astype(np.int64)
+                else:
+                    keyed = np.zeros(len(rows), dtype=bool)
+                    targets = np.zeros(len(rows), dtype=np.int64)
+                # Rows without a key are never duplicates: they are spread evenly
+                targets[~keyed] = sequences[~keyed] % partitions
+                rows[SEQUENCE_COLUMN] = sequences
+                rows[KEYED_COLUMN] = keyed
+
+                for target, group in rows.groupby(targets, sort=False):
+                    target_file = files.get(target)
+                    if target_file is None:
+                        target_file = files[target] = open(
+                            _partition_path(work_dir, target), "wb"
+                        )
+                    pickle.dump(group, target_file, protocol=pickle.HIGHEST_PROTOCOL)
+    finally:
+        for target_file in files.values():
+            target_file.close()
+    return columns, sequence
+
+
+def _iter_frames(path):
+    """Yields the DataFrames pickled one after another in a spill file."""
+    try:
+        with open(path, "rb") as f:
+            while True:
+                try:
+                    yield pickle.load(f)
+                except EOFError:
+                    return
+    except FileNotFoundError:
+        return
+
+
+def _deduplicate_partition(path, key, chunk_size):
+    """
+    De-duplicates a partition file into '<path>.dedup' (still sorted by sequence number:
+    rows were spilled in input order). Returns the number of rows kept.
+    """
+    frames = list(_iter_frames(path))
+    if not frames:
+        return 0
+    rows = pd.concat(frames, ignore_index=True)
+    del frames
+    keyed = rows[KEYED_COLUMN].to_numpy()
+    duplicated = np.zeros(len(rows), dtype=bool)
+    duplicated[keyed] = rows.loc[keyed, key].duplicated(keep="first").to_numpy()
+    rows = rows[~duplicated]
+    with open(path + ".dedup", "wb") as f:
+        for start in range(0, len(rows), chunk_size):
+            pickle.dump(
+                rows.iloc[start : start + chunk_size],
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+    os.remove(path)
+    return len(rows)
+
+
+def _merge_by_sequence(partition_frames):
+    """
+    Merges streams of frames, each sorted by sequence number, into frames in global sequence
+    order. Every row up to the smallest last sequence number of the buffered frames can be
+    emitted: the rows still to come from any stream are after it. At most one frame per
+    stream is held at once.
+    """
+    streams = [iter(frames) for frames in partition_frames]
+    buffers = [None] * len(streams)
+    while True:
+        for position, stream in enumerate(streams):
+            if stream is not None and (
+                buffers[position] is None or buffers[position].empty
+            ):
+                buffers[position] = next(stream, None)
+                if buffers[position] is None:
+                    streams[position] = None
+        active = [
+            buffer for buffer in buffers if buffer is not None and not buffer.empty
+        ]
+        if not active:
+            return
+        watermark = min(buffer[SEQUENCE_COLUMN].iat[-1] for buffer in active)
+        ready = []
+        for position, buffer in enumerate(buffers):
+            if buffer is None or buffer.empty:
+                continue
+            cut = np.searchsorted(
+                buffer[SEQUENCE_COLUMN].to_numpy(), watermark, side="right"
+            )
+            if cut:
+                ready.append(buffer.iloc[:cut])
+                buffers[position] = buffer.iloc[cut:]
+        yield pd.concat(ready).sort_values(SEQUENCE_COLUMN, kind="stable")
@@ -0,0 +1,170 @@
+import json
+import re
+
+DEFAULT_READ_SIZE = 1 << 16
+
+# String literals and brackets: enough to find where an element ends.
+# A lone '"' is an unterminated string (the element continues in the next chunk).
+_STRUCTURE_RE = re.compile(r'"(?:[^"\\]|\\.)*"|[\[\]{}]|"', re.DOTALL)
+
+# A comma followed by a closing bracket, outside of string literals (which are kept as is)
+_TRAILING_COMMA_RE = re.compile(r'("(?:[^"\\]|\\.)*")|,(\s*[\]}])', re.DOTALL)
+
+_decoder = json.JSONDecoder()
+
+# Characters that may follow a number or a literal inside the top-level array
+_SCALAR_END = frozenset(" \t\n\r,]")
+
+
+def iter_json_array(file_handle, read_size=DEFAULT_READ_SIZE):
+    """
+    Incrementally parses a top-level JSON array from a text file handle, yielding its
+    elements one at a time. Only the element being parsed is held in memory.
+
+    Trailing commas before a closing ']' or '}' (e.g. '[{"id": 1,},]') are tolerated.
+    Commas inside string values are never touched. Leading or doubled commas between the
+    elements of the array (e.g. '[,{"id": 1}]' or '[{"id": 1},,{"id": 2}]') are errors.
+
+    Args:
+        file_handle: A file object opened in text mode.
+        read_size (int): Number of characters read from the file at a time.
+
+    Yields:
+        The decoded elements of the array (dicts for PubMed records).
+
+    Raises:
+        json.JSONDecodeError: If the document is not a well-formed (trailing commas aside) JSON array.
+    """
+    buffer = ""
+    pos = 0
+    eof = False
+    started = False
+    # Set once an element was read: a ',' or the closing ']' must follow
+    after_element = False
+
+    while True:
+        while pos < len(buffer) and buffer[pos].isspace():
+            pos += 1
+
+        if pos == len(buffer):
+            if eof:
+                raise json.JSONDecodeError("Unexpected end of document", buffer, pos)
+            buffer, pos = buffer[pos:], 0
+            chunk = file_handle.read(read_size)
+            eof = not chunk
+            buffer += chunk
+            continue
+
+        if not started:
+            if buffer[pos] != "[":
+                raise json.JSONDecodeError("Expected a top-level array", buffer, pos)
+            started = True
+            pos += 1
+            continue
+
+        if buffer[pos] == "]":
+            pos += 1
+            break
+
+        # One comma after each element (the one before ']' being the trailing comma)
+        if after_element:
+            if buffer[pos] != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", buffer, pos)
+            pos += 1
+            after_element = False
+            continue
+        if buffer[pos] == ",":
+            raise json.JSONDecodeError("Expecting value", buffer, pos)
+
+        element = _decode_element(buffer, pos, eof)
+        if element is None:
+            # Slow path: element with trailing commas, or cut by the end of the buffer
+            element = _decode_lenient_element(buffer, pos, eof)
+        if element is None:
+            # The element continues in the next chunk
+            if eof:
+                raise json.JSONDecodeError("Unexpected end of document", buffer, pos)
+            buffer, pos = buffer[pos:], 0
+            chunk = file_handle.read(read_size)
+            eof = not chunk
+            buffer += chunk
+            continue
+
+        value, pos = element
+        after_element = True
+        yield value
+
+    # Only whitespace may follow the closing bracket
+    rest = buffer[pos:] + file_handle.read()
+    if rest.strip():
+        raise json.JSONDecodeError("Extra data", rest, len(rest) - len(rest.lstrip()))
+
+
+def _decode_element(buffer, pos, eof):
+    """
+    Decodes the well-formed array element starting at buffer[pos] with the C decoder.
+
+    Returns:
+        tuple: (value, end position), or None if the element is malformed or not complete.
+    """
+    try:
+        value, end = _decoder.raw_decode(buffer, pos)
+    except json.JSONDecodeError:
+        return None
+    if _is_complete(buffer, end, eof):
+        return value, end
+    return None
+
+
+def _is_complete(buffer, end, eof):
+    """
+    True if the element decoded up to buffer[end] cannot continue in the next chunk.
+    Strings, objects and arrays end with their closing character. A number (or literal)
+    must be followed by a separator: one cut by the end of the buffer, e.g. after the
+    '.' or 'e' of '12.5e3', was decoded as a shorter prefix ('12').
+    """
+    if eof or buffer[end - 1] in '"}]':
+        return True
+    return end < len(buffer) and buffer[end] in _SCALAR_END
+
+
+def _decode_lenient_element(buffer, pos, eof):
+    """
+    Decodes the array element starting at buffer[pos], dropping trailing commas.
+
+    Returns:
+        tuple: (value, end position), or None if the element is not complete in the buffer.
+
+    Raises:
+        json.JSONDecodeError: If the element is malformed.
+    """
+    if buffer[pos] not in "[{":
+        # A scalar has no trailing comma to drop: it only failed if cut or malformed
+        try:
+            value, end = _decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            return None
+        if not _is_complete(buffer, end, eof):
+            return None
+        return value, end
+
+    depth = 0
+    for match in _STRUCTURE_RE.finditer(buffer, pos):
+        token = match.group()
+        if token == '"':
+            break  # unterminated string
+        if token == "[" or token == "{":
+            depth += 1
+        elif token == "]" or token == "}":
+            depth -= 1
+            if depth == 0:
+                end = match.end()
+                text = _TRAILING_COMMA_RE.sub(r"\1\2", buffer[pos:end])
+                # json.loads reports malformed elements (missing values, bad literals...)
+                return json.loads(text), end
+
+    if eof:
+        raise json.JSONDecodeError("Unterminated element", buffer, pos)
+    return None
@@ -1,6 +1,20 @@
 import pandas as pd
+import itertools
 import json
-import re
+from concurrent.futures import ThreadPoolExecutor
+
+from data_ingestion.dedup import (
+    DEFAULT_PARTITIONS,
+    is_empty_key,
+    iter_deduplicated_chunks,
+)
+from data_ingestion.json_stream import iter_json_array
+from data_ingestion.schema import (
+    align_categories,
+    compact_frame,
+    compact_ids,
+    read_csv_options,
+)
 
 rawdata_file_path = "./data/raw/"
 drugs_csv_path = rawdata_file_path + "drugs.csv"
@@ -8,13 +22,43 @@ pubmed_csv_path = rawdata_file_path + "pubmed.csv"
 pubmed_json_path = rawdata_file_path + "pubmed.json"
 clinical_trials_csv_path = rawdata_file_path + "clinical_trials.csv"
 
+DEFAULT_STREAM_CHUNK_SIZE = 10_000
+
+# ids pandas would have read as integers (see _text_ids)
+INTEGER_ID_PATTERN = r"\s*[+-]?[0-9]+\s*"
+
+# The four raw files are independent: they are read concurrently
+DEFAULT_LOAD_WORKERS = 4
+
 
-def load_data():
+class DataLoadError(Exception):
+    """Raised when a crucial input file is missing or cannot be loaded."""
+
+
+def load_data(
+    workers=DEFAULT_LOAD_WORKERS,
+    pubmed_paths=None,
+    spill_dir=None,
+    partitions=DEFAULT_PARTITIONS,
+    compact=False,
+):
     """
     Loads raw data into pandas DataFrames.
     Merges and de-duplicates PubMed data from CSV and JSON sources.
     Handles potential errors and exceptions.
-    Malformed JSON is handled by attempting to clean trailing commas (the raw json contains a non-needed comma).
+    Malformed JSON is handled by an incremental parser tolerating trailing commas (the raw json contains a non-needed comma).
+    The four files are read concurrently in a thread pool (the CSV parser and the file reads
+    release the GIL), and merged in a fixed order: the result does not depend on the workers.
+
+    Args:
+        workers (int): Number of threads reading the files (1: one file after another).
+        pubmed_paths (list): If given, the PubMed inputs (CSV or JSON files, any number) replacing
+                             the default CSV and JSON files. They are de-duplicated on disk with
+                             bounded memory (see load_pubmed_inputs).
+        spill_dir (str): Directory of the de-duplication spill files (default: the temporary directory).
+        partitions (int): Number of de-duplication spill files.
+        compact (bool): Apply the ingest schema (see data_ingestion/schema.py): only the used
+                        columns are read, and repeated text is stored as categoricals.
 
     Returns:
         tuple: A tuple containing three pandas DataFrames:
@@ -26,90 +70,371 @@ def load_data():
 
     try:
         print(f"Loading drugs data from {drugs_csv_path}...")
-        drugs_df = pd.read_csv(drugs_csv_path)
-
         print(f"Loading clinical trials data from {clinical_trials_csv_path}...")
-        clinical_trials_df = pd.read_csv(clinical_trials_csv_path)
-
-        # Load PubMed CSV
-        print(f"Loading PubMed CSV data from {pubmed_csv_path}...")
-        pubmed_csv_df = pd.read_csv(pubmed_csv_path)
-        # Standardize 'id' column to string for reliable merging and de-duplication
-        if "id" in pubmed_csv_df.columns:
-            pubmed_csv_df["id"] = pubmed_csv_df["id"].astype(str)
+        if pubmed_paths is None:
+            print(f"Loading PubMed CSV data from {pubmed_csv_path}...")
+            print(f"Loading PubMed JSON data from {pubmed_json_path}...")
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = [
+                executor.submit(_read_csv, drugs_csv_path, "drugs", compact),
+                executor.submit(
+                    _read_csv, clinical_trials_csv_path, "clinical_trials", compact
+                ),
+            ]
+            if pubmed_paths is None:
+                futures.append(executor.submit(_read_pubmed_csv, compact))
+                futures.append(executor.submit(_read_pubmed_json, compact))
+            else:
+                futures.append(
+                    executor.submit(
+                        load_pubmed_inputs, pubmed_paths, spill_dir, partitions, compact
+                    )
+                )
+            # Errors are raised in the order of the files, as when reading them one by one
+            drugs_df, clinical_trials_df, *pubmed_dfs = [
+                future.result() for future in futures
+            ]
+
+        if pubmed_paths is None:
+            pubmed_df = _merge_pubmed(*pubmed_dfs)
+        else:
+            (pubmed_df,) = pubmed_dfs
+        if compact:
+            pubmed_df = compact_ids(pubmed_df)
+            clinical_trials_df = compact_ids(clinical_trials_df)
+        print("Data loading and initial preparation complete.")
+        return drugs_df, pubmed_df, clinical_trials_df
+
+    except FileNotFoundError as e:
+        error_msg = f"Error: An input file was not found. Details: {e}"
+        print(error_msg)
+        raise DataLoadError(error_msg) from e
+    except Exception as e:  # Catch-all for other unexpected errors during loading
+        error_msg = f"Unexpected error during data loading: {e}"
+        print(error_msg)
+        raise DataLoadError(error_msg) from e
+
+
+def _text_ids(ids):
+    """
+    ids as text, missing or blank ones as '' (as the on-disk de-duplication writes them).
+    Integer ids are written canonically, as they were when pandas read them as numbers:
+    the CSV id "01" and the JSON id 1 are both "1".
+    """
+    ids = ids.where(~is_empty_key(ids), "").astype(str)
+    integers = ids.str.fullmatch(INTEGER_ID_PATTERN)
+    if integers.any():
+        ids = ids.where(~integers, ids[integers].map(lambda value: str(int(value))))
+    return ids
+
+
+def _with_text_ids(chunk):
+    if "id" in chunk.columns:
+        chunk["id"] = _text_ids(chunk["id"])
+    return chunk
+
+
+def _drop_duplicate_ids(pubmed_df, seen_ids=None):
+    """
+    Keeps the first occurrence of each id, like drop_duplicates(subset=["id"], keep="first"),
+    but rows with an empty id (see dedup.is_empty_key) are never duplicates: the same
+    semantics as the on-disk de-duplication of iter_pubmed_input_chunks.
+
+    Args:
+        pubmed_df (pd.DataFrame): PubMed articles with an 'id' column.
+        seen_ids (set): ids kept from previous chunks, updated with the ones kept here.
+    """
+    keyed = ~is_empty_key(pubmed_df["id"])
+    duplicated = keyed & pubmed_df["id"].duplicated(keep="first")
+    if seen_ids is not None:
+        duplicated |= keyed & pubmed_df["id"].isin(seen_ids)
+        seen_ids.update(pubmed_df["id"][keyed & ~duplicated])
+    return pubmed_df[~duplicated]
+
+
+def _merge_pubmed(pubmed_csv_df, pubmed_json_df):
+    """Merges the PubMed CSV and JSON data, and de-duplicates it on 'id' (in memory)."""
+    # Ensure both pubmed dataframes have the required columns before concat (handled by schema generally in production pipelines)
+    # For simplicity, we assume 'id', 'title', 'date', 'journal' exist
+    # A more robust solution might involve schema validation or explicit column selection/renaming
+
+    # Merge PubMed data
+    print("Merging PubMed CSV and JSON data...")
+    if not pubmed_csv_df.empty or not pubmed_json_df.empty:
+        pubmed_df = pd.concat(
+            align_categories([pubmed_csv_df, pubmed_json_df]), ignore_index=True
+        )
+
+        # De-duplicate based on 'id' (rows with an empty id are all kept).
+        # If 'id' column might be missing after load (despite warnings), handle here:
+        if "id" in pubmed_df.columns:
+            initial_pubmed_count = len(pubmed_df)
+            pubmed_df = _drop_duplicate_ids(pubmed_df)
+            print(
+                f"De-duplicated PubMed data: {initial_pubmed_count - len(pubmed_df)} duplicates removed. Current PubMed articles: {len(pubmed_df)}"
+            )
         else:
             print(
-                f"'id' column not found in {pubmed_csv_path}. De-duplication might be affected."
+                "'id' column not present in merged PubMed data. Skipping de-duplication."
             )
+    elif pubmed_csv_df.empty and pubmed_json_df.empty:
+        print(
+            "Both PubMed CSV and JSON sources are empty. Resulting PubMed DataFrame will be empty."
+        )
+        pubmed_df = pd.DataFrame()  # Ensure pubmed_df exists even if empty
+    else:  # One is empty, the other is not
+        pubmed_df = pubmed_csv_df if not pubmed_csv_df.empty else pubmed_json_df
+        print("One PubMed source was empty; using the non-empty source.")
+    return pubmed_df
 
-        # Load PubMed JSON
-        print(f"Loading PubMed JSON data from {pubmed_json_path}...")
-        pubmed_json_df = pd.DataFrame()  # Initialize empty DataFrame
-        try:
-            with open(pubmed_json_path, "r", encoding="utf-8") as f:
-                content = f.read()
-            # Attempt to fix common JSON issues like trailing commas
-            cleaned_content = re.sub(r",\s*([\]}])", r"\1", content)
-            pubmed_json_data = json.loads(cleaned_content)
-            pubmed_json_df = pd.DataFrame(pubmed_json_data)
-            print(f"Successfully loaded and parsed {pubmed_json_path}.")
-            # Standardize 'id' column to string
-            if "id" in pubmed_json_df.columns:
-                pubmed_json_df["id"] = pubmed_json_df["id"].astype(str)
-            else:
-                print(
-                    f"'id' column not found in {pubmed_json_path}. De-duplication might be affected."
-                )
-        except json.JSONDecodeError as e:
-            error_msg = f"JSONDecodeError when loading {pubmed_json_path}: {e}. Pipeline cannot proceed."
-            print(error_msg)
-            raise DataLoadError(error_msg) from e
-        except Exception as clean_e:  # Catch other errors during JSON processing
-            error_msg = f"Failed to load or parse {pubmed_json_path}. Error: {clean_e}. Pipeline cannot proceed."
-            print(error_msg)
-            raise DataLoadError(error_msg) from clean_e
-
-        # Ensure both pubmed dataframes have the required columns before concat (handled by schema generally in production pipelines)
-        # For simplicity, we assume 'id', 'title', 'date', 'journal' exist
-        # A more robust solution might involve schema validation or explicit column selection/renaming
-
-        # Merge PubMed data
-        print("Merging PubMed CSV and JSON data...")
-        if not pubmed_csv_df.empty or not pubmed_json_df.empty:
-            pubmed_df = pd.concat([pubmed_csv_df, pubmed_json_df], ignore_index=True)
-
-            # De-duplicate based on 'id'. Rows with empty string IDs might be treated as one group by drop_duplicates.
-            # If 'id' column might be missing after load (despite warnings), handle here:
-            if "id" in pubmed_df.columns:
-                initial_pubmed_count = len(pubmed_df)
-                # Consider how to handle IDs that are empty strings or NaN if they are not truly unique identifiers
-                # For example, filter them out before de-duplication if they represent invalid entries:
-                # pubmed_df = pubmed_df[pubmed_df['id'].str.strip() != '']
-                pubmed_df = pubmed_df.drop_duplicates(subset=["id"], keep="first")
-                print(
-                    f"De-duplicated PubMed data: {initial_pubmed_count - len(pubmed_df)} duplicates removed. Current PubMed articles: {len(pubmed_df)}"
-                )
-            else:
-                print(
-                    "'id' column not present in merged PubMed data. Skipping de-duplication."
-                )
-        elif pubmed_csv_df.empty and pubmed_json_df.empty:
+
+def iter_pubmed_input_chunks(
+    pubmed_paths,
+    chunk_size=DEFAULT_STREAM_CHUNK_SIZE,
+    spill_dir=None,
+    partitions=DEFAULT_PARTITIONS,
+):
+    """
+    Streams any number of PubMed inputs (CSV or JSON files) de-duplicated on 'id', as DataFrames
+    of at most chunk_size rows. The first occurrence of an id is kept across the files, in their
+    order, like the in-memory de-duplication. Rows with an empty id are all kept, instead of being
+    collapsed into one. Duplicates are found through hash-partitioned spill files on local disk
+    (see data_ingestion/dedup.py): memory does not grow with the number or size of the inputs.
+
+    Raises:
+        DataLoadError: If an input is missing or cannot be parsed.
+    """
+    print(
+        f"De-duplicating {len(pubmed_paths)} PubMed inputs on disk ({partitions} partitions)..."
+    )
+    stats = {}
+    chunks = (
+        chunk
+        for path in pubmed_paths
+        for chunk in iter_pubmed_file_chunks(path, chunk_size)
+    )
+    yield from iter_deduplicated_chunks(
+        chunks,
+        key="id",
+        chunk_size=chunk_size,
+        partitions=partitions,
+        spill_dir=spill_dir,
+        stats=stats,
+    )
+    print(
+        f"De-duplicated PubMed data: {stats['duplicates']} duplicates removed. Current PubMed articles: {stats['rows_out']}"
+    )
+
+
+def load_pubmed_inputs(
+    pubmed_paths, spill_dir=None, partitions=DEFAULT_PARTITIONS, compact=False
+):
+    """
+    Loads any number of PubMed inputs de-duplicated on disk (see iter_pubmed_input_chunks)
+    into one DataFrame. With compact=True, each chunk gets the ingest schema as it is read.
+    """
+    frames = [
+        compact_frame(chunk, "pubmed") if compact else chunk
+        for chunk in iter_pubmed_input_chunks(
+            pubmed_paths, spill_dir=spill_dir, partitions=partitions
+        )
+    ]
+    if not frames:
+        return pd.DataFrame()
+    pubmed_df = pd.concat(align_categories(frames), ignore_index=True)
+    return compact_ids(pubmed_df) if compact else pubmed_df
+
+
+def _read_csv(file_path, source, compact=False):
+    if not compact:
+        return pd.read_csv(file_path)
+    return compact_frame(pd.read_csv(file_path, **read_csv_options(source)), source)
+
+
+def _read_pubmed_csv(compact=False):
+    # ids are read as text so they do not depend on the other values of the column
+    if compact:
+        pubmed_csv_df = _read_csv(pubmed_csv_path, "pubmed", compact)
+    else:
+        pubmed_csv_df = pd.read_csv(pubmed_csv_path, dtype={"id": str})
+    # Standardize 'id' column to string for reliable merging and de-duplication
+    if "id" in pubmed_csv_df.columns:
+        pubmed_csv_df["id"] = _text_ids(pubmed_csv_df["id"])
+    else:
+        print(
+            f"'id' column not found in {pubmed_csv_path}. De-duplication might be affected."
+        )
+    return pubmed_csv_df
+
+
+def _read_pubmed_json(compact=False):
+    try:
+        pubmed_json_df = _frame_from_records(iter_pubmed_json_records(pubmed_json_path))
+        print(f"Successfully loaded and parsed {pubmed_json_path}.")
+        # Standardize 'id' column to string
+        if "id" in pubmed_json_df.columns:
+            pubmed_json_df["id"] = _text_ids(pubmed_json_df["id"])
+        else:
             print(
-                "Both PubMed CSV and JSON sources are empty. Resulting PubMed DataFrame will be empty."
+                f"'id' column not found in {pubmed_json_path}. De-duplication might be affected."
             )
-            pubmed_df = pd.DataFrame()  # Ensure pubmed_df exists even if empty
-        else:  # One is empty, the other is not
-            pubmed_df = pubmed_csv_df if not pubmed_csv_df.empty else pubmed_json_df
-            print("One PubMed source was empty; using the non-empty source.")
+        return compact_frame(pubmed_json_df, "pubmed") if compact else pubmed_json_df
+    except json.JSONDecodeError as e:
+        error_msg = f"JSONDecodeError when loading {pubmed_json_path}: {e}. Pipeline cannot proceed."
+        print(error_msg)
+        raise DataLoadError(error_msg) from e
+    except Exception as clean_e:  # Catch other errors during JSON processing
+        error_msg = f"Failed to load or parse {pubmed_json_path}. Error: {clean_e}. Pipeline cannot proceed."
+        print(error_msg)
+        raise DataLoadError(error_msg) from clean_e
 
-        print("Data loading and initial preparation complete.")
-        return drugs_df, pubmed_df, clinical_trials_df
 
+def load_drugs():
+    """
+    Loads the drugs list into a pandas DataFrame.
+
+    Raises:
+        DataLoadError: If the file is not found or cannot be parsed.
+    """
+    print(f"Loading drugs data from {drugs_csv_path}...")
+    try:
+        return pd.read_csv(drugs_csv_path)
     except FileNotFoundError as e:
         error_msg = f"Error: An input file was not found. Details: {e}"
         print(error_msg)
         raise DataLoadError(error_msg) from e
-    except Exception as e:  # Catch-all for other unexpected errors during loading
+    except Exception as e:
         error_msg = f"Unexpected error during data loading: {e}"
         print(error_msg)
         raise DataLoadError(error_msg) from e
+
+
+def iter_pubmed_json_records(file_path=pubmed_json_path):
+    """
+    Yields the PubMed JSON records one at a time, straight from the file handle.
+    The document is never held in memory as a whole, and the trailing commas
+    produced upstream are tolerated.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        json.JSONDecodeError: If the file is not a JSON array of records.
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        yield from iter_json_array(f)
+
+
+def _frame_from_records(records, batch_size=DEFAULT_STREAM_CHUNK_SIZE):
+    """
+    Builds a DataFrame from an iterable of records, batch_size records at a time,
+    so that only one batch of record dicts is alive at once.
+    """
+    frames = [pd.DataFrame(batch) for batch in _iter_batches(iter(records), batch_size)]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames, ignore_index=True)
+
+
+def _iter_batches(iterator, batch_size):
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def iter_csv_chunks(file_path, chunk_size=DEFAULT_STREAM_CHUNK_SIZE, dtype=None):
+    """
+    Reads a CSV file as a sequence of DataFrames of at most chunk_size rows.
+
+    Raises:
+        DataLoadError: If the file is not found or cannot be parsed.
+    """
+    print(f"Streaming data from {file_path} in chunks of {chunk_size} rows...")
+    try:
+        with pd.read_csv(file_path, chunksize=chunk_size, dtype=dtype) as chunks:
+            yield from chunks
+    except FileNotFoundError as e:
+        error_msg = f"Error: An input file was not found. Details: {e}"
+        print(error_msg)
+        raise DataLoadError(error_msg) from e
+    except (pd.errors.ParserError, UnicodeDecodeError) as e:
+        error_msg = f"Failed to parse {file_path}. Error: {e}. Pipeline cannot proceed."
+        print(error_msg)
+        raise DataLoadError(error_msg) from e
+
+
+def iter_clinical_trials_chunks(chunk_size=DEFAULT_STREAM_CHUNK_SIZE):
+    """Streams the clinical trials CSV as DataFrames of at most chunk_size rows."""
+    yield from iter_csv_chunks(clinical_trials_csv_path, chunk_size)
+
+
+def iter_pubmed_chunks(
+    chunk_size=DEFAULT_STREAM_CHUNK_SIZE,
+    pubmed_paths=None,
+    spill_dir=None,
+    partitions=DEFAULT_PARTITIONS,
+):
+    """
+    Streams the merged PubMed data (CSV first, then JSON) as DataFrames of at most chunk_size rows.
+    De-duplication on 'id' keeps the first occurrence across chunks, like load_data does.
+    Only the set of already seen ids is kept in memory, not the publications themselves.
+    Given pubmed_paths, these inputs are streamed instead, de-duplicated on disk
+    (see iter_pubmed_input_chunks).
+
+    Yields:
+        pd.DataFrame: The next chunk of de-duplicated PubMed articles.
+
+    Raises:
+        DataLoadError: If a PubMed source is missing or cannot be parsed.
+    """
+    if pubmed_paths is not None:
+        yield from iter_pubmed_input_chunks(
+            pubmed_paths, chunk_size, spill_dir, partitions
+        )
+        return
+    seen_ids = set()
+    for chunk in _iter_pubmed_source_chunks(chunk_size):
+        if "id" in chunk.columns:
+            chunk = _drop_duplicate_ids(chunk, seen_ids)
+        if not chunk.empty:
+            yield chunk
+
+
+def _iter_pubmed_source_chunks(chunk_size):
+    for path in (pubmed_csv_path, pubmed_json_path):
+        yield from iter_pubmed_file_chunks(path, chunk_size)
+
+
+def iter_pubmed_file_chunks(file_path, chunk_size=DEFAULT_STREAM_CHUNK_SIZE):
+    """
+    Streams one PubMed file (a CSV file, or a JSON array of records if its name ends with
+    '.json') as DataFrames of at most chunk_size rows. ids are returned as text, integers
+    written canonically and missing ones as '' (see _text_ids), so that every input compares
+    them the same way.
+
+    Raises:
+        DataLoadError: If the file is not found or cannot be parsed.
+    """
+    if not file_path.lower().endswith(".json"):
+        for chunk in iter_csv_chunks(file_path, chunk_size, dtype={"id": str}):
+            yield _with_text_ids(chunk)
+        return
+
+    print(f"Streaming PubMed JSON data from {file_path}...")
+    records = iter_pubmed_json_records(file_path)
+    while True:
+        try:
+            batch = list(itertools.islice(records, chunk_size))
+        except FileNotFoundError as e:
+            error_msg = f"Error: An input file was not found. Details: {e}"
+            print(error_msg)
+            raise DataLoadError(error_msg) from e
+        except json.JSONDecodeError as e:
+            error_msg = f"JSONDecodeError when loading {file_path}: {e}. Pipeline cannot proceed."
+            print(error_msg)
+            raise DataLoadError(error_msg) from e
+        if not batch:
+            return
+        yield _with_text_ids(pd.DataFrame(batch))
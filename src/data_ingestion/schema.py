@@ -0,0 +1,156 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Columns kept at ingestion per source, with their compact dtype (None: the default one).
+# Repeated text (journals, ATC codes, drug names, raw dates) is dictionary-encoded as
+# categoricals: one small integer code per row, each distinct string stored once.
+INGEST_SCHEMAS = {
+    "drugs": {"atccode": "category", "drug": "category"},
+    "pubmed": {"id": str, "title": None, "date": "category", "journal": "category"},
+    "clinical_trials": {
+        "id": str,
+        "scientific_title": None,
+        "date": "category",
+        "journal": "category",
+    },
+}
+
+# Text ids stored as int64 when every one of them is an integer written canonically
+# (str() gives the same text back, so the outputs are unchanged): 8 bytes instead of a str
+INTEGER_ID_COLUMN = "id"
+CANONICAL_INTEGER_PATTERN = re.compile(r"0|[1-9][0-9]{0,17}")
+
+
+def read_csv_options(source):
+    """
+    pd.read_csv options reading only the columns of a source's schema, with their compact
+    dtypes. A missing column is not an error (it is reported later, like without a schema).
+    """
+    schema = INGEST_SCHEMAS[source]
+    return {
+        "usecols": lambda column: column in schema,
+        "dtype": {column: dtype for column, dtype in schema.items() if dtype},
+    }
+
+
+def compact_frame(df, source):
+    """
+    Applies a source's schema to a loaded DataFrame (e.g. built from JSON records):
+    the columns out of the schema are dropped and the others get their compact dtype.
+
+    Returns:
+        pd.DataFrame: The compact DataFrame (a new one).
+    """
+    schema = INGEST_SCHEMAS[source]
+    df = df[[column for column in df.columns if column in schema]]
+    df = df.astype(
+        {
+            column: schema[column]
+            for column in df.columns
+            if schema[column] and df[column].dtype != schema[column]
+        }
+    )
+    return df
+
+
+def compact_ids(df):
+    """
+    Stores the ids as int64 when they all are integers written canonically (see
+    INTEGER_ID_COLUMN). Applied once the sources are merged and de-duplicated: the ids of
+    every input must have the same type to be compared.
+
+    Returns:
+        pd.DataFrame: The DataFrame (a new one if its ids were converted).
+    """
+    if INTEGER_ID_COLUMN in df.columns and _are_canonical_integers(
+        df[INTEGER_ID_COLUMN]
+    ):
+        df = df.assign(**{INTEGER_ID_COLUMN: df[INTEGER_ID_COLUMN].astype(np.int64)})
+    return df
+
+
+def _are_canonical_integers(values):
+    if values.dtype != object or values.empty:
+        return False
+    return bool(
+        values.map(
+            lambda value: isinstance(value, str)
+            and CANONICAL_INTEGER_PATTERN.fullmatch(value) is not None
+        ).all()
+    )
+
+
+def align_categories(frames):
+    """
+    Gives the categorical columns shared by DataFrames the union of their categories, so
+    that pd.concat keeps them categorical (it falls back to object dtype otherwise).
+
+    Returns:
+        list: The DataFrames, with aligned categories.
+    """
+    frames = list(frames)
+    if len(frames) < 2:
+        return frames
+    columns = [
+        column
+        for column in frames[0].columns
+        if all(
+            column in df.columns and isinstance(df[column].dtype, pd.CategoricalDtype)
+            for df in frames
+        )
+    ]
+    for column in columns:
+        categories = pd.api.types.union_categoricals(
+            [df[column] for df in frames]
+        ).categories
+        frames = [
+            df.assign(**{column: df[column].cat.set_categories(categories)})
+            for df in frames
+        ]
+    return frames
+
+
+def column_memory(df):
+    """Bytes per column of a DataFrame, strings included (memory_usage(deep=True))."""
+    return {
+        column: int(size)
+        for column, size in df.memory_usage(deep=True, index=False).items()
+    }
+
+
+def memory_report(before, after):
+    """
+    Compares the memory of DataFrames loaded without and with the compact schema.
+
+    Args:
+        before (dict): Source name -> DataFrame without the schema.
+        after (dict): Source name -> DataFrame with the schema.
+
+    Returns:
+        list: Report lines: bytes per column before and after, and the ratio per source.
+    """
+    lines = []
+    for source, df in before.items():
+        before_sizes = column_memory(df)
+        after_sizes = column_memory(after[source])
+        lines.append(f"{source} ({len(df)} rows):")
+        for column in dict.fromkeys([*before_sizes, *after_sizes]):
+            old = before_sizes.get(column)
+            new = after_sizes.get(column)
+            dtype = after[source][column].dtype if new is not None else None
+            lines.append(
+                f"  {column:<20} {_size(old):>14} -> {_size(new):>14}  {dtype or ''}"
+            )
+        total_before = sum(before_sizes.values())
+        total_after = sum(after_sizes.values())
+        lines.append(
+            f"  {'total':<20} {_size(total_before):>14} -> {_size(total_after):>14}"
+            f"  (x{total_before / max(total_after, 1):.1f} smaller)"
+        )
+    return lines
+
+
+def _size(size):
+    return "-" if size is None else f"{size:,} B"
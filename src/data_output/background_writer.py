@@ -0,0 +1,105 @@
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_MAX_PENDING = 8
+DEFAULT_BATCH_SIZE = 1_000
+
+
+class BackgroundWriteError(Exception):
+    """Raised when a write run by a BackgroundWriter failed."""
+
+
+class BackgroundWriter:
+    """
+    Runs write jobs in a background thread, one after another in submission order, so the
+    pipeline keeps computing while files are written. At most max_pending jobs are queued:
+    submit blocks beyond that, which bounds the memory held by data waiting to be written.
+
+    The first failed job is reported as a BackgroundWriteError, raised by the next submit or
+    by close(); the jobs queued after it are not run.
+
+    Usage:
+        with BackgroundWriter() as writer:
+            writer.submit(f"'{path}'", df.copy().to_csv, path, index=False)
+            ...  # compute while the file is written
+        # leaving the block waits for the pending writes and raises their error
+    """
+
+    def __init__(self, max_pending=DEFAULT_MAX_PENDING):
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="background-writer"
+        )
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._error = None
+
+    def submit(self, description, function, *args, **kwargs):
+        """
+        Queues function(*args, **kwargs). The arguments must not be modified until the job ran:
+        pass a copy of data the pipeline keeps changing.
+
+        Args:
+            description (str): What is written, for the error message (e.g. a file path).
+
+        Raises:
+            BackgroundWriteError: If a previous job failed.
+        """
+        self._raise_error()
+        self._slots.acquire()
+        self._executor.submit(self._run, description, function, args, kwargs)
+
+    def write_all(self, description, write_all, records, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Passes the records of an iterable to write_all (e.g. a graph writer's) in batches,
+        in the background. The records are produced in the calling thread.
+        """
+        records = iter(records)
+        while True:
+            batch = list(itertools.islice(records, batch_size))
+            if not batch:
+                return
+            self.submit(description, write_all, batch)
+
+    def _run(self, description, function, args, kwargs):
+        try:
+            if self._error is None:
+                function(*args, **kwargs)
+        except Exception as e:
+            error = BackgroundWriteError(f"Failed to write {description}: {e}")
+            error.__cause__ = e
+            self._error = error
+        finally:
+            self._slots.release()
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise self._error
+
+    def wait(self):
+        """
+        Waits until every queued job ran.
+
+        Raises:
+            BackgroundWriteError: If a job failed.
+        """
+        # A single worker runs the jobs in order: an empty job marks the end of the queue
+        self._executor.submit(lambda: None).result()
+        self._raise_error()
+
+    def close(self):
+        """Waits for the queued jobs, stops the thread, and raises the error of a failed job."""
+        try:
+            self.wait()
+        finally:
+            self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            # The pending jobs still run, but the error of the block takes precedence
+            self._executor.shutdown()
+            return False
+        self.close()
+        return False
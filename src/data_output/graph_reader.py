@@ -0,0 +1,66 @@
+import gzip
+import json
+
+from data_output.graph_writer import NORMALIZED_GRAPH_FORMAT, NORMALIZED_GRAPH_VERSION
+from data_transformation.mention_table import MentionTable
+
+
+def is_ndjson_graph(file_path):
+    """True if the graph file is newline-delimited JSON (optionally gzip-compressed)."""
+    return file_path.endswith(".ndjson") or file_path.endswith(".ndjson.gz")
+
+
+def iter_graph_records(file_path):
+    """
+    Lazily iterates the mention records of an NDJSON graph, one line at a time.
+    Files ending with '.gz' are decompressed on the fly.
+
+    Yields:
+        dict: A mention record.
+    """
+    opener = gzip.open if file_path.endswith(".gz") else open
+    with opener(file_path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class GraphRecords:
+    """
+    Re-iterable view over an NDJSON graph: each analysis streams over the file
+    instead of holding all the mentions in memory.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+
+    def __iter__(self):
+        return iter_graph_records(self.file_path)
+
+
+class NormalizedGraph:
+    """
+    Normalized graph written by the pipeline's "normalized" output format: node tables
+    (drugs, journals, publications) and a compact edge table (drug, publication, date, source).
+    They are loaded into a MentionTable, so iterating over the graph yields the same
+    mention records as the flat JSON graph (as MentionRecord views) and every analysis
+    function accepts it directly.
+    """
+
+    def __init__(self, graph):
+        self.table = MentionTable.from_normalized(graph)
+
+    @classmethod
+    def is_normalized(cls, data):
+        """True if data is a normalized graph of the version this module reads."""
+        return (
+            isinstance(data, dict)
+            and data.get("format") == NORMALIZED_GRAPH_FORMAT
+            and data.get("version") == NORMALIZED_GRAPH_VERSION
+        )
+
+    def __len__(self):
+        return len(self.table)
+
+    def __iter__(self):
+        return iter(self.table)
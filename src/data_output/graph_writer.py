@@ -0,0 +1,250 @@
+import gzip
+import json
+import os
+
+from data_transformation.mention_table import MENTION_FIELDS, MentionTable
+
+GRAPH_BASE_NAME = "drug_journal_mentions_graph"
+OUTPUT_FORMATS = ("json", "ndjson", "ndjson.gz", "normalized")
+DEFAULT_OUTPUT_FORMAT = "json"
+
+# File name extension of each output format
+OUTPUT_FORMAT_EXTENSIONS = {
+    "json": ".json",
+    "ndjson": ".ndjson",
+    "ndjson.gz": ".ndjson.gz",
+    "normalized": ".normalized.json",
+}
+NORMALIZED_GRAPH_FORMAT = "drug_journal_mentions_graph/normalized"
+NORMALIZED_GRAPH_VERSION = 1
+
+
+def _encoded_rows(table, template):
+    """
+    Serializes the mentions of a MentionTable with a %-template over the JSON texts of the
+    MENTION_FIELDS values. Each distinct value is encoded once per table.
+
+    Yields:
+        str: The text of each mention.
+    """
+
+    def encode(values):
+        return [json.dumps(value, ensure_ascii=False) for value in values]
+
+    drugs, dates = encode(table.drugs), encode(table.dates)
+    journals, sources = encode(table.journals), encode(table.sources)
+    publications = [
+        (journals[journal], sources[source], publication_id, title)
+        for journal, source, publication_id, title in zip(
+            table.publication_journals,
+            table.publication_sources,
+            encode(table.publication_ids),
+            encode(table.publication_titles),
+        )
+    ]
+    for drug, publication, date in zip(table.drug, table.publication, table.date):
+        journal, source, publication_id, title = publications[publication]
+        yield template % (
+            drugs[drug],
+            journal,
+            dates[date],
+            source,
+            publication_id,
+            title,
+        )
+
+
+def _discard(file):
+    """Closes and removes the file of a writer whose block raised: it is incomplete."""
+    file.close()
+    try:
+        os.remove(file.name)
+    except FileNotFoundError:
+        pass
+
+
+class JsonArrayWriter:
+    """
+    Writes mention records to a JSON array one record at a time.
+    The file is byte-for-byte identical to json.dump(records, f, indent=2, ensure_ascii=False),
+    without holding the records in memory. If the block raises, the incomplete file is
+    removed instead of being closed as a valid array.
+
+    Usage:
+        with JsonArrayWriter(path) as writer:
+            for mention in mentions:
+                writer.write(mention)
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.count = 0
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.file_path, "w", encoding="utf-8")
+        self._file.write("[")
+        return self
+
+    def write(self, record):
+        """Appends one record to the array."""
+        item = json.dumps(record, indent=2, ensure_ascii=False)
+        self._file.write(",\n  " if self.count else "\n  ")
+        self._file.write(item.replace("\n", "\n  "))
+        self.count += 1
+
+    def write_all(self, records):
+        """Appends every record of an iterable to the array."""
+        for record in records:
+            self.write(record)
+
+    def write_table(self, table):
+        """Appends the mentions of a MentionTable, without building a dict per mention."""
+        # json.dumps(record, indent=2) of a mention, indented by one more level
+        template = (
+            "{\n"
+            + ",\n".join(f'    "{field}": %s' for field in MENTION_FIELDS)
+            + "\n  }"
+        )
+        for item in _encoded_rows(table, template):
+            self._file.write(",\n  " if self.count else "\n  ")
+            self._file.write(item)
+            self.count += 1
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            # Without its closing bracket, a truncated array never reads as a complete graph
+            _discard(self._file)
+            return False
+        self._file.write("\n]" if self.count else "]")
+        self._file.close()
+        return False
+
+
+class NdjsonWriter:
+    """
+    Writes mention records as newline-delimited JSON (one compact JSON object per line),
+    optionally gzip-compressed. Records are written as they are produced. If the block
+    raises, the incomplete file is removed.
+    """
+
+    def __init__(self, file_path, compress=False):
+        self.file_path = file_path
+        self.compress = compress
+        self.count = 0
+        self._file = None
+
+    def __enter__(self):
+        if self.compress:
+            self._file = gzip.open(
+                self.file_path, "wt", encoding="utf-8", compresslevel=6
+            )
+        else:
+            self._file = open(self.file_path, "w", encoding="utf-8")
+        return self
+
+    def write(self, record):
+        """Appends one record as a line."""
+        self._file.write(
+            json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        )
+        self.count += 1
+
+    def write_all(self, records):
+        """Appends every record of an iterable."""
+        for record in records:
+            self.write(record)
+
+    def write_table(self, table):
+        """Appends the mentions of a MentionTable, without building a dict per mention."""
+        template = "{" + ",".join(f'"{field}":%s' for field in MENTION_FIELDS) + "}\n"
+        self._file.writelines(_encoded_rows(table, template))
+        self.count += len(table)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            _discard(self._file)
+            return False
+        self._file.close()
+        return False
+
+
+class NormalizedGraphWriter:
+    """
+    Writes the mentions as a normalized graph: node tables (drugs, journals, publications)
+    keyed by their integer position, and a compact edge table (drug, publication, date, source).
+    A title mentioning five drugs is stored once, and each journal name once.
+
+    Tables are stored column-wise in one compact JSON object:
+        {
+            "format": "drug_journal_mentions_graph/normalized", "version": 1,
+            "drugs": [name, ...], "journals": [name, ...],
+            "sources": [source_type, ...], "dates": ["YYYY-MM-DD", ...],
+            "publications": {"id": [...], "title": [...], "journal": [journal index, ...]},
+            "edges": {"drug": [...], "publication": [...], "date": [...], "source": [...]}
+        }
+    Only the integer columns and the distinct values (a MentionTable) are held in memory
+    until the file is written.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.count = 0
+        self._table = MentionTable()
+
+    def __enter__(self):
+        return self
+
+    def write(self, record):
+        """Adds one mention to the graph."""
+        self._table.append(record)
+        self.count += 1
+
+    def write_all(self, records):
+        """Adds every mention of an iterable to the graph."""
+        for record in records:
+            self.write(record)
+
+    def write_table(self, table):
+        """Adds the mentions of a MentionTable to the graph."""
+        self._table.extend_table(table)
+        self.count += len(table)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            return False
+        graph = {
+            "format": NORMALIZED_GRAPH_FORMAT,
+            "version": NORMALIZED_GRAPH_VERSION,
+            **self._table.to_normalized(),
+        }
+        with open(self.file_path, "w", encoding="utf-8") as f:
+            json.dump(graph, f, ensure_ascii=False, separators=(",", ":"))
+        return False
+
+
+def graph_file_name(output_format, base_name=GRAPH_BASE_NAME):
+    """Returns the graph file name for an output format (e.g. 'drug_journal_mentions_graph.ndjson.gz')."""
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(
+            f"Unknown output format '{output_format}'. Expected one of: {', '.join(OUTPUT_FORMATS)}."
+        )
+    return base_name + OUTPUT_FORMAT_EXTENSIONS[output_format]
+
+
+def open_graph_writer(file_path, output_format=DEFAULT_OUTPUT_FORMAT):
+    """
+    Returns the writer for an output format, to be used as a context manager:
+    "json" (pretty-printed array, for small debug runs), "ndjson", "ndjson.gz" or "normalized".
+    """
+    if output_format == "json":
+        return JsonArrayWriter(file_path)
+    if output_format == "ndjson":
+        return NdjsonWriter(file_path)
+    if output_format == "ndjson.gz":
+        return NdjsonWriter(file_path, compress=True)
+    if output_format == "normalized":
+        return NormalizedGraphWriter(file_path)
+    raise ValueError(
+        f"Unknown output format '{output_format}'. Expected one of: {', '.join(OUTPUT_FORMATS)}."
+    )
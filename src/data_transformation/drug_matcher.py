@@ -0,0 +1,139 @@
+from collections import deque
+
+MATCHER_ENGINES = ("aho_corasick", "naive")
+DEFAULT_MATCHER_ENGINE = "aho_corasick"
+
+
+class NaiveDrugMatcher:
+    """
+    Reference matcher: checks every drug name against the title with a substring test.
+    Cost is O(number of drugs x title length) per title, kept for comparison purposes.
+    """
+
+    def __init__(self, drugs_list_upper):
+        self.drugs_list_upper = list(drugs_list_upper)
+
+    def find(self, title_upper):
+        """
+        Returns the indexes (in drugs_list_upper order) of the drugs mentioned in the title.
+
+        Args:
+            title_upper (str): The publication title, already uppercased.
+
+        Returns:
+            list: Indexes into drugs_list_upper, in ascending order.
+        """
+        return [
+            index
+            for index, (_, drug_name_upper) in enumerate(self.drugs_list_upper)
+            if drug_name_upper in title_upper
+        ]
+
+
+class AhoCorasickDrugMatcher:
+    """
+    Multi-pattern matcher based on an Aho-Corasick automaton built once from the drug list.
+    Each title is scanned in a single pass, whatever the number of drugs.
+    Matching semantics are the same as the naive substring test (overlapping and nested
+    names are all reported), so both engines return the same drugs for a given title.
+    """
+
+    def __init__(self, drugs_list_upper):
+        self.drugs_list_upper = list(drugs_list_upper)
+        # Each state is a dict of transitions; outputs[state] holds the drug indexes
+        # ending at that state (own pattern + patterns reachable through fail links).
+        self._goto = [{}]
+        self._fail = [0]
+        self._outputs = [()]
+        self._always_matched = []
+        self._build()
+
+    def __getstate__(self):
+        # Only the drug list is shipped (e.g. to worker processes), the automaton is rebuilt
+        return {"drugs_list_upper": self.drugs_list_upper}
+
+    def __setstate__(self, state):
+        self.__init__(state["drugs_list_upper"])
+
+    def _build(self):
+        goto, fail = self._goto, self._fail
+        own_outputs = [[]]
+
+        # 1. Build the trie of drug names
+        for index, (_, drug_name_upper) in enumerate(self.drugs_list_upper):
+            if not drug_name_upper:
+                # An empty name is a substring of any non-empty title (same as `"" in title`)
+                self._always_matched.append(index)
+                continue
+            state = 0
+            for char in drug_name_upper:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    fail.append(0)
+                    own_outputs.append([])
+                state = next_state
+            own_outputs[state].append(index)
+
+        # 2. Compute failure links breadth-first and merge outputs along them
+        outputs = [tuple(own_outputs[0])] + [()] * (len(goto) - 1)
+        queue = deque()
+        for child in goto[0].values():
+            outputs[child] = tuple(own_outputs[child])
+            queue.append(child)
+        while queue:
+            state = queue.popleft()
+            for char, child in goto[state].items():
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[child] = goto[fallback].get(char, 0)
+                outputs[child] = tuple(own_outputs[child]) + outputs[fail[child]]
+                queue.append(child)
+        self._outputs = outputs
+
+    def find(self, title_upper):
+        """
+        Returns the indexes (in drugs_list_upper order) of the drugs mentioned in the title.
+
+        Args:
+            title_upper (str): The publication title, already uppercased.
+
+        Returns:
+            list: Indexes into drugs_list_upper, in ascending order.
+        """
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        found = set(self._always_matched) if title_upper else set()
+        state = 0
+        for char in title_upper:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+        return sorted(found)
+
+
+def build_drug_matcher(drugs_list_upper, engine=DEFAULT_MATCHER_ENGINE):
+    """
+    Builds the drug matcher for the requested engine.
+
+    Args:
+        drugs_list_upper (list): A list of tuples (original_drug_name, uppercase_drug_name).
+        engine (str): One of MATCHER_ENGINES ("aho_corasick" or "naive").
+
+    Returns:
+        A matcher exposing `drugs_list_upper` and `find(title_upper)`.
+
+    Raises:
+        ValueError: If the engine is unknown.
+    """
+    if engine == "aho_corasick":
+        return AhoCorasickDrugMatcher(drugs_list_upper)
+    if engine == "naive":
+        return NaiveDrugMatcher(drugs_list_upper)
+    raise ValueError(
+        f"Unknown matcher engine '{engine}'. Expected one of: {', '.join(MATCHER_ENGINES)}."
+    )
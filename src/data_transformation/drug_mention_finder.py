@@ -1,10 +1,46 @@
 import pandas as pd
 
+from data_cleansing.date_parser import format_date_column
+from data_transformation.drug_matcher import (
+    DEFAULT_MATCHER_ENGINE,
+    build_drug_matcher,
+)
+from data_transformation.mention_table import DEFAULT_TABLE_ROWS, MentionTable
 
-def find_drug_mentions(publications_df, drugs_list_upper, source_type):
+
+def find_drug_mentions(
+    publications_df,
+    drugs_list_upper,
+    source_type,
+    engine=DEFAULT_MATCHER_ENGINE,
+    matcher=None,
+):
     """
     Identifies mentions of drugs within the titles of publications in a DataFrame.
-    It constructs a list of dictionaries, each representing a drug mention event.
+    It constructs a list of dictionaries, each representing a drug mention event
+    (see iter_drug_mentions for the arguments).
+
+    Returns:
+        list: A list of dictionaries, each describing a drug mention.
+    """
+    return list(
+        iter_drug_mentions(
+            publications_df, drugs_list_upper, source_type, engine, matcher
+        )
+    )
+
+
+def iter_drug_mentions(
+    publications_df,
+    drugs_list_upper,
+    source_type,
+    engine=DEFAULT_MATCHER_ENGINE,
+    matcher=None,
+    with_positions=False,
+):
+    """
+    Identifies mentions of drugs within the titles of publications in a DataFrame.
+    Mentions are yielded as they are found, so they can be written without being collected.
     The date column in publications_df is expected to be already standardized.
 
     Args:
@@ -12,12 +48,96 @@ def find_drug_mentions(publications_df, drugs_list_upper, source_type):
                                         Expected to have 'date' column already standardized to 'YYYY-MM-DD'.
         drugs_list_upper (list): A list of tuples, where each tuple is (original_drug_name, uppercase_drug_name).
         source_type (str): A string indicating the source of the publication (e.g., "pubmed", "clinical_trial").
+        engine (str): Matcher engine used when no matcher is given ("aho_corasick" or "naive").
+        matcher: Optional pre-built matcher (see build_drug_matcher), reused across calls.
+        with_positions (bool): Yield (row position in publications_df, mention) pairs instead.
+
+    Yields:
+        dict: A drug mention.
+    """
+    matches = _iter_matches(
+        publications_df, drugs_list_upper, source_type, engine, matcher
+    )
+    for position, drugs, original_title, journal, date, pub_id in matches:
+        for drug in drugs:
+            mention = {
+                "drug": drug,
+                "journal": journal,
+                "date": date,
+                "source_type": source_type,
+                "publication_id": pub_id,
+                "publication_title": original_title,
+            }
+            yield (position, mention) if with_positions else mention
+
+
+def iter_mention_tables(
+    publications_df,
+    drugs_list_upper,
+    source_type,
+    engine=DEFAULT_MATCHER_ENGINE,
+    matcher=None,
+    table_rows=DEFAULT_TABLE_ROWS,
+):
+    """
+    Columnar version of iter_drug_mentions (same arguments): mentions are stored in
+    MentionTable chunks of about table_rows mentions, without building a dict per mention.
+    A publication never spans two tables.
+
+    Yields:
+        MentionTable: The next chunk of mentions (never empty).
+    """
+    table = MentionTable()
+    matches = _iter_matches(
+        publications_df, drugs_list_upper, source_type, engine, matcher
+    )
+    for _, drugs, original_title, journal, date, pub_id in matches:
+        publication = table.add_publication(
+            source_type, pub_id, original_title, journal
+        )
+        for drug in drugs:
+            table.add_mention(drug, publication, date)
+        if len(table) >= table_rows:
+            yield table
+            table = MentionTable()
+    if table:
+        yield table
+
+
+def find_mention_table(
+    publications_df,
+    drugs_list_upper,
+    source_type,
+    engine=DEFAULT_MATCHER_ENGINE,
+    matcher=None,
+):
+    """
+    Columnar version of find_drug_mentions (same arguments).
 
     Returns:
-        list: A list of dictionaries, each describing a drug mention.
+        MentionTable: All the mentions found.
+    """
+    table = MentionTable()
+    matches = _iter_matches(
+        publications_df, drugs_list_upper, source_type, engine, matcher
+    )
+    for _, drugs, original_title, journal, date, pub_id in matches:
+        publication = table.add_publication(
+            source_type, pub_id, original_title, journal
+        )
+        for drug in drugs:
+            table.add_mention(drug, publication, date)
+    return table
+
+
+def _iter_matches(publications_df, drugs_list_upper, source_type, engine, matcher):
     """
-    mentions = []
+    Matches the title of every publication with a standardized date.
 
+    Yields:
+        tuple: (row position, names of the drugs mentioned in drugs_list_upper order,
+                title, journal, date, id) of each publication mentioning a drug.
+    """
     # Determine the correct title column name based on the source type
     title_column = "title"
     if source_type == "clinical_trial":
@@ -30,36 +150,50 @@ def find_drug_mentions(publications_df, drugs_list_upper, source_type):
             print(
                 f"Warning: Column '{col}' not found in {source_type} data. Skipping processing for this source."
             )
-            return []  # Return empty list if a critical column is missing
+            return  # No mentions if a critical column is missing
 
     # Ensure necessary columns exist and handle missing values
-    publications_df[title_column] = publications_df[title_column].fillna("")
-    publications_df["journal"] = publications_df["journal"].fillna("")
-    publications_df["id"] = publications_df["id"].fillna("")
-
-    # Iterate over each row in the publications DataFrame
-    for _, row in publications_df.iterrows():
-        title = str(row[title_column]).upper()
-        journal = str(row["journal"])
-        date = row["date"]
-        pub_id = str(row["id"])
-        original_title = str(row[title_column])
+    for column in (title_column, "journal", "id"):
+        publications_df[column] = _fill_missing_text(publications_df[column])
+
+    if matcher is None:
+        matcher = build_drug_matcher(drugs_list_upper, engine)
+    drugs = matcher.drugs_list_upper
+
+    # Iterate over the columns directly (much cheaper than iterrows)
+    for position, (title_value, journal_value, date, id_value) in enumerate(
+        zip(
+            publications_df[title_column],
+            publications_df["journal"],
+            format_date_column(publications_df["date"]),  # datetime64 in compact mode
+            publications_df["id"],
+        )
+    ):
+        original_title = str(title_value)
+        title = original_title.upper()
 
         # Skip processing if the title is empty or the date is None
         if not title or date is None:
             continue
 
-        # Check for each drug if it's mentioned in the current publication's title
-        for drug_name_original, drug_name_upper in drugs_list_upper:
-            if drug_name_upper in title:
-                mentions.append(
-                    {
-                        "drug": drug_name_original,
-                        "journal": journal,
-                        "date": date,
-                        "source_type": source_type,
-                        "publication_id": pub_id,
-                        "publication_title": original_title,
-                    }
-                )
-    return mentions
+        # The matcher returns the drugs mentioned in the title, in drugs_list_upper order
+        drug_indexes = matcher.find(title)
+        if drug_indexes:
+            yield (
+                position,
+                [drugs[drug_index][0] for drug_index in drug_indexes],
+                original_title,
+                str(journal_value),
+                date,
+                str(id_value),
+            )
+
+
+def _fill_missing_text(column):
+    """Replaces missing values with '' (categorical columns included)."""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        if not column.isna().any():
+            return column
+        if "" not in column.cat.categories:
+            column = column.cat.add_categories("")
+    return column.fillna("")
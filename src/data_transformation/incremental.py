@@ -0,0 +1,333 @@
+import hashlib
+import json
+import os
+from collections import defaultdict
+
+from data_cleansing.date_parser import format_date_column
+from data_transformation.drug_matcher import build_drug_matcher
+from utils.checkpoints import file_digest
+
+MANIFEST_VERSION = 1
+DRUG_CHANGE_POLICIES = ("targeted", "full")
+
+# Source type of the mentions -> title column of the publications
+TITLE_COLUMNS = {"pubmed": "title", "clinical_trial": "scientific_title"}
+
+
+def publication_key(source_type, publication_id):
+    """Identifies a publication across runs."""
+    return f"{source_type}:{publication_id}"
+
+
+def hash_publications(publications_df, source_type):
+    """
+    Computes a content hash of every publication, over the fields mentions depend on
+    (title, journal and standardized date). Rows sharing an id are handled as one publication.
+
+    Args:
+        publications_df (pd.DataFrame): Cleaned publications with standardized dates.
+        source_type (str): "pubmed" or "clinical_trial".
+
+    Returns:
+        tuple: (dict publication key -> hash, in order of first occurrence,
+                set of the keys shared by several rows)
+    """
+    hashes = {}
+    duplicated = set()
+    title_column = TITLE_COLUMNS[source_type]
+    if publications_df.empty:
+        return hashes, duplicated
+
+    for pub_id, title, journal, date in zip(
+        publications_df["id"],
+        publications_df[title_column],
+        publications_df["journal"],
+        format_date_column(publications_df["date"]),
+    ):
+        key = publication_key(source_type, _publication_id(pub_id))
+        content = "\x1f".join([str(title), str(journal), str(date)])
+        if key in hashes:
+            duplicated.add(key)
+            content = hashes[key] + "\x1e" + content
+        hashes[key] = hashlib.sha1(content.encode("utf-8")).hexdigest()
+    return hashes, duplicated
+
+
+def drugs_fingerprint(drugs_list_upper):
+    """Fingerprint of the drug list, in order (the order of the mentions depends on it)."""
+    payload = json.dumps([name for name, _ in drugs_list_upper], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_manifest(manifest_path, graph_path=None):
+    """
+    Loads the manifest of the previous run. Any other run (batch, streaming, shard merge)
+    may have rewritten the graph since: the manifest only describes the graph file whose
+    checksum it recorded (see save_manifest).
+
+    Args:
+        manifest_path (str): The manifest file.
+        graph_path (str): The graph file the previous mentions are read from.
+
+    Returns:
+        dict: The manifest, or None if it is missing, unreadable, from another version or
+              written for another graph.
+    """
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        print(f"Warning: Ignoring unreadable manifest '{manifest_path}': {e}")
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        print(f"Warning: Ignoring manifest '{manifest_path}' from another version.")
+        return None
+    if graph_path is not None and manifest.get("graph_sha256") != file_digest(
+        graph_path
+    ):
+        print(
+            f"Warning: Ignoring manifest '{manifest_path}': '{graph_path}' was written by another run."
+        )
+        return None
+    return manifest
+
+
+def save_manifest(manifest_path, manifest, graph_path=None):
+    """
+    Writes the manifest atomically (a crash never leaves a truncated manifest), with the
+    checksum of the graph file it describes.
+    """
+    if graph_path is not None:
+        manifest = {**manifest, "graph_sha256": file_digest(graph_path)}
+    partial_path = manifest_path + ".partial"
+    with open(partial_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(partial_path, manifest_path)
+
+
+def build_manifest(drugs_list_upper, publication_hashes):
+    return {
+        "version": MANIFEST_VERSION,
+        "drugs": [name for name, _ in drugs_list_upper],
+        "drugs_fingerprint": drugs_fingerprint(drugs_list_upper),
+        "publications": publication_hashes,
+    }
+
+
+def find_mentions_incrementally(
+    publications,
+    drugs_list_upper,
+    matcher,
+    find_mentions,
+    previous_manifest,
+    previous_mentions,
+    drug_change_policy="targeted",
+    title_index=None,
+):
+    """
+    Finds the drug mentions of the current publications, re-using the previous run:
+    only inserted or changed publications are matched, mentions of deleted (or changed)
+    publications are retracted, and the result is merged with the previous mentions.
+
+    When the drug list changed, the "full" policy re-matches every publication, while the
+    "targeted" policy drops the mentions of removed drugs and matches only the added drugs
+    against the unchanged publications. With a title index, only the unchanged publications
+    whose titles contain the added drugs' trigrams are matched (time proportional to the hits).
+
+    Mentions are grouped by publication, in publication order, and by drug list order within
+    a publication: the result is the one a full run gives (rows sharing an id aside, whose
+    mentions are kept together).
+
+    Args:
+        publications (list): Tuples (publications_df, source_type), in output order.
+        drugs_list_upper (list): A list of tuples (original_drug_name, uppercase_drug_name).
+        matcher: The matcher built from drugs_list_upper.
+        find_mentions (callable): find_drug_mentions (or its parallel version).
+        previous_manifest (dict): Manifest of the previous run, or None.
+        previous_mentions (list): Mentions of the previous run, or None.
+        drug_change_policy (str): "targeted" or "full".
+        title_index (TitleIndex): Optional title index, synchronised with the current publications.
+
+    Returns:
+        tuple: (list of mentions, manifest of this run)
+    """
+    if drug_change_policy not in DRUG_CHANGE_POLICIES:
+        raise ValueError(
+            f"Unknown drug change policy '{drug_change_policy}'. Expected one of: {', '.join(DRUG_CHANGE_POLICIES)}."
+        )
+
+    current_hashes = {}
+    duplicated = set()
+    for publications_df, source_type in publications:
+        hashes, source_duplicated = hash_publications(publications_df, source_type)
+        current_hashes.update(hashes)
+        duplicated |= source_duplicated
+    manifest = build_manifest(drugs_list_upper, current_hashes)
+
+    publication_keys = [
+        (
+            [
+                publication_key(source_type, _publication_id(pub_id))
+                for pub_id in publications_df["id"]
+            ]
+            if not publications_df.empty
+            else []
+        )
+        for publications_df, source_type in publications
+    ]
+    if title_index is not None:
+        indexed = title_index.sync(
+            [
+                (keys, publications_df[TITLE_COLUMNS[source_type]])
+                for keys, (publications_df, source_type) in zip(
+                    publication_keys, publications
+                )
+                if not publications_df.empty
+            ],
+            current_hashes,
+        )
+        print(f"Title index: {indexed} publications indexed.")
+
+    full_rebuild_reason = None
+    if previous_manifest is None or previous_mentions is None:
+        full_rebuild_reason = "no previous run to build on"
+    elif (
+        previous_manifest["drugs_fingerprint"] != manifest["drugs_fingerprint"]
+        and drug_change_policy == "full"
+    ):
+        full_rebuild_reason = "the drug list changed"
+
+    if full_rebuild_reason:
+        print(f"Incremental mode: full rebuild ({full_rebuild_reason}).")
+        mentions = []
+        for publications_df, source_type in publications:
+            mentions.extend(
+                find_mentions(
+                    publications_df, drugs_list_upper, source_type, matcher=matcher
+                )
+            )
+        return mentions, manifest
+
+    # 1. Diff the publications
+    previous_hashes = previous_manifest["publications"]
+    inserted = current_hashes.keys() - previous_hashes.keys()
+    deleted = previous_hashes.keys() - current_hashes.keys()
+    changed = {
+        key
+        for key in current_hashes.keys() & previous_hashes.keys()
+        if current_hashes[key] != previous_hashes[key]
+    }
+
+    # 2. Diff the drug list
+    current_drugs = [name for name, _ in drugs_list_upper]
+    added_drugs = set(current_drugs) - set(previous_manifest["drugs"])
+    removed_drugs = set(previous_manifest["drugs"]) - set(current_drugs)
+
+    # Publications spread over several rows are re-matched as a whole when drugs are
+    # added, so that their mentions keep the row order of a full run.
+    to_match = inserted | changed
+    if added_drugs:
+        to_match |= duplicated
+    print(
+        f"Incremental mode: {len(inserted)} inserted, {len(changed)} changed, {len(deleted)} deleted publications; "
+        f"{len(added_drugs)} added, {len(removed_drugs)} removed drugs."
+    )
+
+    # 3. Keep the previous mentions of unchanged publications and remaining drugs
+    kept_mentions = [
+        mention
+        for mention in previous_mentions
+        if _mention_key(mention) in current_hashes
+        and _mention_key(mention) not in to_match
+        and mention["drug"] not in removed_drugs
+    ]
+
+    # 4. Match the new and changed publications with every drug, and the unchanged
+    # ones with the added drugs only
+    added_drugs_list_upper = [
+        drug for drug in drugs_list_upper if drug[0] in added_drugs
+    ]
+    added_drugs_matcher = (
+        build_drug_matcher(added_drugs_list_upper) if added_drugs_list_upper else None
+    )
+    added_drugs_candidates = None
+    if added_drugs_matcher is not None and title_index is not None:
+        added_drugs_candidates = set()
+        for _, drug_upper in added_drugs_list_upper:
+            candidates = title_index.candidates(drug_upper)
+            if candidates is None:  # too short to be looked up: scan every title
+                added_drugs_candidates = None
+                break
+            added_drugs_candidates |= candidates
+        if added_drugs_candidates is not None:
+            print(
+                f"Title index: {len(added_drugs_candidates)} candidate publications for the added drugs."
+            )
+
+    new_mentions = []
+    for keys, (publications_df, source_type) in zip(publication_keys, publications):
+        if publications_df.empty:
+            continue
+        match_mask = [key in to_match for key in keys]
+        new_mentions.extend(
+            find_mentions(
+                publications_df[match_mask].copy(),
+                drugs_list_upper,
+                source_type,
+                matcher=matcher,
+            )
+        )
+        if added_drugs_matcher is not None:
+            scan_mask = [not match for match in match_mask]
+            if added_drugs_candidates is not None:
+                scan_mask = [
+                    scan and key in added_drugs_candidates
+                    for scan, key in zip(scan_mask, keys)
+                ]
+            new_mentions.extend(
+                find_mentions(
+                    publications_df[scan_mask].copy(),
+                    added_drugs_list_upper,
+                    source_type,
+                    matcher=added_drugs_matcher,
+                )
+            )
+
+    mentions = merge_mentions(
+        current_hashes, kept_mentions, new_mentions, current_drugs, duplicated
+    )
+    return mentions, manifest
+
+
+def merge_mentions(ordered_keys, kept_mentions, new_mentions, drug_names, duplicated):
+    """
+    Merges previous and new mentions, grouped by publication in ordered_keys order, and by
+    drug list order within a publication (the order a full run produces).
+    """
+    drug_order = {name: index for index, name in enumerate(drug_names)}
+    by_publication = defaultdict(list)
+    for mention in kept_mentions:
+        by_publication[_mention_key(mention)].append(mention)
+    for mention in new_mentions:
+        by_publication[_mention_key(mention)].append(mention)
+
+    merged = []
+    for key in ordered_keys:
+        publication_mentions = by_publication.get(key)
+        if not publication_mentions:
+            continue
+        if key not in duplicated:
+            publication_mentions.sort(key=lambda mention: drug_order[mention["drug"]])
+        merged.extend(publication_mentions)
+    return merged
+
+
+def _publication_id(value):
+    # Missing ids become "" in the mentions (see find_drug_mentions)
+    return "" if value is None or value != value else str(value)
+
+
+def _mention_key(mention):
+    return publication_key(mention["source_type"], mention["publication_id"])
@@ -0,0 +1,302 @@
+import itertools
+from array import array
+
+# Fields of a mention record, in the order of the graph files
+MENTION_FIELDS = (
+    "drug",
+    "journal",
+    "date",
+    "source_type",
+    "publication_id",
+    "publication_title",
+)
+
+# Mentions per table when the pipeline produces them in chunks
+DEFAULT_TABLE_ROWS = 10_000
+
+
+class MentionRecord:
+    """
+    Read-only view of one row of a MentionTable. It reads like a mention dict
+    (record["drug"], record.get("journal"), record.keys()...) without holding any value.
+    """
+
+    __slots__ = ("table", "row")
+
+    def __init__(self, table, row):
+        self.table = table
+        self.row = row
+
+    @property
+    def drug(self):
+        return self.table.drugs[self.table.drug[self.row]]
+
+    @property
+    def journal(self):
+        table = self.table
+        return table.journals[table.publication_journals[table.publication[self.row]]]
+
+    @property
+    def date(self):
+        return self.table.dates[self.table.date[self.row]]
+
+    @property
+    def source_type(self):
+        table = self.table
+        return table.sources[table.publication_sources[table.publication[self.row]]]
+
+    @property
+    def publication_id(self):
+        return self.table.publication_ids[self.table.publication[self.row]]
+
+    @property
+    def publication_title(self):
+        return self.table.publication_titles[self.table.publication[self.row]]
+
+    def __getitem__(self, field):
+        if field not in MENTION_FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def get(self, field, default=None):
+        return getattr(self, field) if field in MENTION_FIELDS else default
+
+    def keys(self):
+        return MENTION_FIELDS
+
+    def __contains__(self, field):
+        return field in MENTION_FIELDS
+
+    def __iter__(self):
+        return iter(MENTION_FIELDS)
+
+    def to_dict(self):
+        """Returns the mention as a dict, as found by find_drug_mentions."""
+        return {field: getattr(self, field) for field in MENTION_FIELDS}
+
+    def __eq__(self, other):
+        if isinstance(other, MentionRecord):
+            other = other.to_dict()
+        return self.to_dict() == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"MentionRecord({self.to_dict()!r})"
+
+
+class MentionTable:
+    """
+    Columnar, array-backed container of mentions. Each distinct drug, journal, source type
+    and date is stored once, and each publication (source type, id, title, journal) once;
+    a mention is three integer codes in typed arrays: its drug, its publication and its date.
+    Iterating over the table yields MentionRecord views in insertion order, so the writers
+    and the analysis functions read it like a list of mention dicts.
+
+    Usage:
+        table = MentionTable()
+        publication = table.add_publication("pubmed", "1", "A title", "A journal")
+        table.add_mention("Aspirin", publication, "2020-01-01")
+    """
+
+    def __init__(self):
+        self.drugs = []
+        self.journals = []
+        self.sources = []
+        self.dates = []
+        self.publication_ids = []
+        self.publication_titles = []
+        self.publication_journals = array("i")
+        self.publication_sources = array("i")
+        # Mention columns: codes into the tables above
+        self.drug = array("i")
+        self.publication = array("i")
+        self.date = array("i")
+        self._codes = {"drugs": {}, "journals": {}, "sources": {}, "dates": {}}
+        self._publications = {}
+
+    def _code(self, vocabulary, value):
+        codes = self._codes[vocabulary]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(codes)
+            getattr(self, vocabulary).append(value)
+        return code
+
+    def add_publication(self, source_type, publication_id, title, journal):
+        """
+        Returns:
+            int: The code of the publication, added if it is new.
+        """
+        journal_code = self._code("journals", journal)
+        source_code = self._code("sources", source_type)
+        key = (source_code, publication_id, title, journal_code)
+        code = self._publications.get(key)
+        if code is None:
+            code = self._publications[key] = len(self._publications)
+            self.publication_ids.append(publication_id)
+            self.publication_titles.append(title)
+            self.publication_journals.append(journal_code)
+            self.publication_sources.append(source_code)
+        return code
+
+    def add_mention(self, drug, publication, date):
+        """Adds a mention of a drug by a publication (see add_publication)."""
+        self.drug.append(self._code("drugs", drug))
+        self.publication.append(publication)
+        self.date.append(self._code("dates", date))
+
+    def append(self, record):
+        """Adds one mention record (a dict or a MentionRecord)."""
+        publication = self.add_publication(
+            record["source_type"],
+            record["publication_id"],
+            record["publication_title"],
+            record["journal"],
+        )
+        self.add_mention(record["drug"], publication, record["date"])
+
+    def extend(self, records):
+        """Adds every mention record of an iterable."""
+        for record in records:
+            self.append(record)
+
+    def extend_table(self, other):
+        """Adds every mention of another table, re-coding its values into this one's."""
+        drugs = [self._code("drugs", drug) for drug in other.drugs]
+        dates = [self._code("dates", date) for date in other.dates]
+        publications = [
+            self.add_publication(
+                other.sources[source], publication_id, title, other.journals[journal]
+            )
+            for source, publication_id, title, journal in zip(
+                other.publication_sources,
+                other.publication_ids,
+                other.publication_titles,
+                other.publication_journals,
+            )
+        ]
+        self.drug.extend(drugs[code] for code in other.drug)
+        self.publication.extend(publications[code] for code in other.publication)
+        self.date.extend(dates[code] for code in other.date)
+
+    def iter_values(self):
+        """
+        Yields:
+            tuple: The values of each mention, in MENTION_FIELDS order.
+        """
+        drugs, dates = self.drugs, self.dates
+        journals, sources = self.journals, self.sources
+        for drug, publication, date in zip(self.drug, self.publication, self.date):
+            yield (
+                drugs[drug],
+                journals[self.publication_journals[publication]],
+                dates[date],
+                sources[self.publication_sources[publication]],
+                self.publication_ids[publication],
+                self.publication_titles[publication],
+            )
+
+    @classmethod
+    def from_normalized(cls, graph):
+        """
+        Rebuilds a table from the node and edge tables of a normalized graph
+        (see to_normalized), e.g. as read from a NormalizedGraphWriter file.
+        """
+        table = cls()
+        table.drugs = list(graph["drugs"])
+        table.journals = list(graph["journals"])
+        table.sources = list(graph["sources"])
+        table.dates = list(graph["dates"])
+        publications, edges = graph["publications"], graph["edges"]
+        table.publication_ids = list(publications["id"])
+        table.publication_titles = list(publications["title"])
+        table.publication_journals = array("i", publications["journal"])
+        # The source of a publication is stored on its edges
+        table.publication_sources = array("i", bytes(4 * len(table.publication_ids)))
+        for publication, source in zip(edges["publication"], edges["source"]):
+            table.publication_sources[publication] = source
+        table.drug = array("i", edges["drug"])
+        table.publication = array("i", edges["publication"])
+        table.date = array("i", edges["date"])
+        for vocabulary, codes in table._codes.items():
+            codes.update(
+                (value, code) for code, value in enumerate(getattr(table, vocabulary))
+            )
+        table._publications = {
+            key: code
+            for code, key in enumerate(
+                zip(
+                    table.publication_sources,
+                    table.publication_ids,
+                    table.publication_titles,
+                    table.publication_journals,
+                )
+            )
+        }
+        return table
+
+    def to_normalized(self):
+        """
+        Returns:
+            dict: The node and edge tables of the normalized graph format
+                  (see graph_writer.NormalizedGraphWriter), without the format header.
+        """
+        return {
+            "drugs": self.drugs,
+            "journals": self.journals,
+            "sources": self.sources,
+            "dates": self.dates,
+            "publications": {
+                "id": self.publication_ids,
+                "title": self.publication_titles,
+                "journal": self.publication_journals.tolist(),
+            },
+            "edges": {
+                "drug": self.drug.tolist(),
+                "publication": self.publication.tolist(),
+                "date": self.date.tolist(),
+                "source": [
+                    self.publication_sources[publication]
+                    for publication in self.publication
+                ],
+            },
+        }
+
+    def __len__(self):
+        return len(self.drug)
+
+    def __getitem__(self, row):
+        if not -len(self) <= row < len(self):
+            raise IndexError("mention row out of range")
+        return MentionRecord(self, row % len(self))
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield MentionRecord(self, row)
+
+
+def chunk_mentions(records, table_rows=DEFAULT_TABLE_ROWS):
+    """
+    Packs mention records (e.g. dicts) into tables of table_rows mentions.
+
+    Yields:
+        MentionTable: The next table.
+    """
+    records = iter(records)
+    while True:
+        table = MentionTable()
+        table.extend(itertools.islice(records, table_rows))
+        if not table:
+            return
+        yield table
+
+
+def iter_mention_dicts(tables):
+    """
+    Yields:
+        dict: The mentions of the tables, as dicts.
+    """
+    for table in tables:
+        for values in table.iter_values():
+            yield dict(zip(MENTION_FIELDS, values))
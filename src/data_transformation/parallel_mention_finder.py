@@ -0,0 +1,124 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from data_transformation.drug_matcher import DEFAULT_MATCHER_ENGINE, build_drug_matcher
+from data_transformation.drug_mention_finder import (
+    find_mention_table,
+    iter_mention_tables,
+)
+from data_transformation.mention_table import iter_mention_dicts
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+# Matcher installed once per worker process by _init_worker
+_worker_matcher = None
+
+
+def _init_worker(matcher):
+    global _worker_matcher
+    _worker_matcher = matcher
+
+
+def _find_mentions_in_shard(shard_df, source_type):
+    # One table per shard: it is pickled back as a few arrays and distinct values
+    return find_mention_table(
+        shard_df,
+        _worker_matcher.drugs_list_upper,
+        source_type,
+        matcher=_worker_matcher,
+    )
+
+
+def find_drug_mentions_parallel(
+    publications_df,
+    drugs_list_upper,
+    source_type,
+    workers=None,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    engine=DEFAULT_MATCHER_ENGINE,
+    matcher=None,
+):
+    """
+    Parallel version of find_drug_mentions (see iter_mention_tables_parallel).
+
+    Returns:
+        list: A list of dictionaries, each describing a drug mention.
+    """
+    return list(
+        iter_mention_dicts(
+            iter_mention_tables_parallel(
+                publications_df,
+                drugs_list_upper,
+                source_type,
+                workers,
+                chunk_size,
+                engine,
+                matcher,
+            )
+        )
+    )
+
+
+def iter_mention_tables_parallel(
+    publications_df,
+    drugs_list_upper,
+    source_type,
+    workers=None,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    engine=DEFAULT_MATCHER_ENGINE,
+    matcher=None,
+):
+    """
+    Parallel version of iter_mention_tables.
+    The publications DataFrame is split into row shards matched in a process pool.
+    The drug matcher is shipped to each worker once (pool initializer), and each worker
+    sends the mentions of its shard back as one MentionTable. Tables are yielded in shard
+    order, so the mentions are identical to a single-process run.
+
+    Args:
+        publications_df (pd.DataFrame): Publications with a standardized 'date' column.
+        drugs_list_upper (list): A list of tuples (original_drug_name, uppercase_drug_name).
+        source_type (str): "pubmed" or "clinical_trial".
+        workers (int): Number of worker processes (defaults to the number of CPUs).
+        chunk_size (int): Number of publications per shard.
+        engine (str): Matcher engine used when no matcher is given.
+        matcher: Optional pre-built matcher (see build_drug_matcher).
+
+    Yields:
+        MentionTable: The mentions of the next shard (never empty).
+    """
+    if matcher is None:
+        matcher = build_drug_matcher(drugs_list_upper, engine)
+    workers = workers or os.cpu_count() or 1
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be a positive integer, got {chunk_size}.")
+
+    title_column = "scientific_title" if source_type == "clinical_trial" else "title"
+    columns = [title_column, "journal", "id", "date"]
+
+    # Not worth spawning processes for a single shard. Missing columns are reported
+    # once by iter_mention_tables rather than by every worker.
+    if (
+        workers == 1
+        or len(publications_df) <= chunk_size
+        or not set(columns).issubset(publications_df.columns)
+    ):
+        yield from iter_mention_tables(
+            publications_df, drugs_list_upper, source_type, matcher=matcher
+        )
+        return
+
+    # Only ship the columns needed for matching
+    shards = (
+        publications_df.iloc[start : start + chunk_size][columns]
+        for start in range(0, len(publications_df), chunk_size)
+    )
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(matcher,)
+    ) as executor:
+        # executor.map yields results in submission order: the merge is deterministic
+        for table in executor.map(_find_mentions_in_shard, shards, repeat(source_type)):
+            if table:
+                yield table
@@ -0,0 +1,267 @@
+import contextlib
+import heapq
+import json
+import os
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from data_output.graph_reader import iter_graph_records
+from data_output.graph_writer import NdjsonWriter
+from data_transformation.drug_matcher import DEFAULT_MATCHER_ENGINE, build_drug_matcher
+from data_transformation.drug_mention_finder import iter_drug_mentions
+from utils.checkpoints import file_digest
+
+SHARD_MANIFEST_VERSION = 1
+SHARD_MANIFEST_FILE = "manifest.json"
+DRUGS_FILE = "drugs.json"
+
+# Columns of each publication source kept in the shards (the ones the mention finder reads)
+SHARD_COLUMNS = {
+    "pubmed": ["id", "title", "date", "journal"],
+    "clinical_trial": ["id", "scientific_title", "date", "journal"],
+}
+
+
+class ShardError(Exception):
+    """Raised when shards, or their results, do not match the shard manifest."""
+
+
+def shard_path(shards_dir, shard):
+    """Publications of a shard: NDJSON lines [source, sequence, values] (gzip-compressed)."""
+    return os.path.join(shards_dir, f"shard-{shard:04d}.ndjson.gz")
+
+
+def mentions_path(shards_dir, shard):
+    """Mentions found in a shard: NDJSON lines [source, sequence, mention] (gzip-compressed)."""
+    return os.path.join(shards_dir, f"mentions-{shard:04d}.ndjson.gz")
+
+
+def result_path(shards_dir, shard):
+    """Result of a shard run: checksums of what it read and wrote."""
+    return os.path.join(shards_dir, f"mentions-{shard:04d}.json")
+
+
+def shard_of_ids(ids, shards):
+    """
+    Shard of each publication: CRC-32 of its id (as text) modulo the number of shards.
+    CRC-32 is stable across machines and Python processes, unlike hash().
+
+    Returns:
+        np.ndarray: The shard number of each id.
+    """
+    return np.fromiter(
+        (zlib.crc32(str(pub_id).encode("utf-8")) % shards for pub_id in ids),
+        dtype=np.int64,
+        count=len(ids),
+    )
+
+
+def _save_json(path, value):
+    """Writes a JSON file atomically."""
+    partial_path = path + ".partial"
+    with open(partial_path, "w", encoding="utf-8") as f:
+        json.dump(value, f, ensure_ascii=False, indent=2)
+    os.replace(partial_path, path)
+
+
+def _load_json(path, description):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise ShardError(f"Missing {description}: '{path}'") from None
+    except json.JSONDecodeError as e:
+        raise ShardError(f"Unreadable {description} '{path}': {e}") from None
+
+
+def partition_publications(publications, drugs_list_upper, shards_dir, shards):
+    """
+    Partition step: hash-partitions the cleaned and date-standardized publications by id
+    into shard files, and writes the drug list and the manifest of the shards next to them.
+    Every publication gets its row number in its source as sequence number, so that the
+    merge step can restore the order of a single-process run.
+
+    Args:
+        publications (list): (DataFrame, source) pairs in graph order (sources of SHARD_COLUMNS).
+        drugs_list_upper (list): The (original_drug_name, uppercase_drug_name) tuples.
+        shards_dir (str): Directory of the shard files (created if needed). Results of a
+                          previous partitioning are removed.
+        shards (int): Number of shards.
+
+    Returns:
+        dict: The manifest.
+    """
+    if shards < 1:
+        raise ValueError(f"The number of shards must be at least 1, got {shards}")
+    os.makedirs(shards_dir, exist_ok=True)
+    for name in os.listdir(shards_dir):
+        if name.startswith("mentions-"):
+            os.remove(os.path.join(shards_dir, name))
+
+    drugs_path = os.path.join(shards_dir, DRUGS_FILE)
+    _save_json(drugs_path, [list(drug) for drug in drugs_list_upper])
+
+    with contextlib.ExitStack() as stack:
+        writers = [
+            stack.enter_context(
+                NdjsonWriter(shard_path(shards_dir, shard), compress=True)
+            )
+            for shard in range(shards)
+        ]
+        for source_rank, (df, source) in enumerate(publications):
+            targets = shard_of_ids(df["id"], shards)
+            values = zip(*(df[column] for column in SHARD_COLUMNS[source]))
+            for sequence, (target, row) in enumerate(zip(targets, values)):
+                writers[target].write([source_rank, sequence, list(row)])
+
+    manifest = {
+        "version": SHARD_MANIFEST_VERSION,
+        "shards": shards,
+        "sources": [source for _, source in publications],
+        "drugs": {"path": DRUGS_FILE, "sha256": file_digest(drugs_path)},
+        "files": [
+            {
+                "shard": shard,
+                "path": os.path.basename(shard_path(shards_dir, shard)),
+                "sha256": file_digest(shard_path(shards_dir, shard)),
+                "rows": writers[shard].count,
+            }
+            for shard in range(shards)
+        ],
+    }
+    _save_json(os.path.join(shards_dir, SHARD_MANIFEST_FILE), manifest)
+    return manifest
+
+
+def load_shard_manifest(shards_dir):
+    """
+    Reads the manifest of a partitioning.
+
+    Raises:
+        ShardError: If it is missing, unreadable or of another version.
+    """
+    manifest = _load_json(
+        os.path.join(shards_dir, SHARD_MANIFEST_FILE), "shard manifest"
+    )
+    if manifest.get("version") != SHARD_MANIFEST_VERSION:
+        raise ShardError(
+            f"Unsupported shard manifest version {manifest.get('version')} in '{shards_dir}'"
+        )
+    return manifest
+
+
+def _check_digest(path, expected, description):
+    actual = file_digest(path)
+    if actual is None:
+        raise ShardError(f"Missing {description}: '{path}'")
+    if actual != expected:
+        raise ShardError(
+            f"Checksum mismatch for {description} '{path}': expected {expected}, got {actual}"
+        )
+
+
+def process_shard(shards_dir, shard, matcher_engine=DEFAULT_MATCHER_ENGINE):
+    """
+    Shard step: finds the drug mentions of one shard, independently of the others. Only
+    needs the shard directory (or a copy of the manifest, the drug list and this shard's
+    file), so shards can run on different machines.
+
+    The mentions are written with the source and sequence number of their publication, and
+    a result file records the checksums of the shard and drug list read and of the mentions
+    written, for the merge step.
+
+    Returns:
+        int: The number of mentions found.
+
+    Raises:
+        ShardError: If the shard or the drug list do not match the manifest.
+    """
+    manifest = load_shard_manifest(shards_dir)
+    if not 0 <= shard < manifest["shards"]:
+        raise ShardError(f"No shard {shard}: the manifest has {manifest['shards']}")
+    entry = manifest["files"][shard]
+    input_path = os.path.join(shards_dir, entry["path"])
+    drugs_path = os.path.join(shards_dir, manifest["drugs"]["path"])
+    _check_digest(input_path, entry["sha256"], f"shard {shard}")
+    _check_digest(drugs_path, manifest["drugs"]["sha256"], "drug list")
+
+    drugs_list_upper = [tuple(drug) for drug in _load_json(drugs_path, "drug list")]
+    matcher = build_drug_matcher(drugs_list_upper, matcher_engine)
+
+    rows_by_source = {
+        source_rank: ([], []) for source_rank in range(len(manifest["sources"]))
+    }
+    for source_rank, sequence, values in iter_graph_records(input_path):
+        sequences, rows = rows_by_source[source_rank]
+        sequences.append(sequence)
+        rows.append(values)
+
+    output_path = mentions_path(shards_dir, shard)
+    partial_path = output_path + ".partial"
+    with NdjsonWriter(partial_path, compress=True) as writer:
+        for source_rank, source in enumerate(manifest["sources"]):
+            sequences, rows = rows_by_source[source_rank]
+            df = pd.DataFrame(rows, columns=SHARD_COLUMNS[source])
+            for position, mention in iter_drug_mentions(
+                df, drugs_list_upper, source, matcher=matcher, with_positions=True
+            ):
+                writer.write([source_rank, sequences[position], mention])
+    os.replace(partial_path, output_path)
+
+    _save_json(
+        result_path(shards_dir, shard),
+        {
+            "shard": shard,
+            "input_sha256": entry["sha256"],
+            "drugs_sha256": manifest["drugs"]["sha256"],
+            "path": os.path.basename(output_path),
+            "sha256": file_digest(output_path),
+            "mentions": writer.count,
+        },
+    )
+    return writer.count
+
+
+def check_shard_results(shards_dir):
+    """
+    Checks that every shard of the manifest was processed from the shard file and drug list
+    of the manifest, and that its mentions file is intact.
+
+    Returns:
+        list: The mentions files, by shard.
+
+    Raises:
+        ShardError: If a shard result is missing or does not match the manifest.
+    """
+    manifest = load_shard_manifest(shards_dir)
+    paths = []
+    for entry in manifest["files"]:
+        shard = entry["shard"]
+        result = _load_json(result_path(shards_dir, shard), f"result of shard {shard}")
+        if (
+            result.get("input_sha256") != entry["sha256"]
+            or result.get("drugs_sha256") != manifest["drugs"]["sha256"]
+        ):
+            raise ShardError(
+                f"Shard {shard} was processed from other inputs than the manifest's: run it again"
+            )
+        path = os.path.join(shards_dir, result["path"])
+        _check_digest(path, result["sha256"], f"mentions of shard {shard}")
+        paths.append(path)
+    return paths
+
+
+def iter_merged_mentions(paths):
+    """
+    Merge step: merges the mentions files of the shards (see check_shard_results) in the
+    order of a single-process run, by source then publication sequence number. The files
+    are streamed: memory does not depend on the number of mentions.
+
+    Yields:
+        dict: The next mention.
+    """
+    streams = [iter_graph_records(path) for path in paths]
+    for _, _, mention in heapq.merge(*streams, key=lambda line: (line[0], line[1])):
+        yield mention
@@ -0,0 +1,368 @@
+import json
+import os
+
+import numpy as np
+
+TITLE_INDEX_VERSION = 1
+TITLE_INDEX_META_FILE = "meta.json"
+
+# Tombstoned publications are purged (and segments merged) past these limits
+COMPACTION_TOMBSTONE_RATIO = 0.25
+MAX_SEGMENTS = 8
+
+# Publications indexed per batch: bounds the memory used to build a segment
+INDEX_BATCH_SIZE = 100_000
+
+TRIGRAM_LENGTH = 3
+# A trigram code packs 10 bits of each code point: characters sharing their low bits collide,
+# which only adds candidates (they are verified by the matcher), never misses one.
+CHAR_BITS = 10
+CHAR_MASK = (1 << CHAR_BITS) - 1
+# A posting (code, ordinal) is packed in one uint64, so that a single sort orders the postings
+ORDINAL_BITS = 64 - 3 * CHAR_BITS
+ORDINAL_MASK = (1 << ORDINAL_BITS) - 1
+SEGMENT_ARRAYS = ("codes", "indptr", "ordinals")
+
+
+def _codes_of_chars(chars):
+    chars = chars & CHAR_MASK
+    return (chars[:-2] << (2 * CHAR_BITS)) | (chars[1:-1] << CHAR_BITS) | chars[2:]
+
+
+def _chars(text):
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+
+
+def trigram_codes(text):
+    """
+    Codes of the distinct character trigrams of a string.
+
+    Returns:
+        np.ndarray: Sorted uint64 codes (empty for strings shorter than 3 characters).
+    """
+    chars = _chars(text)
+    if len(chars) < TRIGRAM_LENGTH:
+        return np.empty(0, dtype=np.uint64)
+    return np.unique(_codes_of_chars(chars))
+
+
+def _postings_of_titles(titles_upper, ordinals):
+    """
+    (trigram code, publication ordinal) pairs of a batch of uppercase titles, vectorised
+    over the whole batch: trigrams crossing two titles are dropped.
+
+    Returns:
+        tuple: (codes, ordinals), sorted by code then ordinal, without duplicates.
+    """
+    lengths = np.fromiter((len(title) for title in titles_upper), dtype=np.int64)
+    chars = _chars("".join(titles_upper))
+    if len(chars) < TRIGRAM_LENGTH:
+        return np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int64)
+    rows = np.repeat(np.arange(len(titles_upper)), lengths)
+    within_title = rows[:-2] == rows[2:]
+    codes = _codes_of_chars(chars)[within_title]
+    owners = np.asarray(ordinals, dtype=np.uint64)[rows[:-2][within_title]]
+    return _sorted_unique_pairs(codes, owners)
+
+
+def _sorted_unique_pairs(codes, ordinals):
+    # np.sort and a mask: much faster than np.unique on large uint64 arrays
+    packed = np.sort(
+        (codes.astype(np.uint64) << ORDINAL_BITS) | ordinals.astype(np.uint64)
+    )
+    packed = packed[_first_of_runs(packed)]
+    return packed >> ORDINAL_BITS, (packed & ORDINAL_MASK).astype(np.int64)
+
+
+def _first_of_runs(sorted_values):
+    """Mask of the first element of each run of equal values in a sorted array."""
+    first = np.ones(len(sorted_values), dtype=bool)
+    first[1:] = sorted_values[1:] != sorted_values[:-1]
+    return first
+
+
+class TitleSegment:
+    """
+    Immutable inverted lists of a batch of publications, in CSR form:
+    the sorted distinct trigram codes, and for each one its sorted publication ordinals.
+    """
+
+    def __init__(self, codes, indptr, ordinals):
+        self.codes = codes
+        self.indptr = indptr
+        self.ordinals = ordinals
+
+    @classmethod
+    def from_pairs(cls, codes, ordinals):
+        """Builds a segment from (code, ordinal) pairs sorted by code then ordinal."""
+        starts = np.flatnonzero(_first_of_runs(codes))
+        indptr = np.append(starts, len(codes)).astype(np.int64)
+        return cls(codes[starts], indptr, ordinals.astype(np.int64))
+
+    @classmethod
+    def load(cls, path_prefix):
+        """Memory-maps the arrays of a segment ('<path_prefix>.<array>.npy' files)."""
+        return cls(
+            *(
+                np.load(f"{path_prefix}.{name}.npy", mmap_mode="r")
+                for name in SEGMENT_ARRAYS
+            )
+        )
+
+    def save(self, path_prefix):
+        for name in SEGMENT_ARRAYS:
+            np.save(f"{path_prefix}.{name}.npy", getattr(self, name))
+
+    def __len__(self):
+        return len(self.ordinals)
+
+    def postings(self, code):
+        position = np.searchsorted(self.codes, code)
+        if position == len(self.codes) or self.codes[position] != code:
+            return self.ordinals[:0]
+        return self.ordinals[self.indptr[position] : self.indptr[position + 1]]
+
+    def pairs(self):
+        """The (code, ordinal) pairs of the segment."""
+        codes = np.repeat(np.asarray(self.codes), np.diff(self.indptr))
+        return codes, np.asarray(self.ordinals)
+
+    def candidates(self, codes):
+        """
+        Ordinals of the publications containing every trigram code. The shortest
+        inverted list is filtered against the others with binary searches, so the cost
+        follows the number of hits rather than the size of the segment.
+        """
+        lists = sorted((self.postings(code) for code in codes), key=len)
+        result = np.asarray(lists[0])
+        for postings in lists[1:]:
+            if not len(result):
+                break
+            positions = np.searchsorted(postings, result)
+            positions[positions == len(postings)] = 0
+            result = result[np.asarray(postings)[positions] == result]
+        return result
+
+
+class TitleIndex:
+    """
+    Persisted character-trigram inverted index over publication titles.
+
+    Drugs are matched as substrings of the uppercase titles, so a word-token index would
+    miss drugs embedded in longer words: every publication mentioning a drug contains all
+    the drug's trigrams instead, and the publications containing them are a small superset
+    of the matches, verified with the drug matcher.
+
+    Publications are identified by their key (see incremental.publication_key) and their
+    content hash: an entry is only used while the publication's hash is unchanged. Each
+    indexed publication gets an ordinal. Updates are append-only: a changed or deleted
+    publication is tombstoned, and new postings are written as a new segment. Tombstones
+    are purged and segments merged when they pile up (compaction).
+
+    On disk (a directory): meta.json (keys, hashes, tombstones, segment names) and the
+    .npy arrays of each segment, memory-mapped when the index is opened.
+    """
+
+    def __init__(self, index_path):
+        self.index_path = index_path
+        self.keys = []  # ordinal -> publication key
+        self.hashes = []  # ordinal -> content hash
+        self.tombstones = set()
+        self.segment_files = []
+        self.segments = []
+        self._live = {}  # publication key -> ordinal
+        self._new_segments = []  # segments indexed by this run, not yet written
+
+    @classmethod
+    def open(cls, index_path):
+        """
+        Opens a persisted index.
+
+        Returns:
+            TitleIndex: The index, or None if it is missing, unreadable or from another version.
+        """
+        index = cls(index_path)
+        try:
+            with open(
+                os.path.join(index_path, TITLE_INDEX_META_FILE), "r", encoding="utf-8"
+            ) as f:
+                meta = json.load(f)
+            if meta.get("version") != TITLE_INDEX_VERSION:
+                print(
+                    f"Warning: Ignoring title index '{index_path}' from another version."
+                )
+                return None
+            index.keys = meta["keys"]
+            index.hashes = meta["hashes"]
+            index.tombstones = set(meta["tombstones"])
+            index.segment_files = meta["segments"]
+            index.segments = [
+                TitleSegment.load(os.path.join(index_path, name))
+                for name in index.segment_files
+            ]
+        except FileNotFoundError:
+            return None
+        except (json.JSONDecodeError, KeyError, OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable title index '{index_path}': {e}")
+            return None
+        index._live = {
+            key: ordinal
+            for ordinal, key in enumerate(index.keys)
+            if ordinal not in index.tombstones
+        }
+        return index
+
+    def __len__(self):
+        return len(self._live)
+
+    def sync(self, publications, current_hashes):
+        """
+        Brings the index up to date with the current publications: entries whose
+        publication was deleted or changed are tombstoned, and new or changed
+        publications are indexed.
+
+        Args:
+            publications (list): Tuples (publication keys, titles), one key and title per row.
+            current_hashes (dict): Publication key -> content hash (see incremental.hash_publications).
+
+        Returns:
+            int: The number of publications indexed.
+        """
+        for key, ordinal in list(self._live.items()):
+            if current_hashes.get(key) != self.hashes[ordinal]:
+                self.tombstones.add(ordinal)
+                del self._live[key]
+
+        first_new_ordinal = len(self.keys)
+        titles_upper, ordinals = [], []
+        for keys, titles in publications:
+            for key, title in zip(keys, titles):
+                ordinal = self._live.get(key)
+                if ordinal is None:
+                    if len(self.keys) > ORDINAL_MASK:
+                        raise ValueError("Too many publications for the title index.")
+                    ordinal = self._live[key] = len(self.keys)
+                    self.keys.append(key)
+                    self.hashes.append(current_hashes[key])
+                elif ordinal < first_new_ordinal:
+                    continue  # already indexed by a previous run
+                # Rows sharing an id all belong to the same publication
+                titles_upper.append(_title_text(title).upper())
+                ordinals.append(ordinal)
+                if len(titles_upper) >= INDEX_BATCH_SIZE:
+                    self._index_batch(titles_upper, ordinals)
+                    titles_upper, ordinals = [], []
+        if titles_upper:
+            self._index_batch(titles_upper, ordinals)
+        return len(self.keys) - first_new_ordinal
+
+    def _index_batch(self, titles_upper, ordinals):
+        self._new_segments.append(
+            TitleSegment.from_pairs(*_postings_of_titles(titles_upper, ordinals))
+        )
+
+    def candidates(self, drug_upper):
+        """
+        Keys of the publications whose titles may mention a drug (they contain all its trigrams).
+
+        Returns:
+            set: Publication keys, or None if the drug is too short to be looked up.
+        """
+        codes = trigram_codes(drug_upper)
+        if not len(codes):
+            return None
+        keys = set()
+        for segment in self.segments + self._new_segments:
+            for ordinal in segment.candidates(codes).tolist():
+                if ordinal not in self.tombstones:
+                    keys.add(self.keys[ordinal])
+        return keys
+
+    def save(self):
+        """
+        Writes the pending postings as a new segment, compacting the index if needed.
+        Segment files are never overwritten and meta.json is replaced atomically, so a crash
+        leaves the previous index intact.
+        """
+        os.makedirs(self.index_path, exist_ok=True)
+        if self._new_segments:
+            self._add_segment(_merge_segments(self._new_segments))
+            self._new_segments = []
+
+        if len(self.segments) > MAX_SEGMENTS or (
+            self.keys
+            and len(self.tombstones) > COMPACTION_TOMBSTONE_RATIO * len(self.keys)
+        ):
+            self.compact()
+
+        meta = {
+            "version": TITLE_INDEX_VERSION,
+            "keys": self.keys,
+            "hashes": self.hashes,
+            "tombstones": sorted(self.tombstones),
+            "segments": self.segment_files,
+        }
+        meta_path = os.path.join(self.index_path, TITLE_INDEX_META_FILE)
+        with open(meta_path + ".partial", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(meta_path + ".partial", meta_path)
+
+        # Segments dropped by a compaction are deleted once the new meta.json is in place
+        for name in os.listdir(self.index_path):
+            if name.endswith(".npy") and name.split(".")[0] not in self.segment_files:
+                os.remove(os.path.join(self.index_path, name))
+
+    def compact(self):
+        """Purges the tombstoned publications and merges every segment into one."""
+        remap = np.full(len(self.keys), -1, dtype=np.int64)
+        live_ordinals = [
+            ordinal
+            for ordinal in range(len(self.keys))
+            if ordinal not in self.tombstones
+        ]
+        remap[live_ordinals] = np.arange(len(live_ordinals))
+
+        segments = self.segments + self._new_segments
+        merged = _merge_segments(segments, remap) if segments else None
+
+        self.keys = [self.keys[ordinal] for ordinal in live_ordinals]
+        self.hashes = [self.hashes[ordinal] for ordinal in live_ordinals]
+        self.tombstones = set()
+        self._live = {key: ordinal for ordinal, key in enumerate(self.keys)}
+        self.segments, self.segment_files, self._new_segments = [], [], []
+        if merged is not None:
+            self._add_segment(merged)
+
+    def _add_segment(self, segment):
+        existing = {name.split(".")[0] for name in os.listdir(self.index_path)}
+        number = len(existing)
+        while f"segment-{number:06d}" in existing:
+            number += 1
+        name = f"segment-{number:06d}"
+        segment.save(os.path.join(self.index_path, name))
+        self.segments.append(segment)
+        self.segment_files.append(name)
+
+
+def _merge_segments(segments, remap=None):
+    """Merges segments into one, renumbering the ordinals with remap (-1: dropped) if given."""
+    codes, ordinals = [], []
+    for segment in segments:
+        segment_codes, segment_ordinals = segment.pairs()
+        if remap is not None:
+            segment_ordinals = remap[segment_ordinals]
+            keep = segment_ordinals >= 0
+            segment_codes, segment_ordinals = (
+                segment_codes[keep],
+                segment_ordinals[keep],
+            )
+        codes.append(segment_codes)
+        ordinals.append(segment_ordinals)
+    return TitleSegment.from_pairs(
+        *_sorted_unique_pairs(np.concatenate(codes), np.concatenate(ordinals))
+    )
+
+
+def _title_text(value):
+    # Missing titles become "" (see find_drug_mentions)
+    return "" if value is None or value != value else str(value)
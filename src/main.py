@@ -1,154 +1,1010 @@
 import pandas as pd
+import argparse
+import itertools
 import json
 import sys
 import os
 
 # Import modules from your project structure
-from data_ingestion import reader
-from data_cleansing import date_parser
-from data_transformation import drug_mention_finder
-from utils.utils import (
-    is_atccode_multi_level,
-    is_nct_number,
-    clean_skipped_hex_sequences,
+from data_ingestion import dedup, json_stream, reader, schema
+from data_cleansing import cleaning, date_parser
+from data_cleansing.cleaning import (
+    clean_and_validate_source,
+    standardize_dates,
 )
+from data_transformation import drug_matcher, drug_mention_finder, mention_table
+from data_transformation.drug_matcher import (
+    DEFAULT_MATCHER_ENGINE,
+    MATCHER_ENGINES,
+    build_drug_matcher,
+)
+from data_transformation.incremental import (
+    DRUG_CHANGE_POLICIES,
+    find_mentions_incrementally,
+    load_manifest,
+    save_manifest,
+)
+from data_transformation.mention_table import chunk_mentions
+from data_transformation.parallel_mention_finder import (
+    DEFAULT_CHUNK_SIZE,
+    iter_mention_tables_parallel,
+)
+from data_transformation.sharding import (
+    ShardError,
+    check_shard_results,
+    iter_merged_mentions,
+    partition_publications,
+    process_shard,
+)
+from data_transformation.title_index import TitleIndex
+from data_output import graph_writer
+from data_output.background_writer import BackgroundWriteError, BackgroundWriter
+from data_output.graph_reader import (
+    NormalizedGraph,
+    is_ndjson_graph,
+    iter_graph_records,
+)
+from data_output.graph_writer import (
+    DEFAULT_OUTPUT_FORMAT,
+    OUTPUT_FORMATS,
+    graph_file_name,
+    open_graph_writer,
+)
+from analysis import graph_index
+from analysis.graph_index import INDEX_META_FILE, GraphIndexBuilder, graph_index_path
+from utils import utils
+from utils.checkpoints import CheckpointStore, file_digest
+from utils.instrumentation import StageRecorder
 
 # Path definitions
 rawdata_file_path = "./data/raw/"
 cleaned_data_file_path = "./data/cleaned/"
 processed_file_path = "./data/output/"
-output_json = processed_file_path + "drug_journal_mentions_graph.json"
+manifest_json = processed_file_path + "mentions_manifest.json"
+title_index_path = processed_file_path + "title_index/"
+profiles_path = processed_file_path + "profiles/"
+checkpoints_path = "./data/checkpoints/"
+shards_path = "./data/shards/"
 
-# Ensure required directories exist
-os.makedirs(cleaned_data_file_path, exist_ok=True)
-os.makedirs(processed_file_path, exist_ok=True)
+# Columns of each source read by the pipeline (checked by validate_inputs)
+REQUIRED_COLUMNS = {
+    "drugs": ["atccode", "drug"],
+    "pubmed": ["id", "title", "date", "journal"],
+    "clinical_trials": ["id", "scientific_title", "date", "journal"],
+}
+
+# Instrumented stages of the pipeline (see utils/instrumentation.py)
+PIPELINE_STAGES = (
+    "load",
+    "clean_validate",
+    "dates",
+    "save_cleaned",
+    "matching",
+    "write",
+)
 
 
-def main_pipeline():
+def configure_paths(
+    raw_dir=None,
+    cleaned_dir=None,
+    output_dir=None,
+    checkpoint_dir=None,
+    shards_dir=None,
+):
     """
-    Main function for the structured data pipeline.
+    Points the pipeline at other data directories (each one is kept if None): the raw
+    input files of reader.py, the cleaned CSV files, the outputs (graph, manifests,
+    title index and profiles), the stage checkpoints of --resume, and the shard files.
     """
-    print("Starting data pipeline...")
+    global rawdata_file_path, cleaned_data_file_path, processed_file_path
+    global manifest_json, title_index_path, profiles_path
+    global checkpoints_path, shards_path
+    if raw_dir is not None:
+        rawdata_file_path = os.path.join(raw_dir, "")
+        reader.rawdata_file_path = rawdata_file_path
+        reader.drugs_csv_path = rawdata_file_path + "drugs.csv"
+        reader.pubmed_csv_path = rawdata_file_path + "pubmed.csv"
+        reader.pubmed_json_path = rawdata_file_path + "pubmed.json"
+        reader.clinical_trials_csv_path = rawdata_file_path + "clinical_trials.csv"
+    if cleaned_dir is not None:
+        cleaned_data_file_path = os.path.join(cleaned_dir, "")
+    if output_dir is not None:
+        processed_file_path = os.path.join(output_dir, "")
+        manifest_json = processed_file_path + "mentions_manifest.json"
+        title_index_path = processed_file_path + "title_index/"
+        profiles_path = processed_file_path + "profiles/"
+    if checkpoint_dir is not None:
+        checkpoints_path = os.path.join(checkpoint_dir, "")
+    if shards_dir is not None:
+        shards_path = os.path.join(shards_dir, "")
 
-    # 1. Load Data using the reader module
+
+def prepare_drugs_list(drugs_df):
+    """
+    Builds the list of (original_drug_name, uppercase_drug_name) tuples used for mention finding.
+    """
+    return [
+        (drug_name, drug_name.upper())
+        for drug_name in drugs_df["drug"].unique()
+        if pd.notna(drug_name)
+    ]
+
+
+def clean_source(recorder, df, source):
+    """clean_and_validate_source, recorded as the 'clean_validate' stage."""
+    with recorder.stage("clean_validate", rows_in=len(df)) as run:
+        df, rejects = clean_and_validate_source(df, source)
+        run.rows_out = len(df)
+    return df, rejects
+
+
+def standardize_source_dates(recorder, df, compact=False):
+    """standardize_dates, recorded as the 'dates' stage."""
+    with recorder.stage("dates", rows_in=len(df)) as run:
+        standardize_dates(df, compact)
+        run.rows_out = len(df)
+    return df
+
+
+def report_metrics(recorder, metrics_path):
+    """Writes the stage metrics (if requested) and the cProfile dumps of the profiled stages."""
+    recorder.stop()
+    if metrics_path:
+        recorder.write_metrics(metrics_path)
+        print(f"Stage metrics saved to '{metrics_path}'")
+    for profile_path in recorder.dump_profiles():
+        print(f"Stage profile saved to '{profile_path}'")
+
+
+def save_cleaned_data(recorder, background, rows_out=None):
+    """
+    Waits for the background writes of the cleaned data, recorded as the 'save_cleaned' stage
+    (the time the pipeline was blocked by them), and exits if one of them failed.
+    """
+    try:
+        with recorder.stage("save_cleaned") as run:
+            background.close()
+            run.rows_out = rows_out
+    except BackgroundWriteError as e:
+        print(f"An error occurred while saving the cleaned data: {e}")
+        sys.exit(1)
+    print(f"Cleaned dataframes saved to '{cleaned_data_file_path}'.")
+
+
+def print_memory_report(pubmed_inputs=None):
+    """
+    Loads the data without and with the compact ingest schema (dates standardized), and
+    prints the bytes per column of both.
+    """
+    frames = {}
+    for compact in (False, True):
+        drugs_df, pubmed_df, clinical_trials_df = reader.load_data(
+            pubmed_paths=pubmed_inputs, compact=compact
+        )
+        for df in (pubmed_df, clinical_trials_df):
+            standardize_dates(df, compact)
+        frames[compact] = {
+            "drugs": drugs_df,
+            "pubmed": pubmed_df,
+            "clinical_trials": clinical_trials_df,
+        }
+    print("\nMemory per column, without -> with the compact schema:")
+    print("\n".join(schema.memory_report(frames[False], frames[True])))
+
+
+def validate_inputs(pubmed_inputs=None):
+    """
+    Checks the raw input files without writing anything: every source must load and have
+    the columns the pipeline reads. Reports the rows the validation rules would remove and
+    the dates that cannot be standardized.
+
+    Returns:
+        bool: True if the inputs can be processed.
+    """
+    try:
+        dataframes = reader.load_data(pubmed_paths=pubmed_inputs)
+    except Exception as e:
+        print(f"Data loading error: {e}")
+        return False
+    valid = True
+    print("\nInput validation:")
+    for df, source in zip(dataframes, REQUIRED_COLUMNS):
+        missing = [
+            column for column in REQUIRED_COLUMNS[source] if column not in df.columns
+        ]
+        if missing:
+            print(f"  {source}: missing columns {', '.join(missing)}")
+            valid = False
+            continue
+        cleaned_df, rejects = clean_and_validate_source(df, source)
+        details = [f"{count} {rule}" for rule, count in rejects.items() if count]
+        if "date" in cleaned_df.columns:
+            dates = date_parser.standardize_date_column(cleaned_df["date"])
+            details.append(f"{int(dates.isna().sum())} unparseable dates")
+        print(
+            f"  {source}: {len(df)} rows, {len(cleaned_df)} valid"
+            + (f" ({', '.join(details)})" if details else "")
+        )
+    return valid
+
+
+def select_mention_finder(workers, chunk_size):
+    """
+    Returns the mention finding function to use: the single-process one, or the
+    process-pool one when more than one worker is requested. Both yield the mentions
+    as MentionTable chunks.
+    """
+    if workers == 1:
+        return drug_mention_finder.iter_mention_tables
+
+    print(
+        f"Finding mentions in parallel: {workers or os.cpu_count()} workers, shards of {chunk_size} publications."
+    )
+
+    def find_mentions(publications_df, drugs_list_upper, source_type, matcher):
+        return iter_mention_tables_parallel(
+            publications_df,
+            drugs_list_upper,
+            source_type,
+            workers=workers or None,
+            chunk_size=chunk_size,
+            matcher=matcher,
+        )
+
+    return find_mentions
+
+
+def load_previous_mentions(graph_path):
+    """
+    Loads the mentions of the previous run, for the incremental mode.
+
+    Returns:
+        list: The mentions, or None if there is no readable previous graph.
+    """
+    try:
+        if is_ndjson_graph(graph_path):
+            return list(iter_graph_records(graph_path))
+        with open(graph_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if NormalizedGraph.is_normalized(data):
+            return list(NormalizedGraph(data))
+        if isinstance(data, dict):
+            print(
+                f"Warning: Ignoring previous graph '{graph_path}' of unsupported format (format: {data.get('format')}, version: {data.get('version')})."
+            )
+            return None
+        return data
+    except FileNotFoundError:
+        return None
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        print(f"Warning: Ignoring unreadable previous graph '{graph_path}': {e}")
+        return None
+
+
+def write_graph(
+    mention_tables, output_path, output_format=DEFAULT_OUTPUT_FORMAT, build_index=True
+):
+    """
+    Writes the mentions as they are produced, to a temporary file replaced on success
+    (a failed run never leaves a truncated graph behind). Each MentionTable chunk is
+    serialized and written by a background thread, while the next ones are being found.
+    The CSR index used by the ad-hoc analyses is compiled on the way and saved next to the graph.
+
+    Returns:
+        int: The number of mentions written.
+    """
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    index_builder = GraphIndexBuilder() if build_index else None
+    partial_output_path = output_path + ".partial"
+    with open_graph_writer(partial_output_path, output_format) as writer:
+        with BackgroundWriter() as background:
+            for table in mention_tables:
+                if index_builder is not None:
+                    index_builder.add_all(table)
+                background.submit(f"'{output_path}'", writer.write_table, table)
+    os.replace(partial_output_path, output_path)
+    if index_builder is not None:
+        index_builder.save(graph_index_path(output_path), output_path)
+    return writer.count
+
+
+def partition_shards(
+    shards,
+    shards_dir=None,
+    pubmed_inputs=None,
+    spill_dir=None,
+    dedup_partitions=reader.DEFAULT_PARTITIONS,
+):
+    """
+    Sharded mode, partition step: loads, cleans and standardizes the data like the batch
+    pipeline, then hash-partitions the publications by id into shard files with a manifest
+    (see data_transformation/sharding.py). The cleaned CSV files are not written.
+    Without shards_dir, the configured shards_path is used.
+    """
+    shards_dir = shards_path if shards_dir is None else shards_dir
+    recorder = StageRecorder()
     try:
-        drugs_df, pubmed_df, clinical_trials_df = reader.load_data()
+        drugs_df, pubmed_df, clinical_trials_df = reader.load_data(
+            pubmed_paths=pubmed_inputs,
+            spill_dir=spill_dir,
+            partitions=dedup_partitions,
+        )
     except Exception as e:
         print(f"Data loading error: {e}")
         sys.exit(1)
+    drugs_df, _ = clean_source(recorder, drugs_df, "drugs")
+    pubmed_df, _ = clean_source(recorder, pubmed_df, "pubmed")
+    clinical_trials_df, _ = clean_source(
+        recorder, clinical_trials_df, "clinical_trials"
+    )
+    standardize_source_dates(recorder, pubmed_df)
+    standardize_source_dates(recorder, clinical_trials_df)
+
+    manifest = partition_publications(
+        [(pubmed_df, "pubmed"), (clinical_trials_df, "clinical_trial")],
+        prepare_drugs_list(drugs_df),
+        shards_dir,
+        shards,
+    )
+    rows = ", ".join(str(entry["rows"]) for entry in manifest["files"])
+    print(
+        f"Publications partitioned into {shards} shards in '{shards_dir}' ({rows} rows)."
+    )
 
-    print("Data loaded successfully via reader module.")
 
-    # 2. Clean text fields
-    text_columns_to_clean = {
-        "drugs_df": ["drug"],
-        "pubmed_df": ["title", "journal"],
-        "clinical_trials_df": ["scientific_title", "journal"],
-    }
+def run_shard(shard, shards_dir=None, matcher_engine=DEFAULT_MATCHER_ENGINE):
+    """Sharded mode, shard step: finds the mentions of one shard (in shards_path by default)."""
+    shards_dir = shards_path if shards_dir is None else shards_dir
+    try:
+        mentions_count = process_shard(shards_dir, shard, matcher_engine)
+    except ShardError as e:
+        print(f"Shard error: {e}")
+        sys.exit(1)
+    print(f"Shard {shard}: {mentions_count} drug mentions found.")
 
-    print("Applying UTF-8 hex correction to text fields...")
 
-    drugs_df["drug"] = drugs_df["drug"].astype(str).apply(clean_skipped_hex_sequences)
-    pubmed_df["title"] = (
-        pubmed_df["title"].astype(str).apply(clean_skipped_hex_sequences)
+def merge_shards(shards_dir=None, output_format=DEFAULT_OUTPUT_FORMAT):
+    """
+    Sharded mode, merge step: checks the shard results against the manifest and writes
+    their mentions as the graph, in the order of the batch pipeline. Without shards_dir,
+    the configured shards_path is used.
+    """
+    shards_dir = shards_path if shards_dir is None else shards_dir
+    try:
+        paths = check_shard_results(shards_dir)
+    except ShardError as e:
+        print(f"Shard error: {e}")
+        sys.exit(1)
+    output_path = processed_file_path + graph_file_name(output_format)
+    try:
+        mentions_count = write_graph(
+            chunk_mentions(iter_merged_mentions(paths)), output_path, output_format
+        )
+    except Exception as e:
+        print(f"An error occurred while saving the output graph file: {e}")
+        sys.exit(1)
+    print(f"Total drug mentions found: {mentions_count}")
+    print(f"Output of {len(paths)} shards saved to '{output_path}'")
+
+
+def main_pipeline(
+    matcher_engine=DEFAULT_MATCHER_ENGINE,
+    workers=1,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    streaming=False,
+    stream_chunk_size=reader.DEFAULT_STREAM_CHUNK_SIZE,
+    incremental=False,
+    drug_change_policy="targeted",
+    output_format=DEFAULT_OUTPUT_FORMAT,
+    metrics_path=None,
+    profile_stages=(),
+    resume=False,
+    pubmed_inputs=None,
+    spill_dir=None,
+    dedup_partitions=reader.DEFAULT_PARTITIONS,
+    compact=False,
+    checkpoint=False,
+):
+    """
+    Main function for the structured data pipeline.
+
+    Args:
+        matcher_engine (str): Drug matcher engine used for mention finding ("aho_corasick" or "naive").
+        workers (int): Number of processes used for mention finding (1: single process, 0: all CPUs).
+        chunk_size (int): Number of publications per shard when mention finding runs in parallel.
+        streaming (bool): Run the streaming pipeline (bounded memory) instead of the batch one.
+        stream_chunk_size (int): Number of rows per chunk in streaming mode.
+        incremental (bool): Only match new or changed publications, and merge them into the existing graph.
+        drug_change_policy (str): In incremental mode, how a drug list change is handled ("targeted" or "full").
+        output_format (str): "json" (pretty-printed array, for small debug runs), "ndjson", "ndjson.gz"
+                             or "normalized" (node and edge tables).
+        metrics_path (str): If set, per-stage metrics (wall and CPU time, rows, peak memory) are written
+                            to this JSON file.
+        profile_stages (list): Stages (from PIPELINE_STAGES) to profile with cProfile.
+        resume (bool): Skip the stages whose checkpoint (see utils/checkpoints.py) is still valid.
+        pubmed_inputs (list): PubMed CSV or JSON files replacing the default ones, de-duplicated
+                              on disk with bounded memory (see data_ingestion/dedup.py).
+        spill_dir (str): Directory of the de-duplication spill files (default: the temporary directory).
+        dedup_partitions (int): Number of de-duplication spill files.
+        compact (bool): Load the data with the compact ingest schema (see data_ingestion/schema.py)
+                        and store the standardized dates as datetime64. The outputs are unchanged.
+        checkpoint (bool): Checkpoint the stages for a later resumed run, without resuming
+                           this one. Resumed runs always checkpoint their stages; other runs
+                           do not, as it pickles copies of the loaded and cleaned data.
+    """
+    output_path = processed_file_path + graph_file_name(output_format)
+    if streaming and incremental:
+        print("The incremental mode is not available in streaming mode.")
+        sys.exit(1)
+    if streaming and (resume or checkpoint):
+        print("The resume mode is not available in streaming mode.")
+        sys.exit(1)
+
+    # Memory tracing slows the pipeline down: it is only enabled when metrics are requested
+    recorder = StageRecorder(
+        track_memory=bool(metrics_path),
+        profile_stages=profile_stages,
+        profile_dir=profiles_path,
     )
-    pubmed_df["journal"] = (
-        pubmed_df["journal"].astype(str).apply(clean_skipped_hex_sequences)
+    if streaming:
+        streaming_pipeline(
+            matcher_engine,
+            workers,
+            chunk_size,
+            stream_chunk_size,
+            output_format,
+            recorder,
+            pubmed_inputs,
+            spill_dir,
+            dedup_partitions,
+            compact,
+        )
+        return report_metrics(recorder, metrics_path)
+
+    print("Starting data pipeline...")
+
+    # With --resume or --checkpoint, every stage is checkpointed, keyed by its inputs and
+    # code (chained from the raw files). Otherwise nothing is hashed nor pickled.
+    checkpoints = CheckpointStore(
+        checkpoints_path, resume=resume, enabled=resume or checkpoint
     )
-    clinical_trials_df["scientific_title"] = (
-        clinical_trials_df["scientific_title"]
-        .astype(str)
-        .apply(clean_skipped_hex_sequences)
+    pubmed_paths = pubmed_inputs or [reader.pubmed_csv_path, reader.pubmed_json_path]
+    load_key = checkpoints.key(
+        "load",
+        inputs=[
+            file_digest(path) if checkpoints.enabled else None
+            for path in [
+                reader.drugs_csv_path,
+                reader.clinical_trials_csv_path,
+                *pubmed_paths,
+            ]
+        ]
+        + [bool(pubmed_inputs), compact],
+        modules=[reader, json_stream, dedup, schema],
     )
-    clinical_trials_df["journal"] = (
-        clinical_trials_df["journal"].astype(str).apply(clean_skipped_hex_sequences)
+    clean_key = checkpoints.key("clean_validate", [load_key], [cleaning, utils])
+    dates_key = checkpoints.key("dates", [clean_key, compact], [cleaning, date_parser])
+    cleaned_paths = [
+        cleaned_data_file_path + "drugs_cleaned.csv",
+        cleaned_data_file_path + "pubmed_cleaned.csv",
+        cleaned_data_file_path + "clinical_trials_cleaned.csv",
+    ]
+    save_cleaned_key = checkpoints.key("save_cleaned", [dates_key, cleaned_paths])
+    write_key = checkpoints.key(
+        "write",
+        [dates_key, output_path, output_format],
+        [
+            sys.modules[__name__],
+            drug_mention_finder,
+            mention_table,
+            drug_matcher,
+            graph_writer,
+            graph_index,
+        ],
     )
+    write_outputs = [output_path, graph_index_path(output_path) + "/" + INDEX_META_FILE]
 
-    print("UTF-8 hex correction applied.")
-    # -------------------------------------------------------------------------
+    # Resumed outputs: nothing to load when the cleaned files and the graph are up to date
+    cleaned_up_to_date = checkpoints.outputs_valid("save_cleaned", save_cleaned_key)
+    if (
+        cleaned_up_to_date
+        and not incremental
+        and checkpoints.outputs_valid("write", write_key)
+    ):
+        print(f"\nData pipeline completed successfully!")
+        print(f"Output '{output_path}' is up to date.")
+        return report_metrics(recorder, metrics_path)
 
-    # 2.a. Validate and filter drug ATC codes
-    initial_drug_count = len(drugs_df)
-    drugs_df = drugs_df[
-        drugs_df["atccode"].apply(lambda x: is_atccode_multi_level(str(x)))
-    ].copy()
-    print(f"ATC codes checked: {initial_drug_count - len(drugs_df)} drugs removed.")
+    # 1. Load Data using the reader module
+    def load(_):
+        try:
+            with recorder.stage("load") as run:
+                dataframes = reader.load_data(
+                    pubmed_paths=pubmed_inputs,
+                    spill_dir=spill_dir,
+                    partitions=dedup_partitions,
+                    compact=compact,
+                )
+                run.rows_out = sum(len(df) for df in dataframes)
+        except Exception as e:
+            print(f"Data loading error: {e}")
+            sys.exit(1)
+        print("Data loaded successfully via reader module.")
+        return dataframes
 
-    # 2.b. Validate and filter clinical trial NCT numbers
-    initial_trial_count = len(clinical_trials_df)
-    clinical_trials_df = clinical_trials_df[
-        clinical_trials_df["id"].apply(lambda x: is_nct_number(str(x)))
-    ].copy()
-    print(
-        f"Validated NCT numbers: {initial_trial_count - len(clinical_trials_df)} trials removed."
-    )
+    # 2. Clean text fields and validate identifiers (one combined pass per DataFrame)
+    def clean(dataframes):
+        print(
+            "Applying UTF-8 hex correction to text fields and validating identifiers..."
+        )
+        drugs_df, pubmed_df, clinical_trials_df = dataframes
+        # 2.a. Validate and filter drug ATC codes
+        drugs_df, drug_rejects = clean_source(recorder, drugs_df, "drugs")
+        pubmed_df, _ = clean_source(recorder, pubmed_df, "pubmed")
+        # 2.b. Validate and filter clinical trial NCT numbers
+        clinical_trials_df, trial_rejects = clean_source(
+            recorder, clinical_trials_df, "clinical_trials"
+        )
+        print(f"ATC codes checked: {drug_rejects['invalid_atccode']} drugs removed.")
+        print(
+            f"Validated NCT numbers: {trial_rejects['invalid_nct_number']} trials removed."
+        )
+        print("UTF-8 hex correction applied.")
+        return drugs_df, pubmed_df, clinical_trials_df
 
     # --- Date standardization
-    print("Applying date standardization to PubMed and Clinical Trials data...")
-    pubmed_df["date"] = pubmed_df["date"].apply(date_parser.standardize_date)
-    clinical_trials_df["date"] = clinical_trials_df["date"].apply(
-        date_parser.standardize_date
+    def standardize(dataframes):
+        print("Applying date standardization to PubMed and Clinical Trials data...")
+        drugs_df, pubmed_df, clinical_trials_df = dataframes
+        standardize_source_dates(recorder, pubmed_df, compact)
+        standardize_source_dates(recorder, clinical_trials_df, compact)
+        return dataframes
+
+    # Only the checkpoint of the last completed stage is read when resuming
+    drugs_df, pubmed_df, clinical_trials_df = checkpoints.run_chain(
+        [
+            ("load", load_key, load),
+            ("clean_validate", clean_key, clean),
+            ("dates", dates_key, standardize),
+        ]
     )
 
     # 2.c. Save cleaned dataframes to CSV
     # When a value in a dataFrame column contains a comma (or a double quote, or a newline character)
     # , to_csv() will automatically enclose that entire field in double quotes in the output CSV file.
-    print(f"Saving cleaned dataframes to '{cleaned_data_file_path}' :")
-    drugs_df.to_csv(cleaned_data_file_path + "drugs_cleaned.csv", index=False)
-    pubmed_df.to_csv(cleaned_data_file_path + "pubmed_cleaned.csv", index=False)
-    clinical_trials_df.to_csv(
-        cleaned_data_file_path + "clinical_trials_cleaned.csv", index=False
-    )
+    # The files are written in the background while mentions are found. The matcher fills
+    # missing values in place, so the writer gets copies (of the columns, not of the strings).
+    background = BackgroundWriter()
+    cleaned_rows = None
+    if not cleaned_up_to_date:
+        print(f"Saving cleaned dataframes to '{cleaned_data_file_path}' :")
+        os.makedirs(cleaned_data_file_path, exist_ok=True)
+        for df, cleaned_path in zip(
+            (drugs_df, pubmed_df, clinical_trials_df), cleaned_paths
+        ):
+            background.submit(
+                f"'{cleaned_path}'", df.copy().to_csv, cleaned_path, index=False
+            )
+        background.submit(
+            "the cleaned data checkpoint",
+            checkpoints.save_outputs,
+            "save_cleaned",
+            save_cleaned_key,
+            cleaned_paths,
+        )
+        cleaned_rows = len(drugs_df) + len(pubmed_df) + len(clinical_trials_df)
     # ---------------------------------------------------------------------------
 
     # 3. Process Publications for Drug Mentions
 
     # Prepare drug list
-    drugs_list_upper = [
-        (drug_name, drug_name.upper())
-        for drug_name in drugs_df["drug"].unique()
-        if pd.notna(drug_name)
-    ]
+    drugs_list_upper = prepare_drugs_list(drugs_df)
 
     print(
         f"Prepared list of {len(drugs_list_upper)} unique valid drug names for mention finding."
     )
 
-    all_mentions = []
+    # The matcher is built once and shared by both sources
+    matcher = build_drug_matcher(drugs_list_upper, matcher_engine)
+    print(f"Using the '{matcher_engine}' matcher engine.")
 
-    # drug_mention_finder.find_drug_mentions should use date_parser.standardize_date internally
-    print("Processing combined PubMed data for drug mentions...")
-    all_mentions.extend(
-        drug_mention_finder.find_drug_mentions(pubmed_df, drugs_list_upper, "pubmed")
-    )
+    find_mentions = select_mention_finder(workers, chunk_size)
 
-    print("Processing Clinical Trials CSV data for drug mentions...")
-    all_mentions.extend(
-        drug_mention_finder.find_drug_mentions(
-            clinical_trials_df, drugs_list_upper, "clinical_trial"
+    if incremental:
+        print("Processing new or changed publications for drug mentions...")
+        # Without a previous index, every publication is indexed during this run
+        title_index = TitleIndex.open(title_index_path) or TitleIndex(title_index_path)
+        with recorder.stage(
+            "matching", rows_in=len(pubmed_df) + len(clinical_trials_df)
+        ) as run:
+            mentions, manifest = find_mentions_incrementally(
+                [(pubmed_df, "pubmed"), (clinical_trials_df, "clinical_trial")],
+                drugs_list_upper,
+                matcher,
+                # The merge reads mentions one by one: MentionRecord views of the tables
+                lambda *args, **kwargs: itertools.chain.from_iterable(
+                    find_mentions(*args, **kwargs)
+                ),
+                load_manifest(manifest_json, output_path),
+                load_previous_mentions(output_path),
+                drug_change_policy,
+                title_index,
+            )
+            run.rows_out = len(mentions)
+        # Ensure date is not None
+        mention_tables = chunk_mentions(
+            m for m in mentions if m.get("date") is not None
         )
-    )
+    else:
 
-    all_mentions = [
-        m for m in all_mentions if m.get("date") is not None
-    ]  # Ensure date is not None
-    print(f"Total drug mentions found: {len(all_mentions)}")
+        def iter_mentions():
+            print("Processing combined PubMed data for drug mentions...")
+            yield from find_mentions(
+                pubmed_df, drugs_list_upper, "pubmed", matcher=matcher
+            )
 
-    # 5. Save Output
-    if not all_mentions:
+            print("Processing Clinical Trials CSV data for drug mentions...")
+            yield from find_mentions(
+                clinical_trials_df, drugs_list_upper, "clinical_trial", matcher=matcher
+            )
+
+        # Mentions are produced while the graph is written: 'matching' is nested in 'write'.
+        # The finders never produce mentions without a date.
+        mention_tables = recorder.iterate("matching", iter_mentions(), count_rows=len)
+
+    # 5. Save Output (mentions are written as they are produced)
+    try:
+        with recorder.stage("write") as run:
+            mentions_count = write_graph(mention_tables, output_path, output_format)
+            run.rows_out = mentions_count
+        # The manifest is saved last: it only describes a graph that was fully written
+        if incremental:
+            save_manifest(manifest_json, manifest, output_path)
+            title_index.save()
+        else:
+            checkpoints.save_outputs("write", write_key, write_outputs)
+    except Exception as e:
+        print(f"An error occurred while saving the output graph file: {e}")
+        sys.exit(1)
+    save_cleaned_data(recorder, background, cleaned_rows)
+
+    print(f"Total drug mentions found: {mentions_count}")
+    if not mentions_count:
         print(
-            "Warning: No drug mentions were found in any publications. An empty graph will be produced."
+            "Warning: No drug mentions were found in any publications. An empty graph was produced."
         )
+    print(f"\nData pipeline completed successfully!")
+    print(f"Output saved to '{output_path}'")
+    report_metrics(recorder, metrics_path)
+
+
+def streaming_pipeline(
+    matcher_engine=DEFAULT_MATCHER_ENGINE,
+    workers=1,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    stream_chunk_size=reader.DEFAULT_STREAM_CHUNK_SIZE,
+    output_format=DEFAULT_OUTPUT_FORMAT,
+    recorder=None,
+    pubmed_inputs=None,
+    spill_dir=None,
+    dedup_partitions=reader.DEFAULT_PARTITIONS,
+    compact=False,
+):
+    """
+    Streaming version of the pipeline: read -> hex clean -> NCT validation -> date standardization
+    -> matching -> output runs as a chain of generators over chunks of stream_chunk_size rows.
+    Peak memory scales with the chunk size (plus the drug list and the set of seen PubMed ids),
+    not with the corpus size. The output is identical to the batch mode.
+    Stages run interleaved, chunk by chunk: their metrics are accumulated over the chunks.
+    """
+    recorder = recorder or StageRecorder()
+    print(
+        f"Starting data pipeline in streaming mode ({stream_chunk_size} rows per chunk)..."
+    )
 
+    # 1. The drug list is small and needed in full by the matcher: it is loaded at once
     try:
-        with open(output_json, "w", encoding="utf-8") as f:
-            json.dump(all_mentions, f, indent=2, ensure_ascii=False)
-        print(f"\nData pipeline completed successfully!")
-        print(f"Output saved to '{output_json}'")
+        with recorder.stage("load") as run:
+            drugs_df = reader.load_drugs()
+            if compact:
+                drugs_df = schema.compact_frame(drugs_df, "drugs")
+            run.rows_out = len(drugs_df)
     except Exception as e:
-        print(f"An error occurred while saving the output JSON file: {e}")
+        print(f"Data loading error: {e}")
         sys.exit(1)
 
+    drugs_df, drug_rejects = clean_source(recorder, drugs_df, "drugs")
+    print(f"ATC codes checked: {drug_rejects['invalid_atccode']} drugs removed.")
+    # Cleaned chunks are written in the background, in order (see save_cleaned_data)
+    os.makedirs(cleaned_data_file_path, exist_ok=True)
+    background = BackgroundWriter()
+    drugs_cleaned_path = cleaned_data_file_path + "drugs_cleaned.csv"
+    with recorder.stage("save_cleaned") as run:
+        background.submit(
+            f"'{drugs_cleaned_path}'",
+            drugs_df.copy().to_csv,
+            drugs_cleaned_path,
+            index=False,
+        )
+        run.rows_out = len(drugs_df)
+
+    drugs_list_upper = prepare_drugs_list(drugs_df)
+    print(
+        f"Prepared list of {len(drugs_list_upper)} unique valid drug names for mention finding."
+    )
+    matcher = build_drug_matcher(drugs_list_upper, matcher_engine)
+    print(f"Using the '{matcher_engine}' matcher engine.")
+    find_mentions = select_mention_finder(workers, chunk_size)
+
+    # 2. Generator chain over the publications
+    removed_trials = [0]
+
+    def clean_chunks(chunks, source, cleaned_csv_path):
+        first_chunk = True
+        for chunk in recorder.iterate("load", chunks, count_rows=len):
+            if compact:
+                chunk = schema.compact_ids(schema.compact_frame(chunk, source))
+            chunk, rejects = clean_source(recorder, chunk, source)
+            removed_trials[0] += rejects.get("invalid_nct_number", 0)
+            standardize_source_dates(recorder, chunk, compact)
+            # Only blocks when too many chunks are waiting to be written
+            with recorder.stage("save_cleaned") as run:
+                background.submit(
+                    f"'{cleaned_csv_path}'",
+                    chunk.copy().to_csv,
+                    cleaned_csv_path,
+                    mode="w" if first_chunk else "a",
+                    header=first_chunk,
+                    index=False,
+                )
+                run.rows_out = len(chunk)
+            first_chunk = False
+            yield chunk
+
+    def mentions_of(chunks, source_type):
+        # The finders never produce mentions without a date
+        for chunk in chunks:
+            yield from find_mentions(
+                chunk, drugs_list_upper, source_type, matcher=matcher
+            )
+
+    pubmed_mentions = mentions_of(
+        clean_chunks(
+            reader.iter_pubmed_chunks(
+                stream_chunk_size, pubmed_inputs, spill_dir, dedup_partitions
+            ),
+            "pubmed",
+            cleaned_data_file_path + "pubmed_cleaned.csv",
+        ),
+        "pubmed",
+    )
+    trial_mentions = mentions_of(
+        clean_chunks(
+            reader.iter_clinical_trials_chunks(stream_chunk_size),
+            "clinical_trials",
+            cleaned_data_file_path + "clinical_trials_cleaned.csv",
+        ),
+        "clinical_trial",
+    )
+
+    # 3. Mentions are written as they are produced
+    output_path = processed_file_path + graph_file_name(output_format)
+    mention_tables = recorder.iterate(
+        "matching", itertools.chain(pubmed_mentions, trial_mentions), count_rows=len
+    )
+    try:
+        with recorder.stage("write") as run:
+            mentions_count = write_graph(mention_tables, output_path, output_format)
+            run.rows_out = mentions_count
+    except reader.DataLoadError as e:
+        print(f"Data loading error: {e}")
+        sys.exit(1)
+    except BackgroundWriteError as e:
+        print(f"An error occurred while saving the cleaned data: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"An error occurred while saving the output graph file: {e}")
+        sys.exit(1)
+    save_cleaned_data(recorder, background)
+
+    print(f"Validated NCT numbers: {removed_trials[0]} trials removed.")
+    print(f"Total drug mentions found: {mentions_count}")
+    if not mentions_count:
+        print(
+            "Warning: No drug mentions were found in any publications. An empty graph was produced."
+        )
+    print(f"\nData pipeline completed successfully!")
+    print(f"Output saved to '{output_path}'")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Drug-journal mentions data pipeline.")
+    parser.add_argument(
+        "--matcher",
+        choices=MATCHER_ENGINES,
+        default=DEFAULT_MATCHER_ENGINE,
+        help="Drug matcher engine used to find mentions in titles.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes used for mention finding (1: no parallelism, 0: all CPUs).",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Publications per shard when mention finding runs in parallel.",
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Process the publications as a stream of chunks, with bounded memory.",
+    )
+    parser.add_argument(
+        "--stream-chunk-size",
+        type=int,
+        default=reader.DEFAULT_STREAM_CHUNK_SIZE,
+        help="Rows per chunk in streaming mode.",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only match new or changed publications and merge them into the existing graph.",
+    )
+    parser.add_argument(
+        "--drug-change-policy",
+        choices=DRUG_CHANGE_POLICIES,
+        default="targeted",
+        help="Incremental mode: re-match only added drugs (targeted) or everything (full) when the drug list changes.",
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=OUTPUT_FORMATS,
+        default=DEFAULT_OUTPUT_FORMAT,
+        help="Graph format: pretty-printed JSON array (small debug runs), newline-delimited JSON "
+        "(optionally gzip-compressed), or normalized node and edge tables.",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="PATH",
+        help="Write per-stage metrics (wall and CPU time, rows in/out, rows/s, peak memory) to this JSON file.",
+    )
+    parser.add_argument(
+        "--profile-stage",
+        action="append",
+        choices=PIPELINE_STAGES,
+        default=[],
+        help=f"Dump a cProfile of a stage to '{profiles_path}<stage>.prof' (repeatable).",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip the stages whose checkpoint in --checkpoint-dir matches their inputs and code "
+        "(the stages of the run are checkpointed too).",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        action="store_true",
+        help="Checkpoint the stages in --checkpoint-dir for a later --resume run, without resuming "
+        "this one. Other runs write no checkpoint (it pickles copies of the loaded and cleaned data).",
+    )
+    parser.add_argument(
+        "--pubmed-input",
+        action="append",
+        metavar="PATH",
+        help="PubMed CSV or JSON file (repeatable, in order), replacing the default ones. The inputs are "
+        "de-duplicated on id through spill files on disk, with bounded memory.",
+    )
+    parser.add_argument(
+        "--spill-dir",
+        help="Directory of the de-duplication spill files (default: the system temporary directory).",
+    )
+    parser.add_argument(
+        "--dedup-partitions",
+        type=int,
+        default=reader.DEFAULT_PARTITIONS,
+        help="Number of de-duplication spill files (memory scales with the input size / partitions).",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Load the data with a compact typed schema (used columns only, categorical text, "
+        "datetime64 dates). The outputs are unchanged.",
+    )
+    parser.add_argument(
+        "--memory-report",
+        action="store_true",
+        help="Print the memory per column of the loaded data without and with --compact, and exit.",
+    )
+    parser.add_argument(
+        "--partition-shards",
+        type=int,
+        metavar="N",
+        help="Sharded mode: partition the cleaned publications by id into N shard files, and exit.",
+    )
+    parser.add_argument(
+        "--process-shard",
+        type=int,
+        metavar="K",
+        help="Sharded mode: find the mentions of shard K (on any machine with the shard files), and exit.",
+    )
+    parser.add_argument(
+        "--merge-shards",
+        action="store_true",
+        help="Sharded mode: merge the mentions of every shard into the graph, checked against "
+        "the shard manifest, and exit.",
+    )
+    parser.add_argument(
+        "--shards-dir",
+        help=f"Directory of the shard files (default: '{shards_path}').",
+    )
+    parser.add_argument(
+        "--raw-dir",
+        help=f"Directory of the raw input files (default: '{rawdata_file_path}').",
+    )
+    parser.add_argument(
+        "--cleaned-dir",
+        help=f"Directory of the cleaned CSV files (default: '{cleaned_data_file_path}').",
+    )
+    parser.add_argument(
+        "--output-dir",
+        help=f"Directory of the graph and its companion files (default: '{processed_file_path}').",
+    )
+    parser.add_argument(
+        "--checkpoint-dir",
+        help=f"Directory of the stage checkpoints of --resume (default: '{checkpoints_path}').",
+    )
+    return parser
+
+
+def main(argv=None):
+    """Runs the pipeline (or one of its other modes) as the command line asks."""
+    args = build_parser().parse_args(argv)
+    configure_paths(
+        args.raw_dir,
+        args.cleaned_dir,
+        args.output_dir,
+        args.checkpoint_dir,
+        args.shards_dir,
+    )
+    if args.memory_report:
+        print_memory_report(args.pubmed_input)
+        return
+    if args.partition_shards is not None:
+        partition_shards(
+            args.partition_shards,
+            pubmed_inputs=args.pubmed_input,
+            spill_dir=args.spill_dir,
+            dedup_partitions=args.dedup_partitions,
+        )
+        return
+    if args.process_shard is not None:
+        run_shard(args.process_shard, matcher_engine=args.matcher)
+        return
+    if args.merge_shards:
+        merge_shards(output_format=args.output_format)
+        return
+    main_pipeline(
+        matcher_engine=args.matcher,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        streaming=args.streaming,
+        stream_chunk_size=args.stream_chunk_size,
+        incremental=args.incremental,
+        drug_change_policy=args.drug_change_policy,
+        output_format=args.output_format,
+        metrics_path=args.metrics,
+        profile_stages=args.profile_stage,
+        resume=args.resume,
+        pubmed_inputs=args.pubmed_input,
+        spill_dir=args.spill_dir,
+        dedup_partitions=args.dedup_partitions,
+        compact=args.compact,
+        checkpoint=args.checkpoint,
+    )
+
 
 if __name__ == "__main__":
-    main_pipeline()
+    main()
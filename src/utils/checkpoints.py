@@ -0,0 +1,189 @@
+import glob
+import hashlib
+import inspect
+import os
+import pickle
+import sys
+
+import pandas as pd
+
+CHECKPOINT_VERSION = 1
+CHECKPOINT_SUFFIX = ".pkl"
+HASH_BLOCK_SIZE = 1 << 20
+
+# Pickles are only reloaded by the Python and pandas versions that wrote them
+ENVIRONMENT = (
+    f"python-{sys.version_info[0]}.{sys.version_info[1]}/pandas-{pd.__version__}"
+)
+
+
+def file_digest(path):
+    """
+    SHA-256 of a file's content.
+
+    Returns:
+        str: The hex digest, or None if the file does not exist.
+    """
+    sha = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+                sha.update(block)
+    except FileNotFoundError:
+        return None
+    return sha.hexdigest()
+
+
+def code_digest(modules):
+    """SHA-256 of the source files of modules: any code change invalidates the checkpoints."""
+    sha = hashlib.sha256()
+    for module in modules:
+        sha.update(module.__name__.encode("utf-8"))
+        sha.update(file_digest(inspect.getsourcefile(module)).encode("utf-8"))
+    return sha.hexdigest()
+
+
+def output_fingerprints(paths):
+    """Size and modification time of output files (None for a missing file)."""
+    fingerprints = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            fingerprints[path] = [stat.st_size, stat.st_mtime_ns]
+        except FileNotFoundError:
+            fingerprints[path] = None
+    return fingerprints
+
+
+class CheckpointStore:
+    """
+    Binary checkpoints of pipeline stages, saved as '<checkpoint_dir>/<stage>.<key>.pkl'.
+
+    The key of a stage is a hash of its inputs (the file contents or the key of the stage
+    feeding it, and its parameters) and of the source code of the modules it runs, so a
+    checkpoint is only valid for the exact inputs and code that produced it. Keys are
+    chained: a change upstream invalidates every stage downstream.
+
+    With resume=False, checkpoints are written but never read. With enabled=False, they are
+    neither written nor read: every stage is computed, and nothing is pickled.
+
+    Usage:
+        store = CheckpointStore("data/checkpoints/", resume=True)
+        load_key = store.key("load", inputs=[file_digest(raw_path)], modules=[reader])
+        clean_key = store.key("clean", inputs=[load_key], modules=[cleaning])
+        df = store.run_chain(
+            [("load", load_key, lambda _: load()), ("clean", clean_key, clean)]
+        )
+    """
+
+    def __init__(self, checkpoint_dir, resume=False, enabled=True):
+        self.checkpoint_dir = checkpoint_dir
+        self.enabled = enabled
+        self.resume = resume and enabled
+        self.resumed = []  # stages restored from a checkpoint during this run
+
+    def key(self, stage, inputs=(), modules=()):
+        """
+        Key of a stage.
+
+        Args:
+            stage (str): Stage name.
+            inputs (list): JSON-like values identifying the inputs (digests, upstream keys, parameters).
+            modules (list): Modules whose source code the stage's result depends on.
+
+        Returns:
+            str: The hex key, or None if the store is disabled.
+        """
+        if not self.enabled:
+            return None
+        sha = hashlib.sha256()
+        sha.update(f"{CHECKPOINT_VERSION}/{ENVIRONMENT}/{stage}".encode("utf-8"))
+        sha.update(repr(list(inputs)).encode("utf-8"))
+        sha.update(code_digest(modules).encode("utf-8"))
+        return sha.hexdigest()
+
+    def _path(self, stage, key):
+        return os.path.join(
+            self.checkpoint_dir, f"{stage}.{key[:32]}{CHECKPOINT_SUFFIX}"
+        )
+
+    def load(self, stage, key):
+        """
+        Returns:
+            tuple: (True, value) if a valid checkpoint exists, (False, None) otherwise.
+        """
+        try:
+            with open(self._path(stage, key), "rb") as f:
+                return True, pickle.load(f)
+        except FileNotFoundError:
+            return False, None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            print(f"Warning: Ignoring unreadable checkpoint of stage '{stage}': {e}")
+            return False, None
+
+    def save(self, stage, key, value):
+        """Saves a stage's checkpoint atomically, and removes its older checkpoints."""
+        if not self.enabled:
+            return
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        path = self._path(stage, key)
+        with open(path + ".partial", "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".partial", path)
+        pattern = os.path.join(
+            glob.escape(self.checkpoint_dir),
+            f"{glob.escape(stage)}.*{CHECKPOINT_SUFFIX}",
+        )
+        for old_path in glob.glob(pattern):
+            if old_path != path:
+                os.remove(old_path)
+
+    def run_chain(self, stages):
+        """
+        Runs a chain of stages, each computed from the value of the previous one. When
+        resuming, only the checkpoint of the last stage that has a valid one is read, and
+        the stages after it are computed (and checkpointed).
+
+        Args:
+            stages (list): (stage, key, compute) tuples, compute(previous_value) returning the
+                           stage's value (the first stage gets None).
+
+        Returns:
+            The value of the last stage.
+        """
+        start, value = 0, None
+        if self.resume:
+            for position in range(len(stages) - 1, -1, -1):
+                stage, key, _ = stages[position]
+                found, checkpoint = self.load(stage, key)
+                if found:
+                    print(f"Stage '{stage}' restored from its checkpoint.")
+                    self.resumed.extend(name for name, _, _ in stages[: position + 1])
+                    start, value = position + 1, checkpoint
+                    break
+        for stage, key, compute in stages[start:]:
+            value = compute(value)
+            self.save(stage, key, value)
+        return value
+
+    def outputs_valid(self, stage, key):
+        """
+        Whether the output files recorded by save_outputs are unchanged since a run of the
+        stage with this key (always False when not resuming).
+        """
+        if not self.resume:
+            return False
+        found, fingerprints = self.load(stage, key)
+        if not found:
+            return False
+        if output_fingerprints(fingerprints) != fingerprints:
+            return False
+        print(f"Stage '{stage}' skipped: its outputs are up to date.")
+        self.resumed.append(stage)
+        return True
+
+    def save_outputs(self, stage, key, paths):
+        """Checkpoints a stage whose result is files: their fingerprints are recorded."""
+        if not self.enabled:
+            return
+        self.save(stage, key, output_fingerprints(paths))
@@ -0,0 +1,190 @@
+import cProfile
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+
+class StageRecorder:
+    """
+    Records per-stage metrics of a pipeline run: wall time, CPU time, rows in/out,
+    rows per second and peak traced memory (tracemalloc), and optionally a cProfile dump
+    of chosen stages.
+
+    A stage entered several times (e.g. once per chunk in streaming mode) accumulates its
+    metrics. Stages can be nested (e.g. a generator of mentions pulled by the write stage):
+    the metrics also give the time spent in the stage itself, its nested stages excluded,
+    and its rows per second are computed from that self time.
+
+    Usage:
+        recorder = StageRecorder(track_memory=True, profile_stages=["matching"])
+        with recorder.stage("clean", rows_in=len(df)) as run:
+            df = clean(df)
+            run.rows_out = len(df)
+        mentions = recorder.iterate("matching", find_mentions(...))
+        recorder.write_metrics("metrics.json")
+    """
+
+    def __init__(self, track_memory=False, profile_stages=(), profile_dir="."):
+        self.track_memory = track_memory
+        self.profile_stages = set(profile_stages)
+        self.profile_dir = profile_dir
+        self.stages = {}  # name -> StageMetrics, in order of first entry
+        self._stack = []
+        self._profilers = {}
+        self._profiling = False
+        self._started = time.perf_counter()
+        self._started_tracing = track_memory and not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+
+    def _metrics(self, name):
+        metrics = self.stages.get(name)
+        if metrics is None:
+            metrics = self.stages[name] = StageMetrics(name)
+        return metrics
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """
+        Context manager measuring one run of a stage. Set rows_out on the yielded run
+        before leaving the block to record the rows the stage produced.
+        """
+        metrics = self._metrics(name)
+        run = SimpleNamespace(rows_out=None)
+        if self.track_memory and not self._stack:
+            tracemalloc.reset_peak()
+
+        self._enter(name)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield run
+        finally:
+            self._exit(metrics, time.perf_counter() - wall, time.process_time() - cpu)
+            metrics.calls += 1
+            if rows_in is not None:
+                metrics.rows_in = (metrics.rows_in or 0) + rows_in
+            if run.rows_out is not None:
+                metrics.rows_out = (metrics.rows_out or 0) + run.rows_out
+            self._record_peak(metrics)
+
+    def iterate(self, name, iterable, count_rows=None):
+        """
+        Wraps an iterable (e.g. a generator of mentions or of chunks): the time spent
+        producing each item is recorded as the stage, and the items are counted as rows out.
+
+        Args:
+            name (str): The stage name.
+            iterable: The items.
+            count_rows (callable): Number of rows of an item (default: 1 row per item, len for chunks).
+        """
+        metrics = self._metrics(name)
+        iterator = iter(iterable)
+        while True:
+            self._enter(name)
+            wall, cpu = time.perf_counter(), time.process_time()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self._exit(
+                    metrics, time.perf_counter() - wall, time.process_time() - cpu
+                )
+                self._record_peak(metrics)
+            metrics.calls += 1
+            metrics.rows_out = (metrics.rows_out or 0) + (
+                count_rows(item) if count_rows else 1
+            )
+            yield item
+
+    def _record_peak(self, metrics):
+        if self.track_memory:
+            # Peak of traced memory since the enclosing top-level stage started
+            peak = tracemalloc.get_traced_memory()[1]
+            metrics.peak_memory_bytes = max(metrics.peak_memory_bytes or 0, peak)
+
+    def _enter(self, name):
+        self._stack.append(name)
+        if name in self.profile_stages and not self._profiling:
+            # cProfile cannot nest: a stage nested in a profiled stage is part of its profile
+            self._profiling = name
+            self._profilers.setdefault(name, cProfile.Profile()).enable()
+
+    def _exit(self, metrics, wall_seconds, cpu_seconds):
+        self._stack.pop()
+        if self._profiling == metrics.name:
+            self._profilers[metrics.name].disable()
+            self._profiling = False
+        metrics.wall_seconds += wall_seconds
+        metrics.cpu_seconds += cpu_seconds
+        if self._stack:
+            self.stages[self._stack[-1]].nested_wall_seconds += wall_seconds
+
+    def to_dict(self):
+        """Returns the metrics of every stage, in order of first entry, as a JSON-ready dict."""
+        return {
+            "total_wall_seconds": round(time.perf_counter() - self._started, 6),
+            "stages": [metrics.to_dict() for metrics in self.stages.values()],
+        }
+
+    def write_metrics(self, metrics_path):
+        """Writes the metrics as a JSON file."""
+        with open(metrics_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def dump_profiles(self):
+        """
+        Writes a cProfile dump per profiled stage ('<profile_dir>/<stage>.prof', readable with pstats).
+
+        Returns:
+            list: The paths of the written dumps.
+        """
+        paths = []
+        for name, profiler in self._profilers.items():
+            os.makedirs(self.profile_dir, exist_ok=True)
+            path = os.path.join(self.profile_dir, f"{name}.prof")
+            profiler.dump_stats(path)
+            paths.append(path)
+        return paths
+
+    def stop(self):
+        """Stops the memory tracing started by the recorder."""
+        if self._started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+class StageMetrics:
+    """Accumulated metrics of one stage."""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.wall_seconds = 0.0
+        self.nested_wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.rows_in = None
+        self.rows_out = None
+        self.peak_memory_bytes = None
+
+    def to_dict(self):
+        rows = self.rows_in if self.rows_in is not None else self.rows_out
+        # The throughput of the stage itself: the time of its nested stages is not its own
+        self_wall_seconds = self.wall_seconds - self.nested_wall_seconds
+        return {
+            "stage": self.name,
+            "calls": self.calls,
+            "wall_seconds": round(self.wall_seconds, 6),
+            "self_wall_seconds": round(self_wall_seconds, 6),
+            "cpu_seconds": round(self.cpu_seconds, 6),
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "rows_per_second": (
+                round(rows / self_wall_seconds, 1)
+                if rows is not None and self_wall_seconds > 0
+                else None
+            ),
+            "peak_memory_bytes": self.peak_memory_bytes,
+        }
@@ -1,5 +1,29 @@
 import re
 
+import numpy as np
+import pandas as pd
+
+# Patterns are compiled once and shared by the scalar and column-level functions.
+
+# ATC code, combined pattern using OR (|)
+# This ensures the entire string matches one of the patterns exactly.
+# ^ : start of string
+# [A-Z] : an uppercase letter
+# \d{2} : exactly two digits
+# $ : end of string
+ATC_CODE_PATTERN = re.compile(
+    r"^([A-Z]|[A-Z]\d{2}|[A-Z]\d{2}[A-Z]|[A-Z]\d{2}[A-Z]{2}|[A-Z]\d{2}[A-Z]{2}\d{2})$"
+)
+
+# NCT number: starts with "NCT" (uppercase), followed by exactly 8 digits.
+NCT_NUMBER_PATTERN = re.compile(r"^NCT\d{8}$")
+
+# Skipped hex sequence:
+#   '\\'   : Matches a literal backslash.
+#   'x'    : Matches the literal character 'x'.
+#   '[0-9a-fA-F]{2}' : Matches any two hexadecimal digits.
+SKIPPED_HEX_PATTERN = re.compile(r"\\x[0-9a-fA-F]{2}")
+
 
 def is_atccode_multi_level(code_string):
     """
@@ -23,15 +47,7 @@ def is_atccode_multi_level(code_string):
     if not isinstance(code_string, str):
         return False  # Input must be a string
 
-    # Combined pattern using OR (|)
-    # This ensures the entire string matches one of the patterns exactly.
-    # ^ : start of string
-    # [A-Z] : an uppercase letter
-    # \d{2} : exactly two digits
-    # $ : end of string
-    combined_pattern = r"^([A-Z]|[A-Z]\d{2}|[A-Z]\d{2}[A-Z]|[A-Z]\d{2}[A-Z]{2}|[A-Z]\d{2}[A-Z]{2}\d{2})$"
-
-    if re.fullmatch(combined_pattern, code_string):
+    if ATC_CODE_PATTERN.fullmatch(code_string):
         return True
     else:
         return False
@@ -53,9 +69,7 @@ def is_nct_number(trial_id_string):
         return False  # Input must be a string
 
     # Pattern: Starts with "NCT" (uppercase), followed by exactly 8 digits.
-    nct_pattern = r"^NCT\d{8}$"
-
-    if re.fullmatch(nct_pattern, trial_id_string):
+    if NCT_NUMBER_PATTERN.fullmatch(trial_id_string):
         return True
     else:
         return False
@@ -74,11 +88,111 @@ def clean_skipped_hex_sequences(field):
         The cleaned string with all '\\xYY' patterns removed.
     """
 
-    #   '\\'   : Matches a literal backslash.
-    #   'x'    : Matches the literal character 'x'.
-    #   '[0-9a-fA-F]{2}' : Matches any two hexadecimal digits.
-    pattern = r"\\x[0-9a-fA-F]{2}"
-
     # replace all occurrences of the defined pattern with an empty string.
-    cleaned_field = re.sub(pattern, "", field)
+    cleaned_field = SKIPPED_HEX_PATTERN.sub("", field)
     return cleaned_field
+
+
+def is_atccode_multi_level_column(column):
+    """
+    Column-level version of is_atccode_multi_level, checking a whole Series at once.
+    Values are converted with str() first (missing values become 'nan' and are invalid).
+
+    Args:
+        column (pd.Series): The values to validate.
+
+    Returns:
+        pd.Series: Boolean mask, True for valid ATC codes.
+    """
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        valid, codes = _per_category(column, is_atccode_multi_level_column)
+        return pd.Series(valid[codes], index=column.index, name=column.name)
+    return column.astype(str).str.fullmatch(ATC_CODE_PATTERN)
+
+
+def is_nct_number_column(column):
+    """
+    Column-level version of is_nct_number, checking a whole Series at once.
+    Values are converted with str() first (missing values become 'nan' and are invalid).
+
+    Args:
+        column (pd.Series): The values to validate.
+
+    Returns:
+        pd.Series: Boolean mask, True for valid NCT numbers.
+    """
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        valid, codes = _per_category(column, is_nct_number_column)
+        return pd.Series(valid[codes], index=column.index, name=column.name)
+    return column.astype(str).str.fullmatch(NCT_NUMBER_PATTERN)
+
+
+def clean_skipped_hex_sequences_column(column):
+    """
+    Column-level version of clean_skipped_hex_sequences, cleaning a whole Series at once.
+    Values are converted with str() first, like the pipeline always did.
+    A categorical column is cleaned once per category, and stays categorical.
+
+    Args:
+        column (pd.Series): The text values to clean.
+
+    Returns:
+        pd.Series: The cleaned strings.
+    """
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        cleaned, codes = _per_category(column, clean_skipped_hex_sequences_column)
+        # Two categories can become equal once cleaned: they are merged
+        cleaned_codes, categories = pd.factorize(cleaned)
+        return pd.Series(
+            pd.Categorical.from_codes(cleaned_codes[codes], categories=categories),
+            index=column.index,
+            name=column.name,
+        )
+    return column.astype(str).str.replace(SKIPPED_HEX_PATTERN, "", regex=True)
+
+
+def _per_category(column, column_function):
+    """
+    Evaluates a column-level function once per category of a categorical column (missing
+    values included, as NaN) instead of once per row.
+
+    Returns:
+        tuple: (np.ndarray of the results per category, then for missing values;
+                np.ndarray of the row positions in these results)
+    """
+    categories = column.cat.categories
+    distinct = pd.Series(list(categories) + [np.nan], dtype=object)
+    codes = column.cat.codes.to_numpy().astype(np.int64)
+    codes[codes < 0] = len(categories)  # missing values
+    return column_function(distinct).to_numpy(), codes
+
+
+def clean_and_validate_frame(df, text_columns=(), validation_rules=()):
+    """
+    Cleans and validates a DataFrame in one combined pass:
+    hex sequences are removed from the text columns, every validation rule is evaluated
+    on the whole frame, and the rows failing any rule are dropped with a single filter.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to clean (not modified).
+        text_columns (list): Names of the text columns to clean.
+        validation_rules (list): Tuples (rule_name, column, column_validator), where
+                                 column_validator returns a boolean mask (e.g. is_nct_number_column).
+
+    Returns:
+        tuple: (cleaned DataFrame, dict mapping each rule_name to the number of rows it rejects)
+    """
+    cleaned_df = df.copy()
+    for column in text_columns:
+        cleaned_df[column] = clean_skipped_hex_sequences_column(cleaned_df[column])
+
+    reject_counts = {}
+    keep = None
+    for rule_name, column, column_validator in validation_rules:
+        valid = column_validator(cleaned_df[column])
+        reject_counts[rule_name] = int((~valid).sum())
+        keep = valid if keep is None else keep & valid
+
+    if keep is not None:
+        cleaned_df = cleaned_df[keep].copy()
+    return cleaned_df, reject_counts
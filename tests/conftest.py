@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The pipeline modules import each other the way `python3 src/main.py` sees them
+# (e.g. `from data_transformation import drug_mention_finder`), so src/ must be importable.
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
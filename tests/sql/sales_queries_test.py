@@ -0,0 +1,50 @@
+import pytest
+
+from analysis.sales_queries import load_database, run_query
+
+
+@pytest.fixture(scope="function")
+def sales_database(tmp_path):
+    """Loads the rows of the sales_categorisation test from CSV files with the harness."""
+    transactions_csv = tmp_path / "transactions.csv"
+    transactions_csv.write_text(
+        "date,order_id,client_id,prod_id,prod_price,prod_qty\n"
+        "2019-01-01,1234,999,490756,50.0,1\n"
+        "2019-01-01,1234,999,389728,3.56,4\n"
+        "2019-01-01,3456,845,490756,50.0,2\n"
+        "2019-01-02,3456,845,549380,300.0,1\n"
+        "2019-01-02,3456,845,293718,10.0,6\n"
+        "2020-01-01,5678,111,123456,100.0,1\n",
+        encoding="utf-8",
+    )
+    # The columns may come in any order
+    product_nomenclature_csv = tmp_path / "product_nomenclature.csv"
+    product_nomenclature_csv.write_text(
+        "product_type,product_id,product_name\n"
+        "MEUBLE,490756,Chaise\n"
+        "DECO,389728,Boule de Noël\n"
+        "MEUBLE,549380,Canapé\n"
+        "DECO,293718,Mug\n"
+        "MEUBLE,123456,Table\n",
+        encoding="utf-8",
+    )
+    conn = load_database(str(transactions_csv), str(product_nomenclature_csv))
+    yield conn
+    conn.close()
+
+
+def test_queries_run_on_the_loaded_csv_files(sales_database):
+    daily_sales = run_query(sales_database, "daily_sales")
+    assert daily_sales["rows"] == [
+        ("2019-01-01", pytest.approx(164.24)),
+        ("2019-01-02", pytest.approx(360.0)),
+    ]
+    categorisation = run_query(sales_database, "sales_categorisation")
+    assert categorisation["rows"] == [
+        (845, pytest.approx(400.0), pytest.approx(60.0)),
+        (999, pytest.approx(50.0), pytest.approx(14.24)),
+    ]
+
+    for report in (daily_sales, categorisation):
+        assert report["index_driven"], report["plan"]
+        assert any("COVERING INDEX" in step for step in report["plan"])
@@ -0,0 +1,110 @@
+import random
+import sqlite3
+
+import pytest
+
+from analysis.sales_queries import create_tables, run_query
+from analysis.sales_rollups import create_rollups
+
+
+def assert_rollups_match_queries(conn):
+    """The rollup reports return the rows of the original queries."""
+    for query_name in ("daily_sales", "sales_categorisation"):
+        expected = run_query(conn, query_name)["rows"]
+        rows = run_query(conn, f"{query_name}_rollup")["rows"]
+        assert rows == [
+            tuple(
+                pytest.approx(value) if isinstance(value, float) else value
+                for value in row
+            )
+            for row in expected
+        ], query_name
+
+
+def test_rollups_follow_every_change():
+    rng = random.Random(0)
+    conn = sqlite3.connect(":memory:")
+    create_tables(conn)
+    products = list(range(100, 120))
+
+    def transaction():
+        return (
+            f"{rng.choice([2018, 2019, 2019, 2020])}-{rng.randint(1, 12):02d}-01",
+            rng.randint(1, 50),
+            rng.randint(1, 10),
+            rng.choice(products + [999]),  # 999 is not in the nomenclature
+            rng.choice([2.5, 10.0, 99.99, None]),
+            rng.randint(1, 4),
+        )
+
+    with conn:
+        conn.executemany(
+            "INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?)",
+            [transaction() for _ in range(300)],
+        )
+        conn.executemany(
+            "INSERT INTO product_nomenclature VALUES (?, ?, ?)",
+            [(product, rng.choice(["MEUBLE", "DECO"]), "") for product in products],
+        )
+    create_rollups(conn)
+    assert_rollups_match_queries(conn)
+
+    # Later changes go through the triggers
+    with conn:
+        conn.executemany(
+            "INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?)",
+            [transaction() for _ in range(100)],
+        )
+        conn.execute("DELETE FROM transactions WHERE client_id <= 3")
+        conn.execute(
+            "UPDATE transactions SET prod_qty = prod_qty + 1 WHERE order_id < 10"
+        )
+        conn.execute("UPDATE transactions SET date = '2019-06-01' WHERE client_id = 4")
+        conn.execute(
+            "UPDATE product_nomenclature SET product_type = 'DECO' WHERE product_id = 100"
+        )
+        conn.execute("DELETE FROM product_nomenclature WHERE product_id = 101")
+        conn.execute("INSERT INTO product_nomenclature VALUES (999, 'MEUBLE', '')")
+        conn.execute(
+            "INSERT INTO product_nomenclature VALUES (102, 'DECO', 'duplicate')"
+        )
+    assert_rollups_match_queries(conn)
+
+    # Emptied days and clients leave the reports
+    with conn:
+        conn.execute("DELETE FROM transactions WHERE date LIKE '2019-0%'")
+    assert_rollups_match_queries(conn)
+    conn.close()
+
+
+@pytest.mark.parametrize("rollups_first", [False, True])
+def test_rollups_keep_the_null_sums_of_the_queries(rollups_first):
+    """A day or client whose transactions have no price sums to NULL, not 0."""
+    conn = sqlite3.connect(":memory:")
+    create_tables(conn)
+    if rollups_first:  # the rows go through the triggers
+        create_rollups(conn)
+    with conn:
+        conn.execute(
+            "INSERT INTO transactions VALUES ('2019-03-01', 1, 1, 100, NULL, 2)"
+        )
+        conn.execute("INSERT INTO product_nomenclature VALUES (100, 'MEUBLE', '')")
+    if not rollups_first:
+        create_rollups(conn)
+
+    assert run_query(conn, "daily_sales_rollup")["rows"] == [("2019-03-01", None)]
+    assert run_query(conn, "sales_categorisation_rollup")["rows"] == [(1, None, 0)]
+    assert_rollups_match_queries(conn)
+
+    # One priced transaction is enough for a sum
+    with conn:
+        conn.execute(
+            "INSERT INTO transactions VALUES ('2019-03-01', 2, 1, 100, 10.0, 1)"
+        )
+    assert run_query(conn, "daily_sales_rollup")["rows"] == [("2019-03-01", 10.0)]
+    assert_rollups_match_queries(conn)
+    with conn:
+        conn.execute("DELETE FROM transactions WHERE order_id = 2")
+    assert run_query(conn, "daily_sales_rollup")["rows"] == [("2019-03-01", None)]
+    assert_rollups_match_queries(conn)
+    conn.close()
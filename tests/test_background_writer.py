@@ -0,0 +1,37 @@
+import threading
+
+import pytest
+
+from data_output.background_writer import BackgroundWriteError, BackgroundWriter
+
+
+def test_jobs_run_in_order_off_the_calling_thread():
+    written, threads = [], set()
+
+    def write_all(batch):
+        threads.add(threading.get_ident())
+        written.extend(batch)
+
+    with BackgroundWriter(max_pending=2) as writer:
+        writer.write_all("records", write_all, range(2_500), batch_size=100)
+
+    assert written == list(range(2_500))
+    assert threads and threading.get_ident() not in threads
+
+
+def test_first_error_is_raised_and_later_jobs_are_skipped():
+    written = []
+
+    def fail():
+        raise OSError("disk full")
+
+    writer = BackgroundWriter()
+    writer.submit("'a.csv'", written.append, "a")
+    writer.submit("'b.csv'", fail)
+    with pytest.raises(BackgroundWriteError, match="'b.csv': disk full"):
+        writer.wait()
+    with pytest.raises(BackgroundWriteError):
+        writer.submit("'c.csv'", written.append, "c")
+    with pytest.raises(BackgroundWriteError):
+        writer.close()
+    assert written == ["a"]
@@ -0,0 +1,73 @@
+import os
+import shutil
+
+import pandas as pd
+
+from data_cleansing import cleaning
+from utils.checkpoints import CheckpointStore, file_digest
+
+
+def test_resume_from_last_valid_checkpoint(tmp_path):
+    """Only the stages after the last valid checkpoint run; an input change invalidates downstream."""
+    raw_path = tmp_path / "raw.csv"
+    raw_path.write_text("drug\nAtropine\n")
+    checkpoint_dir = str(tmp_path / "checkpoints")
+    calls = []
+
+    def run(resume):
+        store = CheckpointStore(checkpoint_dir, resume=resume)
+        load_key = store.key("load", [file_digest(str(raw_path))])
+        clean_key = store.key("clean", [load_key], [cleaning])
+
+        def load(_):
+            calls.append("load")
+            return pd.read_csv(raw_path)
+
+        def clean(df):
+            calls.append("clean")
+            return df.assign(drug=df["drug"].str.upper())
+
+        return store.run_chain([("load", load_key, load), ("clean", clean_key, clean)])
+
+    expected = run(resume=False)
+    assert calls == ["load", "clean"]
+    pd.testing.assert_frame_equal(run(resume=True), expected)
+    assert calls == ["load", "clean"]
+
+    raw_path.write_text("drug\nEthanol\n")
+    assert run(resume=True)["drug"].tolist() == ["ETHANOL"]
+    assert calls == ["load", "clean", "load", "clean"]
+
+
+def test_outputs_valid_detects_changed_files(tmp_path):
+    output_path = tmp_path / "graph.json"
+    output_path.write_text("[]")
+    store = CheckpointStore(str(tmp_path / "checkpoints"), resume=True)
+    key = store.key("write", ["input"])
+    assert not store.outputs_valid("write", key)
+
+    store.save_outputs("write", key, [str(output_path)])
+    assert store.outputs_valid("write", key)
+    assert not store.outputs_valid("write", store.key("write", ["other input"]))
+
+    output_path.write_text("[{}]")
+    assert not store.outputs_valid("write", key)
+
+
+def test_only_resumable_runs_write_checkpoints(tmp_path, monkeypatch, capsys):
+    """A plain run pickles nothing; --checkpoint prepares a later --resume."""
+    import main
+
+    raw_dir = os.path.join(os.path.dirname(__file__), "..", "data", "raw")
+    shutil.copytree(raw_dir, tmp_path / "data" / "raw")
+    monkeypatch.chdir(tmp_path)
+    checkpoint_dir = tmp_path / "data" / "checkpoints"
+
+    main.main_pipeline()
+    assert not checkpoint_dir.exists()
+
+    main.main_pipeline(checkpoint=True)
+    assert len(list(checkpoint_dir.glob("*.pkl"))) == 5
+    capsys.readouterr()
+    main.main_pipeline(resume=True)
+    assert "is up to date" in capsys.readouterr().out
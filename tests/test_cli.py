@@ -0,0 +1,76 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+CLI_PATH = os.path.join(os.path.dirname(__file__), "..", "src", "cli.py")
+HEAVY_MODULES = {"pandas", "numpy"}
+
+
+def run_cli(*args):
+    """Runs the CLI in a fresh interpreter. Returns (result, seconds, modules imported)."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", CLI_PATH, *args],
+        capture_output=True,
+        text=True,
+    )
+    seconds = time.perf_counter() - start
+    modules = {
+        line.rsplit("|", 1)[1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:")
+    }
+    return result, seconds, modules
+
+
+@pytest.mark.parametrize(
+    "args, heavy",
+    [
+        (["--help"], False),
+        (["analyze", "--help"], False),
+        (["validate", "--help"], False),
+        (["run", "--help"], True),
+        (["bench", "--help"], True),
+    ],
+)
+def test_startup_time_of_each_command(args, heavy, record_property):
+    result, seconds, modules = run_cli(*args)
+    record_property("startup_seconds", round(seconds, 3))
+    print(f"{' '.join(args)}: started in {seconds:.3f}s")
+    assert result.returncode == 0, result.stderr
+    assert "usage:" in result.stdout
+    assert bool(modules & HEAVY_MODULES) == heavy, sorted(modules & HEAVY_MODULES)
+
+
+def test_analyze_reads_a_graph_without_pandas(tmp_path, record_property):
+    graph_path = tmp_path / "graph.json"
+    graph_path.write_text(
+        json.dumps(
+            [
+                {
+                    "drug": drug,
+                    "journal": journal,
+                    "date": "2020-01-01",
+                    "source_type": "pubmed",
+                    "publication_id": "1",
+                    "publication_title": "title",
+                }
+                for drug, journal in [("A", "J1"), ("B", "J1"), ("A", "J2")]
+            ]
+        )
+    )
+    result, seconds, modules = run_cli(
+        "analyze", "--graph", str(graph_path), "--drug", "A"
+    )
+    record_property("startup_seconds", round(seconds, 3))
+    assert result.returncode == 0, result.stderr
+    assert "'J1' (2 drugs)" in result.stdout
+    assert "via shared PubMed-only journals: B" in result.stdout
+    assert not modules & HEAVY_MODULES
+
+    result, _, _ = run_cli("analyze", "--graph", str(tmp_path / "missing.json"))
+    assert result.returncode == 1
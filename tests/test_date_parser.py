@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data_cleansing.date_parser import standardize_date, standardize_date_column
+
+DATES = [
+    "01/01/2019",
+    "1 January 2020",
+    "2020-01-01",
+    " 25/05/2020 ",
+    "1/2/2020",
+    "2020-1-3",
+    "31/02/2020",
+    "13/13/2020",
+    "1 Jan 2020",
+    "January 1 2020",
+    "01/01/0999",
+    "2020-01-01 00:00:00",
+    "",
+    "  ",
+    "not a date",
+    None,
+    np.nan,
+    20200101,
+]
+
+
+@pytest.mark.parametrize("dominant", ["01/01/2019", "1 January 2020", "2020-01-01"])
+def test_column_matches_scalar(dominant):
+    """Whatever the dominant format, results are identical to standardize_date."""
+    dates = pd.Series(
+        [dominant] * 5 + DATES * 3, index=range(100, 100 + 5 + 3 * len(DATES))
+    )
+    expected = dates.apply(standardize_date)
+    result = standardize_date_column(dates, sample_size=4)
+    assert result.index.equals(dates.index)
+    assert result.tolist() == expected.tolist()
+
+
+def test_empty_and_missing_only():
+    assert standardize_date_column(pd.Series([], dtype=object)).tolist() == []
+    assert standardize_date_column(pd.Series([None, np.nan])).tolist() == [None, None]
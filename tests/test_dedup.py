@@ -0,0 +1,130 @@
+import json
+import random
+
+import pandas as pd
+
+from data_ingestion import reader
+from data_ingestion.dedup import iter_deduplicated_chunks
+
+
+def test_matches_drop_duplicates_and_keeps_empty_ids(tmp_path):
+    rng = random.Random(0)
+    frames = [
+        pd.DataFrame(
+            {
+                "id": [
+                    rng.choice([str(rng.randint(1, 300)), "", None]) for _ in range(n)
+                ],
+                "title": [f"title {i}" for i in range(n)],
+            }
+        )
+        for n in (500, 0, 250, 700)
+    ]
+    stats = {}
+    result = pd.concat(
+        iter_deduplicated_chunks(
+            frames, chunk_size=64, partitions=7, spill_dir=str(tmp_path), stats=stats
+        ),
+        ignore_index=True,
+    )
+
+    merged = pd.concat(frames, ignore_index=True)
+    merged["id"] = merged["id"].fillna("")
+    empty = merged["id"] == ""
+    expected = merged[empty | ~merged["id"].duplicated(keep="first")]
+    pd.testing.assert_frame_equal(result, expected.reset_index(drop=True))
+    assert stats["duplicates"] == len(merged) - len(expected)
+    assert list(tmp_path.iterdir()) == []  # the spill files are removed
+
+
+def test_pubmed_inputs_keep_the_first_occurrence_across_files(tmp_path):
+    (tmp_path / "2024-01.csv").write_text("id,title\n1,first\n2,second\n,no id\n")
+    (tmp_path / "2024-02.json").write_text(
+        json.dumps(
+            [
+                {"id": 2, "title": "second again"},
+                {"id": "", "title": "no id either"},
+                {"id": 3, "title": "third"},
+            ]
+        )
+    )
+    (tmp_path / "2024-03.csv").write_text("id,title\n3,third again\n1,first again\n")
+    paths = [
+        str(tmp_path / name) for name in ("2024-01.csv", "2024-02.json", "2024-03.csv")
+    ]
+
+    pubmed_df = reader.load_pubmed_inputs(paths, spill_dir=str(tmp_path), partitions=4)
+
+    assert pubmed_df["id"].tolist() == ["1", "2", "", "", "3"]
+    assert pubmed_df["title"].tolist() == [
+        "first",
+        "second",
+        "no id",
+        "no id either",
+        "third",
+    ]
+
+
+def test_default_pubmed_paths_keep_every_empty_id(tmp_path, monkeypatch):
+    csv_path = tmp_path / "pubmed.csv"
+    json_path = tmp_path / "pubmed.json"
+    csv_path.write_text("id,title\n1,first\n,no id\n1,first again\n")
+    json_path.write_text(
+        json.dumps(
+            [
+                {"id": "", "title": "no id either"},
+                {"id": " ", "title": "blank id"},
+                {"id": 2, "title": "second"},
+                {"id": 1, "title": "first once more"},
+            ]
+        )
+    )
+    monkeypatch.setattr(reader, "pubmed_csv_path", str(csv_path))
+    monkeypatch.setattr(reader, "pubmed_json_path", str(json_path))
+    expected = reader.load_pubmed_inputs(
+        [str(csv_path), str(json_path)], spill_dir=str(tmp_path)
+    )
+
+    merged = reader._merge_pubmed(reader._read_pubmed_csv(), reader._read_pubmed_json())
+    streamed = pd.concat(reader.iter_pubmed_chunks(chunk_size=2), ignore_index=True)
+
+    assert expected["title"].tolist() == [
+        "first",
+        "no id",
+        "no id either",
+        "blank id",
+        "second",
+    ]
+    for pubmed_df in (merged, streamed):
+        assert pubmed_df["title"].tolist() == expected["title"].tolist()
+        assert pubmed_df["id"].tolist() == ["1", "", "", "", "2"]
+
+
+def test_pubmed_paths_compare_integer_ids_like_numbers(tmp_path, monkeypatch):
+    csv_path = tmp_path / "pubmed.csv"
+    json_path = tmp_path / "pubmed.json"
+    csv_path.write_text("id,title\n01,first\nA01,text id\n")
+    json_path.write_text(
+        json.dumps(
+            [
+                {"id": 1, "title": "first again"},
+                {"id": "001", "title": "first once more"},
+                {"id": "A1", "title": "other text id"},
+            ]
+        )
+    )
+    monkeypatch.setattr(reader, "pubmed_csv_path", str(csv_path))
+    monkeypatch.setattr(reader, "pubmed_json_path", str(json_path))
+
+    merged = reader._merge_pubmed(reader._read_pubmed_csv(), reader._read_pubmed_json())
+    compact = reader._merge_pubmed(
+        reader._read_pubmed_csv(compact=True), reader._read_pubmed_json(compact=True)
+    )
+    streamed = pd.concat(reader.iter_pubmed_chunks(chunk_size=2), ignore_index=True)
+    on_disk = reader.load_pubmed_inputs(
+        [str(csv_path), str(json_path)], spill_dir=str(tmp_path)
+    )
+
+    for pubmed_df in (merged, compact, streamed, on_disk):
+        assert pubmed_df["title"].tolist() == ["first", "text id", "other text id"]
+        assert pubmed_df["id"].astype(str).tolist() == ["1", "A01", "A1"]
@@ -0,0 +1,69 @@
+import pandas as pd
+import pytest
+from data_transformation.drug_matcher import build_drug_matcher
+from data_transformation.drug_mention_finder import find_drug_mentions
+from data_transformation.parallel_mention_finder import find_drug_mentions_parallel
+
+DRUGS_LIST_UPPER = [
+    (name, name.upper())
+    for name in ["DIPHENHYDRAMINE", "ETHANOL", "METHANOL", "Atropine", "ISOPRENALINE"]
+]
+
+
+def make_publications():
+    return pd.DataFrame(
+        {
+            "id": ["1", "2", "3", "4", ""],
+            "title": [
+                "Diphenhydramine hydrochloride helps symptoms of ciguatera fish poisoning.",
+                "Methanol and ethanol poisoning",
+                "No drug here",
+                None,
+                "ATROPINE, isoprenaline hydrochloride and DIPHENHYDRAMINE",
+            ],
+            "journal": ["J1", "J2", "J1", "J3", None],
+            "date": ["2019-01-01", "2020-01-01", "2020-01-01", "2020-01-01", None],
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "title, expected_indexes",
+    [
+        ("", []),
+        ("METHANOL", [1, 2]),  # ETHANOL is nested in METHANOL
+        ("ISOPRENALINE ATROPINE", [3, 4]),
+        ("DIPHENHYDRAMINEETHANOL", [0, 1]),
+        ("NOTHING TO SEE", []),
+    ],
+)
+@pytest.mark.parametrize("engine", ["aho_corasick", "naive"])
+def test_matcher_engines(engine, title, expected_indexes):
+    """Both engines report every drug contained in the title, in drug list order."""
+    matcher = build_drug_matcher(DRUGS_LIST_UPPER, engine)
+    assert matcher.find(title) == expected_indexes
+
+
+def test_engines_return_same_mentions():
+    """The automaton returns exactly the same mention records as the naive engine."""
+    naive = find_drug_mentions(make_publications(), DRUGS_LIST_UPPER, "pubmed", "naive")
+    automaton = find_drug_mentions(
+        make_publications(), DRUGS_LIST_UPPER, "pubmed", "aho_corasick"
+    )
+    assert automaton == naive
+    assert [m["drug"] for m in automaton] == ["DIPHENHYDRAMINE", "ETHANOL", "METHANOL"]
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        build_drug_matcher(DRUGS_LIST_UPPER, "regex")
+
+
+def test_parallel_mentions_match_serial():
+    """Sharded matching in a process pool merges results in the serial order."""
+    publications = pd.concat([make_publications()] * 4, ignore_index=True)
+    serial = find_drug_mentions(publications.copy(), DRUGS_LIST_UPPER, "pubmed")
+    parallel = find_drug_mentions_parallel(
+        publications, DRUGS_LIST_UPPER, "pubmed", workers=2, chunk_size=3
+    )
+    assert parallel == serial
@@ -0,0 +1,77 @@
+import random
+
+import pytest
+from analysis.adhoc_analysis import (
+    find_journal_with_most_different_drugs,
+    find_related_drugs_by_pubmed_journals,
+)
+from analysis.drug_cooccurrence import find_all_related_drugs_by_pubmed_journals
+from analysis.graph_index import (
+    GraphIndex,
+    GraphIndexBuilder,
+    build_graph_index,
+    open_graph_index,
+)
+
+
+def random_mentions(seed, count=300):
+    rng = random.Random(seed)
+    drugs = ["ATROPINE", "Atropine", "BETAMETHASONE", "EPINEPHRINE", "ISOPRENALINE"]
+    journals = [f"Journal {i}" for i in range(8)] + [""]
+    sources = ["pubmed", "pubmed", "clinical_trial"]
+    return [
+        {
+            "drug": rng.choice(drugs),
+            "journal": rng.choice(journals),
+            "date": "2020-01-01",
+            "source_type": rng.choice(sources),
+            "publication_id": str(i),
+            "publication_title": "title",
+        }
+        for i in range(rng.randint(0, count))
+    ]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_index_queries_match_adhoc_analysis(tmp_path, seed):
+    """Queries on the memory-mapped index give the answers of the ad-hoc functions."""
+    mentions = random_mentions(seed)
+    graph_path = tmp_path / "graph.json"
+    graph_path.write_text("[]")
+    index = GraphIndex(build_graph_index(mentions, str(graph_path)))
+
+    expected = find_journal_with_most_different_drugs(mentions)
+    assert index.find_journal_with_most_different_drugs() == expected
+    for drug in ["BETAMETHASONE", "atropine", "EPINEPHRINE", "UNKNOWN", ""]:
+        assert index.find_related_drugs_by_pubmed_journals(
+            drug
+        ) == find_related_drugs_by_pubmed_journals(mentions, drug)
+
+
+def test_stale_index_is_not_opened(tmp_path):
+    """An index is only used for the version of the graph file it was built from."""
+    graph_path = tmp_path / "graph.json"
+    graph_path.write_text("[]")
+    builder = GraphIndexBuilder()
+    builder.add_all(random_mentions(1))
+    builder.save(str(graph_path) + ".index", str(graph_path))
+    assert open_graph_index(str(graph_path)) is not None
+
+    graph_path.write_text("[ ]")
+    assert open_graph_index(str(graph_path)) is None
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_all_related_drugs_match_per_drug_function(tmp_path, seed):
+    """The batch computation gives, for every drug, the per-drug function's answer."""
+    mentions = random_mentions(seed)
+    graph_path = tmp_path / "graph.json"
+    graph_path.write_text("[]")
+    index = GraphIndex(build_graph_index(mentions, str(graph_path)))
+
+    for graph_data in (mentions, index):
+        related = find_all_related_drugs_by_pubmed_journals(graph_data)
+        for drug in ["BETAMETHASONE", "ATROPINE", "EPINEPHRINE", "ISOPRENALINE"]:
+            assert related.get(drug, set()) == find_related_drugs_by_pubmed_journals(
+                mentions, drug
+            )
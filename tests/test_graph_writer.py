@@ -0,0 +1,108 @@
+import json
+import pytest
+from analysis.adhoc_analysis import load_graph_data
+from data_output.graph_reader import GraphRecords, NormalizedGraph
+from data_output.graph_writer import (
+    NORMALIZED_GRAPH_VERSION,
+    JsonArrayWriter,
+    graph_file_name,
+    open_graph_writer,
+)
+from data_transformation.mention_table import chunk_mentions
+
+MENTIONS = [
+    {
+        "drug": "BETAMETHASONE",
+        "journal": "The journal of maternal-fetal & neonatal medicine",
+        "date": "2020-01-01",
+        "source_type": "pubmed",
+        "publication_id": "10",
+        "publication_title": 'Clinical implications of umbilical artery Doppler changes (Ã©, "quoted")',
+    },
+    {
+        "drug": "ATROPINE",
+        "journal": "Journal of emergency nursing",
+        "date": "2020-03-01",
+        "source_type": "clinical_trial",
+        "publication_id": "NCT01967433",
+        "publication_title": "Multi-line\ntitle",
+    },
+]
+
+
+@pytest.mark.parametrize("mentions", [[], MENTIONS[:1], MENTIONS])
+def test_json_array_writer_matches_json_dump(tmp_path, mentions):
+    """Streamed output is byte-for-byte identical to the batch json.dump output."""
+    streamed_path = tmp_path / "streamed.json"
+    with JsonArrayWriter(streamed_path) as writer:
+        writer.write_all(iter(mentions))
+
+    expected = json.dumps(mentions, indent=2, ensure_ascii=False)
+    assert streamed_path.read_text(encoding="utf-8") == expected
+    assert writer.count == len(mentions)
+
+
+@pytest.mark.parametrize("output_format", ["ndjson", "ndjson.gz"])
+def test_ndjson_round_trip(tmp_path, output_format):
+    """NDJSON graphs (optionally gzipped) are read back lazily by the analysis module."""
+    graph_path = str(tmp_path / graph_file_name(output_format))
+    with open_graph_writer(graph_path, output_format) as writer:
+        writer.write_all(iter(MENTIONS))
+
+    records = load_graph_data(graph_path)
+    assert isinstance(records, GraphRecords)
+    assert list(records) == MENTIONS
+    assert list(records) == MENTIONS  # re-iterable
+
+
+@pytest.mark.parametrize("output_format", ["json", "ndjson", "ndjson.gz", "normalized"])
+def test_failed_writes_leave_no_file(tmp_path, output_format):
+    """A block that raises leaves nothing that could be read as a complete graph."""
+    graph_path = tmp_path / graph_file_name(output_format)
+    with pytest.raises(RuntimeError):
+        with open_graph_writer(str(graph_path), output_format) as writer:
+            writer.write_all(iter(MENTIONS))
+            raise RuntimeError("mention finding failed")
+    assert not graph_path.exists()
+
+
+def test_normalized_round_trip(tmp_path):
+    """The normalized graph stores each publication once and denormalizes back to the mentions."""
+    mentions = MENTIONS + [dict(MENTIONS[0], drug="ATROPINE")]
+    graph_path = str(tmp_path / graph_file_name("normalized"))
+    with open_graph_writer(graph_path, "normalized") as writer:
+        writer.write_all(iter(mentions))
+
+    graph = load_graph_data(graph_path)
+    assert isinstance(graph, NormalizedGraph)
+    assert len(graph.table.publication_ids) == len(MENTIONS)
+    assert len(graph) == len(mentions)
+    assert list(graph) == mentions
+
+
+def test_normalized_graphs_of_another_version_are_not_read(tmp_path, capsys):
+    graph_path = tmp_path / graph_file_name("normalized")
+    with open_graph_writer(str(graph_path), "normalized") as writer:
+        writer.write_all(iter(MENTIONS))
+    data = json.loads(graph_path.read_text(encoding="utf-8"))
+    assert NormalizedGraph.is_normalized(data)
+
+    data["version"] = NORMALIZED_GRAPH_VERSION + 1
+    graph_path.write_text(json.dumps(data), encoding="utf-8")
+    assert not NormalizedGraph.is_normalized(data)
+    assert load_graph_data(str(graph_path)) is None
+    assert "Unsupported graph format" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("output_format", ["json", "ndjson", "normalized"])
+def test_mention_tables_are_written_like_records(tmp_path, output_format):
+    """Writing MentionTable chunks gives the same file as writing the mention dicts."""
+    mentions = MENTIONS + [dict(MENTIONS[0], drug="ATROPINE"), MENTIONS[1]]
+    paths = [tmp_path / "records", tmp_path / "tables"]
+    with open_graph_writer(paths[0], output_format) as writer:
+        writer.write_all(mentions)
+    with open_graph_writer(paths[1], output_format) as writer:
+        for table in chunk_mentions(mentions, table_rows=3):
+            writer.write_table(table)
+    assert writer.count == len(mentions)
+    assert paths[1].read_bytes() == paths[0].read_bytes()
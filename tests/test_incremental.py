@@ -0,0 +1,158 @@
+import json
+import os
+import shutil
+
+import pandas as pd
+import pytest
+from data_transformation.drug_matcher import build_drug_matcher
+from data_transformation.drug_mention_finder import find_drug_mentions
+from data_transformation.incremental import find_mentions_incrementally
+from data_transformation.title_index import TitleIndex
+
+
+def drugs(*names):
+    return [(name, name.upper()) for name in names]
+
+
+def pubmed(rows):
+    return pd.DataFrame(rows, columns=["id", "title", "journal", "date"])
+
+
+def trials(rows):
+    return pd.DataFrame(rows, columns=["id", "scientific_title", "journal", "date"])
+
+
+def full_run(publications, drugs_list_upper):
+    mentions = []
+    for publications_df, source_type in publications:
+        mentions.extend(
+            find_drug_mentions(publications_df.copy(), drugs_list_upper, source_type)
+        )
+    return mentions
+
+
+def incremental_run(publications, drugs_list_upper, manifest, mentions, policy):
+    return find_mentions_incrementally(
+        [(df.copy(), source_type) for df, source_type in publications],
+        drugs_list_upper,
+        build_drug_matcher(drugs_list_upper),
+        find_drug_mentions,
+        manifest,
+        mentions,
+        policy,
+    )
+
+
+FIRST_PUBLICATIONS = [
+    (
+        pubmed(
+            [
+                ["1", "Atropine and ethanol", "J1", "2020-01-01"],
+                ["2", "Betamethasone", "J2", "2020-01-02"],
+                ["3", "Ethanol only", "J1", "2020-01-03"],
+            ]
+        ),
+        "pubmed",
+    ),
+    (trials([["NCT00000001", "Atropine trial", "J3", "2020-02-01"]]), "clinical_trial"),
+]
+
+SECOND_PUBLICATIONS = [
+    (
+        pubmed(
+            [
+                ["1", "Atropine and ethanol", "J1", "2020-01-01"],  # unchanged
+                ["2", "Betamethasone and atropine", "J2", "2020-01-02"],  # changed
+                ["4", "Epinephrine with ethanol", "J4", "2020-01-04"],  # inserted
+            ]
+        ),
+        "pubmed",
+    ),  # "3" deleted
+    (trials([["NCT00000001", "Atropine trial", "J3", "2020-02-01"]]), "clinical_trial"),
+]
+
+
+@pytest.mark.parametrize("policy", ["targeted", "full"])
+@pytest.mark.parametrize(
+    "second_drugs",
+    [
+        drugs("ATROPINE", "ETHANOL", "BETAMETHASONE"),  # unchanged
+        drugs("EPINEPHRINE", "ATROPINE", "BETAMETHASONE"),  # added and removed
+    ],
+)
+def test_incremental_run_matches_full_run(policy, second_drugs):
+    first_drugs = drugs("ATROPINE", "ETHANOL", "BETAMETHASONE")
+    mentions, manifest = incremental_run(
+        FIRST_PUBLICATIONS, first_drugs, None, None, policy
+    )
+    assert mentions == full_run(FIRST_PUBLICATIONS, first_drugs)
+
+    mentions, _ = incremental_run(
+        SECOND_PUBLICATIONS, second_drugs, manifest, mentions, policy
+    )
+    assert mentions == full_run(SECOND_PUBLICATIONS, second_drugs)
+
+
+def test_title_index_resolves_added_drugs(tmp_path):
+    """With a title index, added drugs are only matched against candidate titles."""
+    title_index = TitleIndex(str(tmp_path / "title_index"))
+    first_drugs = drugs("ATROPINE", "BETAMETHASONE")
+    mentions, manifest = find_mentions_incrementally(
+        FIRST_PUBLICATIONS,
+        first_drugs,
+        build_drug_matcher(first_drugs),
+        find_drug_mentions,
+        None,
+        None,
+        title_index=title_index,
+    )
+    title_index.save()
+
+    scanned = []
+
+    def find_mentions(publications_df, drugs_list_upper, source_type, matcher):
+        scanned.extend(publications_df["id"])
+        return find_drug_mentions(
+            publications_df, drugs_list_upper, source_type, matcher=matcher
+        )
+
+    second_drugs = drugs("ATROPINE", "BETAMETHASONE", "ETHANOL")
+    mentions, _ = find_mentions_incrementally(
+        FIRST_PUBLICATIONS,
+        second_drugs,
+        build_drug_matcher(second_drugs),
+        find_mentions,
+        manifest,
+        mentions,
+        title_index=TitleIndex.open(str(tmp_path / "title_index")),
+    )
+    assert mentions == full_run(FIRST_PUBLICATIONS, second_drugs)
+    assert sorted(scanned) == ["1", "3"]  # the titles containing "ETHANOL"
+
+
+def test_incremental_run_after_a_plain_run(tmp_path, monkeypatch, capsys):
+    """A graph rewritten by a non-incremental run invalidates the incremental manifest."""
+    import main
+
+    raw_dir = os.path.join(os.path.dirname(__file__), "..", "data", "raw")
+    shutil.copytree(raw_dir, tmp_path / "data" / "raw")
+    monkeypatch.chdir(tmp_path)
+    drugs_path = tmp_path / "data" / "raw" / "drugs.csv"
+    full_drugs = drugs_path.read_text()
+    drugs_path.write_text(
+        "".join(
+            line
+            for line in full_drugs.splitlines(keepends=True)
+            if "BETAMETHASONE" not in line
+        )
+    )
+    graph_path = tmp_path / "data" / "output" / "drug_journal_mentions_graph.json"
+
+    main.main_pipeline(incremental=True)
+    drugs_path.write_text(full_drugs)
+    main.main_pipeline()
+    expected = json.loads(graph_path.read_text())
+    main.main_pipeline(incremental=True)
+
+    assert json.loads(graph_path.read_text()) == expected
+    assert "was written by another run" in capsys.readouterr().out
@@ -0,0 +1,40 @@
+import json
+import pstats
+
+from utils.instrumentation import StageRecorder
+
+
+def test_stage_metrics_accumulate_and_nest(tmp_path):
+    """Repeated stages accumulate; nested stages are excluded from the parent's self time."""
+    recorder = StageRecorder(
+        track_memory=True, profile_stages=["produce"], profile_dir=str(tmp_path)
+    )
+    for rows in ([1, 2, 3], [4, 5]):
+        with recorder.stage("filter", rows_in=len(rows)) as run:
+            run.rows_out = len([row for row in rows if row % 2])
+
+    with recorder.stage("consume", rows_in=50):
+        items = list(recorder.iterate("produce", (str(i) * 1000 for i in range(50))))
+    assert len(items) == 50
+
+    metrics_path = tmp_path / "metrics.json"
+    recorder.write_metrics(str(metrics_path))
+    recorder.stop()
+    stages = {
+        stage["stage"]: stage
+        for stage in json.loads(metrics_path.read_text())["stages"]
+    }
+
+    assert stages["filter"]["calls"] == 2
+    assert (stages["filter"]["rows_in"], stages["filter"]["rows_out"]) == (5, 3)
+    assert stages["produce"]["rows_out"] == 50
+    assert stages["produce"]["peak_memory_bytes"] > 0
+    consume = stages["consume"]
+    nested_seconds = consume["wall_seconds"] - consume["self_wall_seconds"]
+    assert abs(nested_seconds - stages["produce"]["wall_seconds"]) < 1e-5
+    # The throughput of a stage does not count the time of its nested stages
+    assert consume["rows_per_second"] > 50 / consume["wall_seconds"]
+
+    (profile_path,) = recorder.dump_profiles()
+    assert profile_path.endswith("produce.prof")
+    assert pstats.Stats(profile_path).total_calls > 0
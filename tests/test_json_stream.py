@@ -0,0 +1,88 @@
+import io
+import json
+import pytest
+from data_ingestion.json_stream import iter_json_array
+
+
+def parse(document, read_size=3):
+    return list(iter_json_array(io.StringIO(document), read_size=read_size))
+
+
+@pytest.mark.parametrize("read_size", [1, 2, 7, 1 << 16])
+def test_trailing_commas_are_tolerated(read_size):
+    document = '[\n  {"id": 9, "title": "a, b",},\n  {"id": "", "tags": [1, 2,],},\n]'
+    assert parse(document, read_size) == [
+        {"id": 9, "title": "a, b"},
+        {"id": "", "tags": [1, 2]},
+    ]
+
+
+def test_commas_inside_strings_are_kept():
+    """The old regex fix turned 'x, ]' inside a title into 'x]'."""
+    document = '[{"title": "Effects of drugs, ]x, } and \\"quotes\\",",}]'
+    assert parse(document) == [{"title": 'Effects of drugs, ]x, } and "quotes",'}]
+
+
+@pytest.mark.parametrize("read_size", [1, 2, 7, 1 << 16])
+def test_elements_after_a_trailing_comma_take_the_fast_path_again(read_size):
+    document = '[{"a": [1,],}, "x y", 12, {"b": "c, d"}, [true, null,],]'
+    assert parse(document, read_size) == [
+        {"a": [1]},
+        "x y",
+        12,
+        {"b": "c, d"},
+        [True, None],
+    ]
+
+
+@pytest.mark.parametrize("read_size", [1, 2, 3, 4, 5, 7])
+def test_numbers_cut_by_a_read_boundary(read_size):
+    """'12.' or '5e' at the end of a chunk is not the number '12' or '5'."""
+    document = '[12.5e3, -0.25, 5E-2,7,{"n": 1.5e2,}, 1e10, true]'
+    assert parse(document, read_size) == [
+        12500.0,
+        -0.25,
+        0.05,
+        7,
+        {"n": 150.0},
+        1e10,
+        True,
+    ]
+
+
+def test_number_across_the_default_read_size():
+    document = '["' + "x" * 65526 + '", 12.5e3]'
+    assert parse(document, read_size=1 << 16) == ["x" * 65526, 12500.0]
+
+
+@pytest.mark.parametrize("document", ["[]", "  [ ]  "])
+def test_empty_arrays(document):
+    assert parse(document) == []
+
+
+def test_matches_json_loads_on_valid_json():
+    records = [
+        {"id": i, "title": f"title {i} é", "n": [i, None, True]} for i in range(50)
+    ]
+    assert parse(json.dumps(records, indent=2)) == records
+
+
+@pytest.mark.parametrize(
+    "document",
+    [
+        '{"id": 1}',
+        '[{"id": 1}',
+        '[{"title": "unterminated]',
+        "[1] 2",
+        "",
+        "[,]",
+        '[,{"a": 1}]',
+        '[{"a": 1},,{"b": 2},]',
+        '[{"a": 1},,]',
+        '[{"a": 1} {"b": 2}]',
+        '["x" 1]',
+    ],
+)
+def test_malformed_documents_raise(document):
+    with pytest.raises(json.JSONDecodeError):
+        parse(document)
@@ -0,0 +1,96 @@
+import pickle
+
+import pandas as pd
+import pytest
+from analysis.adhoc_analysis import (
+    find_journal_with_most_different_drugs,
+    find_related_drugs_by_pubmed_journals,
+)
+from data_transformation.drug_mention_finder import (
+    find_drug_mentions,
+    find_mention_table,
+    iter_mention_tables,
+)
+from data_transformation.mention_table import (
+    MentionTable,
+    chunk_mentions,
+    iter_mention_dicts,
+)
+from data_transformation.parallel_mention_finder import iter_mention_tables_parallel
+from test_drug_mention_finder import DRUGS_LIST_UPPER, make_publications
+
+
+def publications():
+    return pd.concat([make_publications()] * 5, ignore_index=True)
+
+
+def test_tables_hold_the_mentions_of_the_finder():
+    expected = find_drug_mentions(publications(), DRUGS_LIST_UPPER, "pubmed")
+    table = find_mention_table(publications(), DRUGS_LIST_UPPER, "pubmed")
+    assert list(iter_mention_dicts([table])) == expected
+    assert list(table) == expected
+    # Each publication is stored once, whatever the number of drugs (and copies) of it
+    assert len(table) == 15 and table.publication_ids == ["1", "2"]
+
+    chunks = list(
+        iter_mention_tables(publications(), DRUGS_LIST_UPPER, "pubmed", table_rows=4)
+    )
+    # Publications mention 1 then 2 drugs, and never span two tables
+    assert [len(chunk) for chunk in chunks] == [4, 5, 4, 2]
+    assert list(iter_mention_dicts(chunks)) == expected
+
+    parallel = list(
+        iter_mention_tables_parallel(
+            publications(), DRUGS_LIST_UPPER, "pubmed", workers=2, chunk_size=7
+        )
+    )
+    assert list(iter_mention_dicts(parallel)) == expected
+
+    merged = MentionTable()
+    for chunk in chunks[::-1]:
+        merged.extend_table(pickle.loads(pickle.dumps(chunk)))
+    assert list(merged) == [
+        mention for chunk in chunks[::-1] for mention in iter_mention_dicts([chunk])
+    ]
+
+
+def test_record_views_read_like_dicts():
+    mentions = find_drug_mentions(publications(), DRUGS_LIST_UPPER, "pubmed")
+    table = next(chunk_mentions(mentions))
+    record = table[-1]
+    assert record == mentions[-1]
+    assert dict(record) == record.to_dict() == mentions[-1]
+    assert record["journal"] == record.journal == mentions[-1]["journal"]
+    assert record.get("missing", "default") == "default"
+    assert "journal" in record and "missing" not in record
+    assert list(record) == list(mentions[-1])
+    assert {**record} == mentions[-1]
+    with pytest.raises(KeyError):
+        record["missing"]
+    with pytest.raises(AttributeError):
+        record.extra = 1
+    with pytest.raises(IndexError):
+        table[len(table)]
+
+    # The analyses read the views directly
+    assert find_journal_with_most_different_drugs(
+        table
+    ) == find_journal_with_most_different_drugs(mentions)
+    assert find_related_drugs_by_pubmed_journals(
+        table, "ethanol"
+    ) == find_related_drugs_by_pubmed_journals(mentions, "ethanol")
+
+
+def test_tables_are_rebuilt_from_the_normalized_format():
+    mentions = find_drug_mentions(
+        publications(), DRUGS_LIST_UPPER, "pubmed"
+    ) + find_drug_mentions(publications(), DRUGS_LIST_UPPER, "clinical_trial")
+    table = next(chunk_mentions(mentions))
+    rebuilt = MentionTable.from_normalized(table.to_normalized())
+    assert list(rebuilt) == mentions
+    assert rebuilt.to_normalized() == table.to_normalized()
+
+    # Known values and publications keep their codes when mentions are added
+    rebuilt.extend(mentions[:3])
+    table.extend(mentions[:3])
+    assert rebuilt.to_normalized() == table.to_normalized()
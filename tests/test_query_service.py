@@ -0,0 +1,153 @@
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+from analysis.query_service import GraphQueryService, make_server
+
+MENTIONS = [
+    {"drug": "ATROPINE", "journal": "J1", "source_type": "pubmed"},
+    {"drug": "BETAMETHASONE", "journal": "J1", "source_type": "pubmed"},
+    {"drug": "BETAMETHASONE", "journal": "J2", "source_type": "clinical_trial"},
+    {"drug": "EPINEPHRINE", "journal": "J2", "source_type": "pubmed"},
+]
+
+
+@pytest.fixture
+def graph_path(tmp_path):
+    path = tmp_path / "graph.json"
+    path.write_text(json.dumps(MENTIONS), encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def base_url(graph_path):
+    service = GraphQueryService(graph_path)
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+    service.close()
+
+
+def get(url):
+    try:
+        with urllib.request.urlopen(url) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+def test_endpoints(base_url):
+    assert get(base_url + "/journal-most-drugs") == (
+        200,
+        {"journal": "J1", "drug_count": 2},
+    )
+    assert get(base_url + "/related-drugs?drug=betamethasone") == (
+        200,
+        {"drug": "BETAMETHASONE", "related_drugs": ["Atropine"]},
+    )
+    status, result = get(base_url + "/drug/BETAMETHASONE")
+    assert status == 200
+    assert result["journals"] == [
+        {"journal": "J1", "source_types": ["pubmed"]},
+        {"journal": "J2", "source_types": ["clinical_trial"]},
+    ]
+    assert get(base_url + "/journal/J2") == (
+        200,
+        {"journal": "J2", "drugs": ["BETAMETHASONE", "EPINEPHRINE"]},
+    )
+    assert get(base_url + "/journal/Unknown%20journal")[0] == 404
+    assert get(base_url + "/related-drugs")[0] == 400
+    assert get(base_url + "/unknown")[0] == 404
+
+
+def test_cache_is_invalidated_when_the_graph_changes(graph_path):
+    service = GraphQueryService(graph_path)
+    assert service.journal_with_most_drugs()["journal"] == "J1"
+    assert service.journal_with_most_drugs()["journal"] == "J1"
+    assert service.cache.hits == 1
+
+    with open(graph_path, "w", encoding="utf-8") as f:
+        json.dump(
+            MENTIONS + [{"drug": "X", "journal": "J2", "source_type": "pubmed"}], f
+        )
+    stat = os.stat(graph_path)
+    os.utime(graph_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert service.journal_with_most_drugs() == {"journal": "J2", "drug_count": 3}
+    assert service.related_drugs("X")["related_drugs"] == ["Epinephrine"]
+    service.close()
+
+
+def test_stale_results_are_not_served(graph_path):
+    service = GraphQueryService(graph_path)
+    assert service.related_drugs("ATROPINE")["related_drugs"] == ["Betamethasone"]
+    # The service compiles its own index, without writing next to the graph
+    assert os.listdir(os.path.dirname(graph_path)) == ["graph.json"]
+    stale = service._all_related_drugs
+
+    with open(graph_path, "w", encoding="utf-8") as f:
+        json.dump(MENTIONS[:1], f)
+    stat = os.stat(graph_path)
+    os.utime(graph_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    service._current_index()
+    # Left behind by a query that was still running on the previous graph
+    service._all_related_drugs = stale
+    assert service.related_drugs("ATROPINE")["related_drugs"] == []
+
+    scratch_dir = service._scratch_dir
+    service.close()
+    assert not os.path.exists(scratch_dir)
+
+
+def test_results_echo_the_normalised_drug_name(graph_path):
+    service = GraphQueryService(graph_path)
+    assert service.related_drugs("betamethasone")["drug"] == "BETAMETHASONE"
+    assert service.related_drugs("BetaMethasone") == {
+        "drug": "BETAMETHASONE",
+        "related_drugs": ["Atropine"],
+    }
+    assert service.drug("atropine")["drug"] == "ATROPINE"
+    assert service.drug("ATROPINE")["drug"] == "ATROPINE"
+    service.close()
+
+
+def test_related_drugs_computation_does_not_block_other_queries(
+    graph_path, monkeypatch
+):
+    from analysis import query_service
+
+    started, release = threading.Event(), threading.Event()
+    find_all = query_service.find_all_related_drugs_by_pubmed_journals
+
+    def slow_find_all(index):
+        started.set()
+        release.wait(10)
+        return find_all(index)
+
+    monkeypatch.setattr(
+        query_service, "find_all_related_drugs_by_pubmed_journals", slow_find_all
+    )
+    service = GraphQueryService(graph_path)
+    related = []
+    thread = threading.Thread(
+        target=lambda: related.append(service.related_drugs("ATROPINE"))
+    )
+    thread.start()
+    try:
+        assert started.wait(10)
+        # Answered while the related drugs are still being computed
+        assert service.drug("ATROPINE")["journals"] == [
+            {"journal": "J1", "source_types": ["pubmed"]}
+        ]
+        assert service.journal("J2")["drugs"] == ["BETAMETHASONE", "EPINEPHRINE"]
+        assert not related
+    finally:
+        release.set()
+        thread.join()
+        service.close()
+    assert related[0]["related_drugs"] == ["Betamethasone"]
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from data_cleansing.date_parser import format_date_column, to_datetime_column
+from data_ingestion.schema import align_categories, compact_frame, compact_ids
+from utils.utils import clean_skipped_hex_sequences_column, is_nct_number_column
+
+
+def test_compact_frame_and_integer_ids():
+    csv_df = pd.DataFrame(
+        {"id": ["1", "2"], "title": ["a", "b"], "journal": ["J1", "J2"], "x": [0, 0]}
+    )
+    json_df = pd.DataFrame({"id": ["3"], "title": ["c"], "journal": ["J3"]})
+    frames = [compact_frame(df, "pubmed") for df in (csv_df, json_df)]
+    assert list(frames[0].columns) == ["id", "title", "journal"]
+
+    merged = pd.concat(align_categories(frames), ignore_index=True)
+    assert merged["journal"].dtype == "category"
+    assert merged["journal"].tolist() == ["J1", "J2", "J3"]
+    assert compact_ids(merged)["id"].tolist() == [1, 2, 3]
+
+    # Ids that do not round-trip through int (blank, leading zeros) stay text
+    for ids in (["1", ""], ["1", "007"]):
+        mixed = pd.DataFrame({"id": ids})
+        assert compact_ids(mixed)["id"].tolist() == ids
+
+
+def test_categorical_columns_clean_like_text():
+    # Missing values read by read_csv are NaN, which both versions turn into 'nan'
+    values = ["NCT01", "Journal \\xc3\\xb1", np.nan, "NCT01", "Journal \\xc3\\xb1"]
+    text = pd.Series(values, dtype=object)
+    categorical = text.astype("category")
+    assert is_nct_number_column(categorical).tolist() == (
+        is_nct_number_column(text).tolist()
+    )
+    cleaned = clean_skipped_hex_sequences_column(categorical)
+    assert cleaned.dtype == "category"
+    assert cleaned.astype(object).tolist() == (
+        clean_skipped_hex_sequences_column(text).tolist()
+    )
+
+    dates = pd.Series(["2020-01-01", None, "2019-12-31"], index=[5, 6, 7])
+    formatted = format_date_column(to_datetime_column(dates))
+    assert formatted.index.equals(dates.index)
+    assert formatted.tolist() == dates.tolist()
@@ -0,0 +1,132 @@
+import gzip
+import os
+
+import pandas as pd
+import pytest
+
+from data_transformation.drug_mention_finder import find_drug_mentions
+from data_transformation.sharding import (
+    ShardError,
+    check_shard_results,
+    iter_merged_mentions,
+    mentions_path,
+    partition_publications,
+    process_shard,
+    shard_path,
+)
+
+DRUGS = [("Aspirin", "ASPIRIN"), ("Ethanol", "ETHANOL")]
+
+
+def publications():
+    pubmed_df = pd.DataFrame(
+        {
+            "id": [str(i) for i in range(40)] + ["", ""],
+            "title": ["aspirin and ethanol", "ethanol", "nothing"] * 14,
+            "date": ["2020-01-01"] * 41 + [None],
+            "journal": ["J"] * 42,
+        }
+    )
+    trials_df = pd.DataFrame(
+        {
+            "id": [f"NCT{i:08d}" for i in range(10)],
+            "scientific_title": ["Aspirin trial"] * 10,
+            "date": ["2021-02-03"] * 10,
+            "journal": ["T"] * 10,
+        }
+    )
+    return [(pubmed_df, "pubmed"), (trials_df, "clinical_trial")]
+
+
+def test_merged_shards_match_a_single_process_run(tmp_path):
+    expected = [
+        mention
+        for df, source in publications()
+        for mention in find_drug_mentions(df, DRUGS, source)
+    ]
+    manifest = partition_publications(publications(), DRUGS, str(tmp_path), 3)
+    assert sum(entry["rows"] for entry in manifest["files"]) == 52
+
+    # Shards run in any order
+    for shard in (2, 0, 1):
+        process_shard(str(tmp_path), shard)
+    merged = list(iter_merged_mentions(check_shard_results(str(tmp_path))))
+    assert merged == expected
+
+
+def test_changed_files_are_rejected(tmp_path):
+    partition_publications(publications(), DRUGS, str(tmp_path), 2)
+    process_shard(str(tmp_path), 0)
+    with pytest.raises(ShardError, match="Missing result of shard 1"):
+        check_shard_results(str(tmp_path))
+
+    process_shard(str(tmp_path), 1)
+    with gzip.open(mentions_path(str(tmp_path), 1), "at", encoding="utf-8") as f:
+        f.write("[0, 0, {}]\n")
+    with pytest.raises(ShardError, match="Checksum mismatch for mentions of shard 1"):
+        check_shard_results(str(tmp_path))
+
+    with gzip.open(shard_path(str(tmp_path), 0), "wt", encoding="utf-8") as f:
+        f.write("")
+    with pytest.raises(ShardError, match="Checksum mismatch for shard 0"):
+        process_shard(str(tmp_path), 0)
+
+
+def test_every_pipeline_directory_is_configurable(tmp_path, monkeypatch):
+    """With every directory given, nothing is written under the default ./data/."""
+    import main
+    from data_ingestion import reader
+
+    # configure_paths sets module globals: restore them after the test
+    for module, names in [
+        (
+            main,
+            [
+                "rawdata_file_path",
+                "cleaned_data_file_path",
+                "processed_file_path",
+                "manifest_json",
+                "title_index_path",
+                "profiles_path",
+                "checkpoints_path",
+                "shards_path",
+            ],
+        ),
+        (
+            reader,
+            [
+                "rawdata_file_path",
+                "drugs_csv_path",
+                "pubmed_csv_path",
+                "pubmed_json_path",
+                "clinical_trials_csv_path",
+            ],
+        ),
+    ]:
+        for name in names:
+            monkeypatch.setattr(module, name, getattr(module, name))
+    raw_dir = os.path.join(os.path.dirname(__file__), "..", "data", "raw")
+    monkeypatch.chdir(tmp_path)
+    dirs = ["--raw-dir", os.path.abspath(raw_dir)]
+    for option, name in [
+        ("--cleaned-dir", "cleaned"),
+        ("--output-dir", "output"),
+        ("--checkpoint-dir", "checkpoints"),
+        ("--shards-dir", "shards"),
+    ]:
+        dirs += [option, str(tmp_path / "run" / name)]
+
+    main.main(dirs + ["--resume"])
+    main.main(dirs + ["--partition-shards", "2"])
+    for shard in range(2):
+        main.main(dirs + ["--process-shard", str(shard)])
+    main.main(dirs + ["--merge-shards"])
+
+    assert not (tmp_path / "data").exists()
+    assert sorted(path.name for path in (tmp_path / "run").iterdir()) == [
+        "checkpoints",
+        "cleaned",
+        "output",
+        "shards",
+    ]
+    assert any((tmp_path / "run" / "checkpoints").iterdir())
@@ -0,0 +1,105 @@
+import pytest
+from analysis.adhoc_analysis import (
+    find_journal_with_most_different_drugs,
+    find_related_drugs_by_pubmed_journals,
+)
+from analysis.streaming_analytics import (
+    AGGREGATIONS,
+    analyze_graph_file,
+    create_aggregation,
+    register_aggregation,
+    run_aggregations,
+)
+from data_output.graph_writer import (
+    OUTPUT_FORMATS,
+    graph_file_name,
+    open_graph_writer,
+)
+from test_graph_index import random_mentions
+
+TARGET_DRUGS = ["BETAMETHASONE", "atropine", "EPINEPHRINE", "UNKNOWN", ""]
+
+
+@pytest.mark.parametrize("output_format", OUTPUT_FORMATS)
+@pytest.mark.parametrize("seed", range(5))
+def test_single_pass_matches_adhoc_analysis(tmp_path, output_format, seed):
+    """One streaming pass over any graph format gives the answers of the ad-hoc functions."""
+    mentions = random_mentions(seed)
+    graph_path = str(tmp_path / graph_file_name(output_format))
+    with open_graph_writer(graph_path, output_format) as writer:
+        for mention in mentions:
+            writer.write(mention)
+
+    aggregations = {"journal": create_aggregation("journal_with_most_drugs")}
+    for drug in TARGET_DRUGS:
+        aggregations[drug] = create_aggregation("related_drugs", target_drug=drug)
+    results = analyze_graph_file(graph_path, aggregations)
+
+    assert results["journal"] == find_journal_with_most_different_drugs(mentions)
+    for drug in TARGET_DRUGS:
+        assert results[drug] == find_related_drugs_by_pubmed_journals(mentions, drug)
+
+
+def test_adhoc_functions_answer_from_the_aggregations():
+    """The semantics of the ad-hoc analyses, on hand-checked mentions."""
+    mentions = [
+        {"drug": drug, "journal": journal, "source_type": source_type}
+        for drug, journal, source_type in [
+            ("A", "J1", "pubmed"),
+            ("B", "J1", "pubmed"),
+            ("C", "J1", "clinical_trial"),
+            ("C", "J2", "pubmed"),
+            ("A", "J2", "clinical_trial"),
+            ("D", "J3", "pubmed"),
+            ("D", "J3", "other"),  # sources other than clinical trials are ignored
+            ("A", "J3", "pubmed"),
+        ]
+    ]
+    assert find_journal_with_most_different_drugs(mentions) == ("J1", 3)
+    assert find_related_drugs_by_pubmed_journals(mentions, "a") == {"B", "D"}
+    assert find_related_drugs_by_pubmed_journals(mentions, "C") == set()
+    assert find_related_drugs_by_pubmed_journals(mentions, "") == set()
+    assert find_journal_with_most_different_drugs([]) == (None, 0)
+
+
+def test_new_aggregations_can_register():
+    @register_aggregation("mentions_per_source")
+    class MentionsPerSource:
+        def __init__(self):
+            self.counts = {}
+
+        def update(self, mention):
+            source = mention["source_type"]
+            self.counts[source] = self.counts.get(source, 0) + 1
+
+        def result(self):
+            return self.counts
+
+    try:
+        mentions = random_mentions(3)
+        results = run_aggregations(
+            iter(mentions), {"sources": create_aggregation("mentions_per_source")}
+        )
+        assert sum(results["sources"].values()) == len(mentions)
+    finally:
+        del AGGREGATIONS["mentions_per_source"]
+
+    with pytest.raises(ValueError, match="Unknown aggregation 'mentions_per_source'"):
+        create_aggregation("mentions_per_source")
+
+
+def test_unreadable_graphs(tmp_path, capsys):
+    def analyze(graph_path):
+        aggregations = {"journal": create_aggregation("journal_with_most_drugs")}
+        return analyze_graph_file(str(graph_path), aggregations)
+
+    assert analyze(tmp_path / "missing.json") is None
+
+    graph_path = tmp_path / "graph.json"
+    graph_path.write_text('[{"drug": "A", "journal": "J"}, {"drug": ')
+    assert analyze(graph_path) is None
+    assert "Could not decode JSON" in capsys.readouterr().out
+
+    graph_path.write_text("[]")
+    assert analyze(graph_path) == {"journal": (None, 0)}
+    assert "is empty" in capsys.readouterr().out
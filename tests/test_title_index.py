@@ -0,0 +1,50 @@
+import random
+
+import pytest
+from data_transformation import title_index as title_index_module
+from data_transformation.title_index import TitleIndex
+
+WORDS = ["atropine", "ethanol", "Betamethasone", "trial", "of", "é", "ÉTHANOL", ""]
+
+
+def random_titles(rng, count):
+    return {
+        f"pubmed:{i}": " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 6)))
+        for i in range(count)
+    }
+
+
+def sync(index, titles):
+    hashes = {key: str(hash(title)) for key, title in titles.items()}
+    index.sync([(list(titles), list(titles.values()))], hashes)
+
+
+def expected_keys(titles, drug_upper):
+    return {key for key, title in titles.items() if drug_upper in title.upper()}
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_candidates_survive_updates_and_compaction(tmp_path, monkeypatch, seed):
+    """Candidates always contain every matching publication, across runs and compactions."""
+    monkeypatch.setattr(title_index_module, "INDEX_BATCH_SIZE", 7)
+    rng = random.Random(seed)
+    index_path = str(tmp_path / "title_index")
+    titles = random_titles(rng, 40)
+
+    for _ in range(6):
+        index = TitleIndex.open(index_path) or TitleIndex(index_path)
+        sync(index, titles)
+        for drug_upper in ["ATROPINE", "ETHANOL", "ÉTHANOL", "BETAMETHASONE", "TRIAL"]:
+            candidates = index.candidates(drug_upper)
+            assert expected_keys(titles, drug_upper) <= candidates <= titles.keys()
+        assert index.candidates("OF") is None
+        index.save()
+
+        # Change, delete and insert publications for the next run
+        for key in rng.sample(list(titles), 10):
+            del titles[key]
+        titles.update(random_titles(random.Random(rng.random()), 60))
+
+    reopened = TitleIndex.open(index_path)
+    assert len(reopened) == len(titles)
+    assert len(reopened.segment_files) <= title_index_module.MAX_SEGMENTS
@@ -1,5 +1,14 @@
+import pandas as pd
 import pytest
-from src.utils.utils import is_atccode_multi_level
+from src.utils.utils import (
+    is_atccode_multi_level,
+    is_atccode_multi_level_column,
+    is_nct_number,
+    is_nct_number_column,
+    clean_skipped_hex_sequences,
+    clean_skipped_hex_sequences_column,
+    clean_and_validate_frame,
+)
 
 
 # Valid test cases for each level
@@ -56,3 +65,53 @@ def test_non_string_input():
     assert is_atccode_multi_level(12345) is False, "Failed for numeric input"
     assert is_atccode_multi_level([]) is False, "Failed for list input"
     assert is_atccode_multi_level({}) is False, "Failed for dictionary input"
+
+
+def test_column_level_versions_match_scalar_functions():
+    """The vectorised validators and cleaner give the same results as the per-row functions."""
+    values = pd.Series(
+        [
+            "A10BA02",
+            "a10",
+            "NCT01234567",
+            "NCT0123456",
+            None,
+            12,
+            "Tetra\\xc3\\xa9cycline",
+            "",
+        ]
+    )
+    assert is_atccode_multi_level_column(values).tolist() == [
+        is_atccode_multi_level(str(value)) for value in values
+    ]
+    assert is_nct_number_column(values).tolist() == [
+        is_nct_number(str(value)) for value in values
+    ]
+    assert clean_skipped_hex_sequences_column(values).tolist() == [
+        clean_skipped_hex_sequences(str(value)) for value in values
+    ]
+
+
+def test_clean_and_validate_frame_reports_rejects_per_rule():
+    df = pd.DataFrame(
+        {
+            "id": ["NCT01234567", "NCT1", "NCT07654321"],
+            "atccode": ["A10", "A10", "a10"],
+            "title": ["a\\x20b", "c", "d"],
+        }
+    )
+    cleaned, rejects = clean_and_validate_frame(
+        df,
+        ["title"],
+        [
+            ("invalid_nct_number", "id", is_nct_number_column),
+            ("invalid_atccode", "atccode", is_atccode_multi_level_column),
+        ],
+    )
+    assert cleaned.to_dict("list") == {
+        "id": ["NCT01234567"],
+        "atccode": ["A10"],
+        "title": ["ab"],
+    }
+    assert rejects == {"invalid_nct_number": 1, "invalid_atccode": 1}
+    assert df["title"].tolist() == ["a\\x20b", "c", "d"]  # input left untouched